@@ -0,0 +1,61 @@
+"""Measure pickling of an array.array of doubles, which protocols 3 and up
+save as its typecode and raw bytes, written straight from the array.
+
+"peak MiB" is the memory allocated while pickling to /dev/null, as
+traced by tracemalloc: the reference pickler copies the items once, to
+the bytes object that array.__reduce_ex__() returns.
+
+Run from the repository root, optionally with the number of items:
+
+    python -m benchmark.bench_array [10000000]
+"""
+import array
+import os
+import pickle as std_pickle
+import sys
+import tracemalloc
+
+from benchmark.bench_util import best_time, print_table, reference_dumps
+from lib_pickle import pickle
+
+
+def dump_to_null(pickler_class, obj, protocol):
+    with open(os.devnull, "wb") as f:
+        pickler_class(f, protocol).dump(obj)
+
+
+def peak_memory(pickler_class, obj, protocol):
+    tracemalloc.start()
+    dump_to_null(pickler_class, obj, protocol)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 7
+    obj = array.array("d", range(n))
+    rows = []
+    for protocol in (4, 5):
+        assert (pickle.dumps(obj, protocol) ==
+                reference_dumps(obj, protocol))
+        row = [protocol]
+        for dumps in (reference_dumps, pickle.dumps):
+            row.append("%.1f" % (1e3 * best_time(
+                lambda: dumps(obj, protocol), repeat=3)))
+        for pickler_class in (std_pickle._Pickler, pickle._Pickler):
+            row.append("%.1f" % (1e3 * best_time(
+                lambda: dump_to_null(pickler_class, obj, protocol),
+                repeat=3)))
+        for pickler_class in (std_pickle._Pickler, pickle._Pickler):
+            row.append(peak_memory(pickler_class, obj, protocol) >> 20)
+        rows.append(row)
+    print_table("array.array of %d doubles, std = pickle._Pickler of this "
+                "interpreter" % n,
+                ("proto", "reference dumps ms", "dumps ms",
+                 "std to file ms", "to file ms", "std peak MiB", "peak MiB"),
+                rows)
+
+
+if __name__ == '__main__':
+    main()
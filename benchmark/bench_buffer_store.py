@@ -0,0 +1,86 @@
+"""Compare in-band pickling of large bytes-like objects with their
+automatic out-of-band export to a BufferStore.
+
+Both pickles are written to files in a temporary directory.  "peak" is
+the memory the pickler allocates on top of the data, as traced by
+tracemalloc.
+
+Run from the repository root, optionally with the total size in MiB:
+
+    python -m benchmark.bench_buffer_store [256]
+"""
+import array
+import os
+import pickle as std_pickle
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmark.bench_util import print_table
+from lib_pickle import pickle
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    size = (int(sys.argv[1]) if len(sys.argv) > 1 else 256) << 20
+    part = size // 4
+    obj = {"blob": bytes(part), "buffer": bytearray(part),
+           "doubles": array.array("d", bytes(part)),
+           "ints": list(range(1000))}
+    tmp = tempfile.mkdtemp()
+    try:
+        in_band = os.path.join(tmp, "in_band.pickle")
+        out_of_band = os.path.join(tmp, "out_of_band.pickle")
+        store_path = os.path.join(tmp, "buffers")
+
+        def dump_in_band():
+            with open(in_band, "wb") as f:
+                pickle.dump(obj, f, 5)
+
+        def dump_out_of_band():
+            with pickle.BufferStore(store_path, "w") as store, \
+                    open(out_of_band, "wb") as f:
+                pickle.dump(obj, f, 5, buffer_callback=store,
+                            buffer_threshold=1 << 20)
+
+        def load_in_band():
+            with open(in_band, "rb") as f:
+                return std_pickle.load(f)
+
+        def load_out_of_band():
+            with pickle.BufferStore(store_path) as store, \
+                    open(out_of_band, "rb") as f:
+                return std_pickle.load(f, buffers=store)
+
+        rows = []
+        for name, dump, load, path in (
+                ("in-band", dump_in_band, load_in_band, in_band),
+                ("BufferStore", dump_out_of_band, load_out_of_band,
+                 out_of_band)):
+            _, dump_time, dump_peak = measure(dump)
+            loaded, load_time, _ = measure(load)
+            assert loaded == obj
+            del loaded
+            rows.append((name, os.path.getsize(path),
+                         "%.0f" % (dump_time * 1e3), dump_peak >> 20,
+                         "%.0f" % (load_time * 1e3)))
+    finally:
+        shutil.rmtree(tmp)
+    print_table("%d MiB of bytes, bytearray and array.array" % (size >> 20),
+                ("pickling", "pickle bytes", "dump ms", "dump peak MiB",
+                 "load ms"), rows)
+
+
+if __name__ == '__main__':
+    main()
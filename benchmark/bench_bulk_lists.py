@@ -0,0 +1,38 @@
+"""Measure pickling of large homogeneous lists of ints, floats and strs.
+
+Run from the repository root:
+
+    python -m benchmark.bench_bulk_lists
+"""
+from benchmark.bench_util import best_time, print_table, reference_dumps
+from lib_pickle import pickle
+
+N = 1000000
+
+WORKLOADS = {
+    "uint8 ints": lambda: [i % 256 for i in range(N)],
+    "uint16 ints": lambda: [256 + i % 60000 for i in range(N)],
+    "int32 ints": lambda: [-i for i in range(N)],
+    "mixed ints": lambda: [i * (-1) ** i for i in range(N)],
+    "floats": lambda: [i / 7 for i in range(N)],
+    "short strs": lambda: [str(i) for i in range(N // 4)],
+}
+
+
+def main():
+    rows = []
+    for name, make in WORKLOADS.items():
+        obj = make()
+        for protocol in (1, 4):
+            assert pickle.dumps(obj, protocol) == reference_dumps(obj, protocol)
+            new = best_time(lambda: pickle.dumps(obj, protocol), repeat=3)
+            old = best_time(lambda: reference_dumps(obj, protocol), repeat=3)
+            rows.append((name, len(obj), protocol, "%.1f" % (old * 1e3),
+                         "%.1f" % (new * 1e3), "%.1fx" % (old / new)))
+    print_table("homogeneous lists",
+                ("workload", "items", "proto", "reference ms",
+                 "lib_pickle ms", "speedup"), rows)
+
+
+if __name__ == '__main__':
+    main()
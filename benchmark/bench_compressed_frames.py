@@ -0,0 +1,74 @@
+"""Measure the throughput and compression ratio of pickling through a
+CompressedFrameWriter, which compresses the frames in a thread pool while
+pickling goes on.
+
+"dumps()" is pickling alone; "then compress" pickles with dumps() and
+then compresses the pickle in blocks of the same size, one after the
+other.  Throughputs are in MB of pickle per second.
+
+Run from the repository root, optionally with the number of fuzz values
+and of copies of the black_test corpus:
+
+    python -m benchmark.bench_compressed_frames [5000] [2000]
+"""
+import copy
+import io
+import sys
+from functools import partial
+
+from benchmark.bench_util import best_time, black_test_corpus, print_table
+from fuzzing.generate_data import GenerateData
+from lib_pickle import pickle
+
+BLOCK_SIZE = 1 << 16
+CODECS = (("zlib", None), ("zlib", 1), ("lzma", 1), ("bz2", 9))
+LEVEL_KEYWORDS = {"zlib": "level", "lzma": "preset", "bz2": "compresslevel"}
+
+
+def compress_after(obj, compress):
+    data = pickle.dumps(obj, 4)
+    with memoryview(data) as view:
+        return sum(len(compress(view[i:i + BLOCK_SIZE]))
+                   for i in range(0, len(view), BLOCK_SIZE))
+
+
+def dump_compressed(obj, codec, level):
+    f = io.BytesIO()
+    with pickle.CompressedFrameWriter(f, codec, level=level) as out:
+        pickle.dump(obj, out, 4)
+    return f
+
+
+def main():
+    fuzz_values = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    copies = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    corpus = black_test_corpus()
+    corpora = {
+        "fuzz": [GenerateData(seed=i).generate_random_value()
+                 for i in range(fuzz_values)],
+        "black_test": [copy.deepcopy(corpus) for _ in range(copies)],
+    }
+    rows = []
+    for name, obj in corpora.items():
+        size = len(pickle.dumps(obj, 4))
+        plain = best_time(lambda: pickle.dumps(obj, 4), repeat=3)
+        for codec, level in CODECS:
+            compress = __import__(codec).compress
+            if level is not None:
+                compress = partial(compress, **{LEVEL_KEYWORDS[codec]: level})
+            packed = len(dump_compressed(obj, codec, level).getvalue())
+            after = best_time(lambda: compress_after(obj, compress), repeat=3)
+            stage = best_time(lambda: dump_compressed(obj, codec, level),
+                              repeat=3)
+            rows.append((name, "%s/%s" % (codec, level or "default"),
+                         "%.1f" % (size / 1e6), "%.2f" % (size / packed),
+                         "%.1f" % (size / plain / 1e6),
+                         "%.1f" % (size / after / 1e6),
+                         "%.1f" % (size / stage / 1e6)))
+    print_table("compressed frames, protocol 4, MB/s",
+                ("corpus", "codec", "MB", "ratio", "dumps()",
+                 "then compress", "writer"), rows)
+
+
+if __name__ == '__main__':
+    main()
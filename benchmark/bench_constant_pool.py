@@ -0,0 +1,50 @@
+"""Measure pickling of data made of small ints, bools, None and short strs,
+whose opcodes come from the constant pool.
+
+The lists mix types so that each item goes through save() or
+_save_scalars() rather than the homogeneous bulk encoders.  The "unique"
+workloads are made of strs that are all different, which no cache of
+encoded strs could help with.
+
+Run from the repository root:
+
+    python -m benchmark.bench_constant_pool
+"""
+from benchmark.bench_util import best_time, print_table, reference_dumps
+from lib_pickle import pickle
+
+N = 100000
+
+WORKLOADS = {
+    "ints and bools": lambda: [i % 300 - 40 if i % 3 else i % 2 == 0
+                               for i in range(N)],
+    "small tuples": lambda: [(i % 1000, True, None) for i in range(N // 3)],
+    "records": lambda: [{"id": i % 70000, "name": "user%d" % (i % 500),
+                         "active": i % 2 == 0, "parent": None}
+                        for i in range(N // 4)],
+    "repeated words": lambda: [(["alpha", "beta", "gamma", "delta"][i % 4] +
+                                str(i % 100), i % 7)
+                               for i in range(N // 2)],
+    "unique strs": lambda: [("s%d" % i, i) for i in range(N)],
+    "unique keys": lambda: {"key%d" % i: "value%d" % i for i in range(N)},
+}
+
+
+def main():
+    rows = []
+    for name, make in WORKLOADS.items():
+        obj = make()
+        for protocol in (0, 2, 4):
+            assert (pickle.dumps(obj, protocol) ==
+                    reference_dumps(obj, protocol))
+            reference = best_time(lambda: reference_dumps(obj, protocol),
+                                  repeat=3)
+            lib = best_time(lambda: pickle.dumps(obj, protocol), repeat=3)
+            rows.append((name, protocol, "%.1f" % (reference * 1e3),
+                         "%.1f" % (lib * 1e3), "%.2fx" % (reference / lib)))
+    print_table("constant pool", ("workload", "proto", "reference ms",
+                                  "lib_pickle ms", "speedup"), rows)
+
+
+if __name__ == '__main__':
+    main()
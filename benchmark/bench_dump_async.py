@@ -0,0 +1,98 @@
+"""Measure the latency of an asyncio event loop while a large object is
+pickled to a local socket pair, and read back by another task.
+
+A ticker task sleeps for 1 ms at a time and records how late it wakes
+up.  "dumps() + write" pickles the whole object in the loop and then
+writes it; dump_async() writes each frame as it is done and gives way
+to the other tasks every yield_interval seconds.
+
+Run from the repository root, optionally with the size of the object
+in MiB, most of it in 1 MiB bytes objects:
+
+    python -m benchmark.bench_dump_async [500]
+"""
+import asyncio
+import socket
+import sys
+import time
+
+from benchmark.bench_util import print_table
+from lib_pickle import pickle
+
+TICK = 0.001
+
+
+def make_object(mib):
+    records = [{"id": i, "name": "user%d" % i, "tags": ["a", "b"],
+                "score": i / 7} for i in range(100000)]
+    blobs = [bytes([i % 256]) * (1 << 20) for i in range(max(mib - 10, 0))]
+    return [records, list(range(1000000)), blobs]
+
+
+async def ticker(lags, stop):
+    loop = asyncio.get_event_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(TICK)
+        lags.append(loop.time() - start - TICK)
+
+
+async def consume(reader):
+    size = 0
+    while True:
+        data = await reader.read(1 << 20)
+        if not data:
+            return size
+        size += len(data)
+
+
+async def blocking_dump(obj, writer):
+    writer.write(pickle.dumps(obj, 5))
+    await writer.drain()
+
+
+async def run(dump, obj):
+    a, b = socket.socketpair()
+    reader, reader_end = await asyncio.open_connection(sock=a)
+    writer_end, writer = await asyncio.open_connection(sock=b)
+    lags = []
+    stop = asyncio.Event()
+    ticking = asyncio.ensure_future(ticker(lags, stop))
+    consuming = asyncio.ensure_future(consume(reader))
+    await asyncio.sleep(0.05)
+    start = time.perf_counter()
+    await dump(obj, writer)
+    writer.close()
+    size = await consuming
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticking
+    reader_end.close()
+    lags.sort()
+    return (size, elapsed, lags[len(lags) // 2], lags[len(lags) * 99 // 100],
+            lags[-1])
+
+
+def main():
+    mib = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    obj = make_object(mib)
+    methods = {
+        "dumps() + write": blocking_dump,
+        "dump_async()": lambda obj, writer: pickle.dump_async(obj, writer, 5),
+        "dump_async(yield_interval=0.001)":
+            lambda obj, writer: pickle.dump_async(obj, writer, 5,
+                                                  yield_interval=0.001),
+    }
+    rows = []
+    for name, dump in methods.items():
+        size, elapsed, median, p99, worst = asyncio.run(run(dump, obj))
+        rows.append((name, "%.0f" % (size / elapsed / 1e6),
+                     "%.2f" % (median * 1e3), "%.2f" % (p99 * 1e3),
+                     "%.1f" % (worst * 1e3)))
+    print_table("%d MiB object, event loop lag of a %g ms sleep" % (
+                    mib, TICK * 1e3),
+                ("method", "MB/s", "median ms", "p99 ms", "max ms"), rows)
+
+
+if __name__ == '__main__':
+    main()
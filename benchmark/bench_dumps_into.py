@@ -0,0 +1,56 @@
+"""Compare the peak memory and time of dumps(), dumps_view() and
+dumps_into() a preallocated bytearray or anonymous mmap.
+
+Run from the repository root:
+
+    python -m benchmark.bench_dumps_into
+"""
+import gc
+import mmap
+import tracemalloc
+
+from benchmark.bench_util import best_time, print_table
+from lib_pickle import pickle
+
+
+def workloads():
+    return {
+        "bytes": [bytes(1000) + b"%d" % i for i in range(100000)],
+        "records": [{"id": i, "name": "n%d" % i, "score": i / 7}
+                    for i in range(200000)],
+    }
+
+
+def peak_memory(func):
+    gc.collect()
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    rows = []
+    for name, obj in workloads().items():
+        size = len(pickle.dumps(obj, 4))
+        buffer = bytearray(size)
+        mapping = mmap.mmap(-1, size)
+        variants = [
+            ("dumps", lambda: pickle.dumps(obj, 4)),
+            ("dumps_view", lambda: pickle.dumps_view(obj, 4)),
+            ("dumps_into bytearray",
+             lambda: pickle.dumps_into(obj, buffer, 4)),
+            ("dumps_into mmap", lambda: pickle.dumps_into(obj, mapping, 4)),
+        ]
+        for variant, func in variants:
+            rows.append((name, size >> 20, variant,
+                         "%.2f" % (peak_memory(func) / size),
+                         "%.1f" % (1e3 * best_time(func, repeat=3))))
+        mapping.close()
+    print_table("protocol 4, peak traced memory relative to the pickle size",
+                ("workload", "MiB", "variant", "peak/size", "ms"), rows)
+
+
+if __name__ == '__main__':
+    main()
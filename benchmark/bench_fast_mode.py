@@ -0,0 +1,51 @@
+"""Compare fast mode (fast=True), which writes no memo opcodes, with the
+memoizing pickler on the black_test corpus.
+
+Each case is pickled on its own, as the black_test suite does, and as part
+of a list of all the cases.  Cyclic cases can't be pickled in fast mode
+and are reported as such.
+
+Run from the repository root:
+
+    python -m benchmark.bench_fast_mode
+"""
+from benchmark.bench_util import best_time, black_test_corpus, print_table
+from lib_pickle import pickle
+
+NUMBER = 2000
+
+
+def main():
+    corpus = black_test_corpus()
+    acyclic = {}
+    for name, value in corpus.items():
+        try:
+            pickle.dumps(value, fast=True)
+        except pickle.PicklingError:
+            continue
+        acyclic[name] = value
+    acyclic["all cases"] = list(acyclic.values())
+    for protocol in (2, 4):
+        rows = []
+        for name, value in acyclic.items():
+            memo_size = len(pickle.dumps(value, protocol))
+            fast_size = len(pickle.dumps(value, protocol, fast=True))
+            memo_time = best_time(lambda: pickle.dumps(value, protocol),
+                                  number=NUMBER)
+            fast_time = best_time(
+                lambda: pickle.dumps(value, protocol, fast=True),
+                number=NUMBER)
+            rows.append((name, memo_size, fast_size, "%.1f" % (memo_time * 1e6),
+                         "%.1f" % (fast_time * 1e6),
+                         "%.2f" % (fast_time / memo_time)))
+        for name in corpus:
+            if name not in acyclic:
+                rows.append((name, len(pickle.dumps(corpus[name], protocol)),
+                             "cyclic", "", "", ""))
+        print_table("black_test corpus, protocol %d" % protocol,
+                    ("case", "bytes", "fast bytes", "us", "fast us",
+                     "ratio"), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""Measure pickling of flat dicts of scalar keys and values.
+
+Run from the repository root:
+
+    python -m benchmark.bench_flat_dicts
+"""
+from benchmark.bench_util import best_time, print_table, reference_dumps
+from lib_pickle import pickle
+
+N = 20000
+
+
+def record(i):
+    return {"id": i, "name": "user%d" % i, "email": "user%d@example.com" % i,
+            "score": i / 3, "active": i % 2 == 0, "manager": None,
+            "age": 20 + i % 50, "balance": -i * 100}
+
+
+WORKLOADS = {
+    "records": lambda: [record(i) for i in range(N)],
+    "config": lambda: {"option_%d" % i: i % 3 == 0 or "value_%d" % i
+                       for i in range(10 * N)},
+    "str -> float": lambda: {str(i): i / 7 for i in range(10 * N)},
+}
+
+
+def count_items(obj):
+    if isinstance(obj, dict):
+        return len(obj)
+    return sum(len(d) for d in obj)
+
+
+def main():
+    rows = []
+    for name, make in WORKLOADS.items():
+        obj = make()
+        items = count_items(obj)
+        for protocol in (2, 4):
+            assert pickle.dumps(obj, protocol) == reference_dumps(obj, protocol)
+            new = best_time(lambda: pickle.dumps(obj, protocol), repeat=3)
+            old = best_time(lambda: reference_dumps(obj, protocol), repeat=3)
+            rows.append((name, items, protocol,
+                         "%.2f" % (old / items * 1e9 / 1e3),
+                         "%.2f" % (new / items * 1e9 / 1e3),
+                         "%.1fx" % (old / new)))
+    print_table("flat dicts",
+                ("workload", "items", "proto", "reference us/item",
+                 "lib_pickle us/item", "speedup"), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Count the writes reaching the file and time the framing layer.
+
+Run from the repository root:
+
+    python -m benchmark.bench_framer
+"""
+import io
+import pickle as std_pickle
+import tracemalloc
+
+from benchmark.bench_util import best_time, print_table
+from lib_pickle import pickle
+
+N = 100000
+
+
+class CountingFile:
+    def __init__(self):
+        self.calls = 0
+        self.size = 0
+
+    def write(self, data):
+        self.calls += 1
+        self.size += len(data)
+
+
+def workloads():
+    return {
+        "ints": list(range(N)),
+        "strs": [str(i) for i in range(N)],
+        "records": [{"id": i, "name": "n%d" % i, "score": i / 7}
+                    for i in range(N // 10)],
+        "nested": [[i, (i, str(i))] for i in range(N // 10)],
+    }
+
+
+def count_writes(pickler_class, obj, protocol):
+    f = CountingFile()
+    pickler_class(f, protocol).dump(obj)
+    return f.calls
+
+
+def peak_memory(pickler_class, obj, protocol):
+    tracemalloc.start()
+    pickler_class(io.BytesIO(), protocol).dump(obj)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    rows = []
+    for name, obj in workloads().items():
+        for protocol in (2, 4):
+            assert (pickle.dumps(obj, protocol) ==
+                    std_pickle._dumps(obj, protocol))
+            row = [name, protocol]
+            for pickler_class in (std_pickle._Pickler, pickle._Pickler):
+                row.append(count_writes(pickler_class, obj, protocol))
+            for pickler_class in (std_pickle._Pickler, pickle._Pickler):
+                row.append(peak_memory(pickler_class, obj, protocol) // 1024)
+            for pickler_class in (std_pickle._Pickler, pickle._Pickler):
+                row.append("%.1f" % (1e3 * best_time(
+                    lambda: pickler_class(io.BytesIO(), protocol).dump(obj),
+                    repeat=3)))
+            rows.append(row)
+    print_table("framing layer, std = pickle._Pickler of this interpreter",
+                ("workload", "proto", "std writes", "writes",
+                 "std peak KiB", "peak KiB", "std ms", "ms"), rows)
+
+
+if __name__ == '__main__':
+    main()
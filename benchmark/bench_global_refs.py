@@ -0,0 +1,51 @@
+"""Measure dumps() of many small messages whose classes are always the
+same, with and without the process-wide cache of resolved globals.
+
+"no cache" empties the cache before every call, so each dumps() resolves
+and encodes its globals again, as it did before the cache.
+
+Run from the repository root:
+
+    python -m benchmark.bench_global_refs
+"""
+import datetime
+from collections import OrderedDict
+
+from benchmark.bench_util import best_time, print_table, reference_dumps
+from black_test.test_customer_class import Person
+from lib_pickle import pickle
+
+NUMBER = 2000
+
+MESSAGES = {
+    "instance": Person("John Doe", 30),
+    "instances of 3 classes": [Person("John Doe", 30),
+                               OrderedDict(a=1),
+                               datetime.date(2024, 1, 1)],
+    "class and function": [Person, pickle.dumps],
+}
+
+
+def dumps_without_cache(obj, protocol):
+    pickle._global_refs.clear()
+    return pickle.dumps(obj, protocol)
+
+
+def main():
+    rows = []
+    for name, obj in MESSAGES.items():
+        for protocol in (0, 2, 4):
+            assert (pickle.dumps(obj, protocol) ==
+                    reference_dumps(obj, protocol))
+            times = [best_time(lambda: f(obj, protocol), number=NUMBER) * 1e6
+                     for f in (reference_dumps, dumps_without_cache,
+                               pickle.dumps)]
+            rows.append((name, protocol) + tuple("%.1f" % t for t in times) +
+                        ("%.2fx" % (times[1] / times[2]),))
+    print_table("dumps() of one small message",
+                ("message", "proto", "reference us", "no cache us", "us",
+                 "speedup"), rows)
+
+
+if __name__ == '__main__':
+    main()
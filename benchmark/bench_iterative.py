@@ -0,0 +1,65 @@
+"""Compare the recursive and the iterative (iterative=True) engines.
+
+Run from the repository root:
+
+    python -m benchmark.bench_iterative
+"""
+import sys
+import threading
+
+from benchmark.bench_util import best_time, print_table
+from black_test.test_customer_class import Person
+from fuzzing.generate_data import GenerateData
+from lib_pickle import pickle
+
+DEPTH = 20000
+
+
+def nest(depth, wrap, inner):
+    for _ in range(depth):
+        inner = wrap(inner)
+    return inner
+
+
+WORKLOADS = {
+    "deep list": lambda: nest(DEPTH, lambda x: [x], []),
+    "deep dict": lambda: nest(DEPTH, lambda x: {"1": x}, {}),
+    "deep tuple": lambda: nest(DEPTH, lambda x: (x, 1, 2, 3), ()),
+    "deep objects": lambda: nest(DEPTH, lambda x: Person(x, 0), None),
+    "wide lists": lambda: [[i, str(i)] for i in range(100000)],
+    "wide objects": lambda: [Person(str(i), i) for i in range(20000)],
+    "fuzz corpus": lambda: [GenerateData(seed=i).generate_random_value()
+                            for i in range(200)],
+}
+
+
+def run():
+    rows = []
+    for name, make in WORKLOADS.items():
+        obj = make()
+        for protocol in (0, 2, 4):
+            assert (pickle.dumps(obj, protocol, iterative=True) ==
+                    pickle.dumps(obj, protocol))
+            recursive = best_time(lambda: pickle.dumps(obj, protocol))
+            iterative = best_time(
+                lambda: pickle.dumps(obj, protocol, iterative=True))
+            rows.append((name, protocol, "%.1f" % (recursive * 1e3),
+                         "%.1f" % (iterative * 1e3),
+                         "%.2f" % (iterative / recursive)))
+    print_table("recursive vs iterative engine",
+                ("workload", "proto", "recursive ms", "iterative ms",
+                 "ratio"), rows)
+
+
+def main():
+    # Give the recursive engine enough room for the deep workloads, both in
+    # Python frames and in C stack.
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10 * DEPTH))
+    threading.stack_size(512 * 1024 * 1024)
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+
+
+if __name__ == '__main__':
+    main()
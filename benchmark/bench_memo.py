@@ -0,0 +1,55 @@
+"""Measure the memory held by the memo per memoized object, and the time
+to pickle an object graph with many memoized objects.
+
+Run from the repository root, optionally with the number of objects:
+
+    python -m benchmark.bench_memo [1000000]
+"""
+import gc
+import pickle as std_pickle
+import sys
+import tracemalloc
+
+from benchmark.bench_util import best_time, print_table
+from lib_pickle import pickle
+
+
+class NullFile:
+    def write(self, data):
+        pass
+
+
+def memo_bytes(pickler_class, obj, protocol):
+    # Memory still traced after dump(), when the pickler holds nothing
+    # but its memo
+    gc.collect()
+    tracemalloc.start()
+    pickler = pickler_class(NullFile(), protocol)
+    pickler.dump(obj)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size / len(pickler.memo)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    workloads = {"lists": [[i] for i in range(n)],
+                 "strs": ["s%d" % i for i in range(n)]}
+    rows = []
+    for name, obj in workloads.items():
+        for protocol in (2, 4):
+            row = [name, protocol]
+            for pickler_class in (std_pickle._Pickler, pickle._Pickler):
+                row.append("%.1f" % memo_bytes(pickler_class, obj, protocol))
+            for pickler_class in (std_pickle._Pickler, pickle._Pickler):
+                row.append("%.0f" % (1e3 * best_time(
+                    lambda: pickler_class(NullFile(), protocol).dump(obj),
+                    repeat=3)))
+            rows.append(row)
+    print_table("%d memoized objects, std = pickle._Pickler" % n,
+                ("workload", "proto", "std bytes/entry", "bytes/entry",
+                 "std ms", "ms"), rows)
+
+
+if __name__ == '__main__':
+    main()
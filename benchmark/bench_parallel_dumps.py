@@ -0,0 +1,40 @@
+"""Measure how parallel_dumps() scales with the number of workers.
+
+Run from the repository root, optionally with the number of records:
+
+    python -m benchmark.bench_parallel_dumps [200000]
+"""
+import os
+import pickle as std_pickle
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmark.bench_util import best_time, print_table
+from lib_pickle import pickle
+
+
+def records(n):
+    return [{"id": i, "name": "name-%d" % i, "tags": ["a", "b", str(i % 7)],
+             "score": i / 7, "active": i % 3 == 0} for i in range(n)]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    obj = records(n)
+    sequential = best_time(lambda: pickle.dumps(obj, 4), repeat=3)
+    rows = [("dumps", "-", "%.0f" % (1e3 * sequential), "1.00")]
+    for workers in (1, 2, 4, 8):
+        with ProcessPoolExecutor(workers) as executor:
+            data = pickle.parallel_dumps(obj, 4, executor=executor,
+                                         workers=workers)
+            assert std_pickle.loads(data) == obj
+            elapsed = best_time(lambda: pickle.parallel_dumps(
+                obj, 4, executor=executor, workers=workers), repeat=3)
+        rows.append(("parallel_dumps", workers, "%.0f" % (1e3 * elapsed),
+                     "%.2f" % (sequential / elapsed)))
+    print_table("%d records, protocol 4, %d CPUs" % (n, os.cpu_count()),
+                ("function", "workers", "ms", "speedup"), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Time in-band PickleBuffer payloads and measure the memory they take,
+written to /dev/null so that only the pickler's own copies count.
+
+Run from the repository root, optionally with the buffer size in MiB:
+
+    python -m benchmark.bench_picklebuffer [1024]
+"""
+import os
+import pickle as std_pickle
+import sys
+import tracemalloc
+
+from benchmark.bench_util import best_time, print_table
+from lib_pickle import pickle
+
+
+def dump_to_null(pickler_class, obj):
+    with open(os.devnull, "wb") as f:
+        pickler_class(f, 5).dump(obj)
+
+
+def peak_memory(pickler_class, obj):
+    tracemalloc.start()
+    dump_to_null(pickler_class, obj)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    size = (int(sys.argv[1]) if len(sys.argv) > 1 else 1024) << 20
+    data = bytearray(size)
+    workloads = {
+        "writable": pickle.PickleBuffer(data),
+        "readonly": pickle.PickleBuffer(memoryview(data).toreadonly()),
+        "1000 x 64 KiB": [pickle.PickleBuffer(bytearray(1 << 16))
+                          for _ in range(1000)],
+    }
+    rows = []
+    for name, obj in workloads.items():
+        row = [name]
+        for pickler_class in (std_pickle._Pickler, pickle._Pickler):
+            row.append(peak_memory(pickler_class, obj) >> 20)
+        for pickler_class in (std_pickle._Pickler, pickle._Pickler):
+            row.append("%.1f" % (1e3 * best_time(
+                lambda: dump_to_null(pickler_class, obj), repeat=3)))
+        rows.append(row)
+    print_table("in-band PickleBuffer of %d MiB, std = pickle._Pickler of "
+                "this interpreter" % (size >> 20),
+                ("buffers", "std peak MiB", "peak MiB", "std ms", "ms"),
+                rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Measure pickling of lists of instances of ordinary classes, which are
+saved as cls NEWOBJ state BUILD without calling __reduce_ex__().
+
+"reduce path" is a pickler that still goes through __reduce_ex__() and
+save_reduce() for them.
+
+Run from the repository root, optionally with the number of instances:
+
+    python -m benchmark.bench_plain_instances [100000]
+"""
+import io
+import sys
+
+from benchmark.bench_util import best_time, print_table, reference_dumps
+from black_test.test_customer_class import BankAccount, Cat, Dog, MathUtils
+from black_test.test_customer_class import Person
+from lib_pickle import pickle
+
+
+class ReducePathPickler(pickle._Pickler):
+    _save_plain_instance = pickle._Pickler._save_reduce_ex
+
+
+def reduce_path_dumps(obj, protocol):
+    f = io.BytesIO()
+    ReducePathPickler(f, protocol).dump(obj)
+    return f.getvalue()
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    workloads = {
+        "Person": [Person(str(i), i) for i in range(n)],
+        "Dog and Cat": [(Dog if i % 2 else Cat)(str(i)) for i in range(n)],
+        "BankAccount": [BankAccount(str(i), i / 4) for i in range(n)],
+        "MathUtils (no state)": [MathUtils() for i in range(n)],
+    }
+    rows = []
+    for name, obj in workloads.items():
+        for protocol in (2, 4):
+            assert (pickle.dumps(obj, protocol) ==
+                    reference_dumps(obj, protocol))
+            row = [name, protocol]
+            for dumps in (reference_dumps, reduce_path_dumps, pickle.dumps):
+                row.append("%.0f" % (
+                    n / best_time(lambda: dumps(obj, protocol), repeat=3)))
+            rows.append(row)
+    print_table("lists of %d instances, objects/s" % n,
+                ("classes", "proto", "reference", "reduce path",
+                 "lib_pickle"), rows)
+
+
+if __name__ == '__main__':
+    main()
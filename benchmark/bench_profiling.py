@@ -0,0 +1,50 @@
+"""Measure the cost of profiling with ProfilingPickler, and print the
+report of the fuzz corpus.
+
+Pickler records nothing, so "dumps()" is unchanged by profiling; the
+ProfilingPickler time includes counting the opcodes of the pickle.
+
+Run from the repository root:
+
+    python -m benchmark.bench_profiling
+"""
+import io
+
+from benchmark.bench_util import best_time, print_table
+from black_test.test_customer_class import Person
+from fuzzing.generate_data import GenerateData
+from lib_pickle import pickle
+
+WORKLOADS = {
+    "ints": lambda: list(range(100000)),
+    "records": lambda: [{"id": i, "name": "user%d" % i, "active": True}
+                        for i in range(20000)],
+    "instances": lambda: [Person(str(i), i) for i in range(20000)],
+    "fuzz corpus": lambda: [GenerateData(seed=i).generate_random_value()
+                            for i in range(500)],
+}
+
+
+def profile(obj, protocol):
+    profiler = pickle.ProfilingPickler(io.BytesIO(), protocol)
+    profiler.dump(obj)
+    return profiler
+
+
+def main():
+    rows = []
+    for name, make in WORKLOADS.items():
+        obj = make()
+        for protocol in (2, 4):
+            plain = best_time(lambda: pickle.dumps(obj, protocol), repeat=3)
+            profiled = best_time(lambda: profile(obj, protocol), repeat=3)
+            rows.append((name, protocol, "%.1f" % (plain * 1e3),
+                         "%.1f" % (profiled * 1e3),
+                         "%.1fx" % (profiled / plain)))
+    print_table("profiling cost", ("workload", "proto", "dumps() ms",
+                                   "profiled ms", "slowdown"), rows)
+    print(profile(WORKLOADS["fuzz corpus"](), 4).report(limit=10))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Log small records with RecordLogWriter and watch the memory it holds.
+
+Run from the repository root, optionally with the number of records:
+
+    python -m benchmark.bench_record_log [10000000]
+"""
+import collections
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmark.bench_util import print_table
+from lib_pickle import pickle
+
+Record = collections.namedtuple("Record", "id name value")
+
+
+def log(n, make_writer):
+    # Return the records per second and the traced memory after every
+    # tenth of the records.
+    samples = []
+    with tempfile.TemporaryFile() as f, tempfile.TemporaryFile() as index:
+        writer = make_writer(f, index)
+        tracemalloc.start()
+        start = time.perf_counter()
+        for i in range(n):
+            writer(Record(i, "name-%d" % (i % 1000), i / 7))
+            if (i + 1) % (n // 10) == 0:
+                samples.append(tracemalloc.get_traced_memory()[0] >> 10)
+        elapsed = time.perf_counter() - start
+        tracemalloc.stop()
+        size = f.tell()
+    return n / elapsed, size / n, samples
+
+
+def record_log(shared_globals):
+    def make_writer(f, index):
+        return pickle.RecordLogWriter(f, 4, index=index,
+                                      shared_globals=shared_globals).append
+    return make_writer
+
+
+def repeated_dump(f, index):
+    return pickle.Pickler(f, 4).dump
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    rows = []
+    for name, make_writer in [("Pickler.dump", repeated_dump),
+                              ("RecordLogWriter", record_log(0)),
+                              ("RecordLogWriter shared", record_log(16))]:
+        rate, size, samples = log(n, make_writer)
+        rows.append((name, "%.0f" % rate, "%.1f" % size,
+                     " ".join(map(str, samples))))
+    print_table("%d records, protocol 4, traced KiB after each tenth" % n,
+                ("writer", "records/s", "bytes/record", "KiB"), rows)
+
+
+if __name__ == '__main__':
+    main()
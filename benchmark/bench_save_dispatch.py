@@ -0,0 +1,43 @@
+"""Measure the per-object overhead of _Pickler.save().
+
+Run from the repository root:
+
+    python -m benchmark.bench_save_dispatch
+"""
+import sys
+
+from benchmark.bench_util import best_time, print_table, reference_dumps
+from black_test.test_customer_class import Person
+from lib_pickle import pickle
+
+N = 100000
+
+WORKLOADS = {
+    "ints": lambda: [i - N // 2 for i in range(N)],
+    "floats": lambda: [i / 3 for i in range(N)],
+    "short strs": lambda: [str(i) for i in range(N)],
+    "small tuples": lambda: [(i, -i) for i in range(N // 2)],
+    "instances": lambda: [Person(str(i), i) for i in range(N // 10)],
+    "mixed": lambda: [[i, i / 2, str(i), None, True] for i in range(N // 5)],
+}
+
+
+def main():
+    rows = []
+    for name, make in WORKLOADS.items():
+        obj = make()
+        for protocol in (2, 4, 5):
+            if protocol > pickle.HIGHEST_PROTOCOL:
+                continue
+            assert pickle.dumps(obj, protocol) == reference_dumps(obj, protocol)
+            new = best_time(lambda: pickle.dumps(obj, protocol))
+            old = best_time(lambda: reference_dumps(obj, protocol))
+            rows.append((name, protocol, "%.1f" % (old * 1e3),
+                         "%.1f" % (new * 1e3), "%.2fx" % (old / new)))
+    print_table("save() dispatch, Python %d.%d" % sys.version_info[:2],
+                ("workload", "proto", "reference ms", "lib_pickle ms",
+                 "speedup"), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""Measure a producer/consumer round trip between two local processes, the
+producer pickling a message into shared memory and the consumer loading
+it from there and replying with its length.
+
+"BytesIO + copy" pickles with dumps() and copies the pickle into a new
+SharedMemory block; dump_shared_memory() pickles straight into the block,
+sized from the previous message; "mmap of a file" pickles into a map of a
+file in /dev/shm (or the temporary directory) with dumps_into(), growing
+and truncating the file.
+
+Run from the repository root, optionally with the number of round trips:
+
+    python -m benchmark.bench_shared_memory [20]
+"""
+import mmap
+import multiprocessing
+import os
+import pickle as std_pickle
+import sys
+import tempfile
+import time
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+from benchmark.bench_util import print_table
+from lib_pickle import pickle
+
+MESSAGES = {
+    "records": [{"id": i, "name": "user%d" % i, "score": i / 7}
+                for i in range(100000)],
+    "64 MiB payload": [b"x" * (64 << 20), list(range(1000))],
+}
+
+
+def consumer(conn):
+    while True:
+        request = conn.recv()
+        if request is None:
+            return
+        kind, name, n = request
+        if kind == "mmap":
+            with open(name, "rb") as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                obj = std_pickle.loads(m)
+        else:
+            shm = SharedMemory(name)
+            obj = std_pickle.loads(shm.buf[:n])
+            shm.close()
+        conn.send(len(obj))
+
+
+def via_copy(obj, state):
+    data = pickle.dumps(obj, 5)
+    shm = SharedMemory(create=True, size=len(data))
+    shm.buf[:len(data)] = data
+    return shm, ("shm", shm.name, len(data))
+
+
+def via_dump_shared_memory(obj, state):
+    shm, n = pickle.dump_shared_memory(obj, 5, size=state.get("size"))
+    state["size"] = n
+    return shm, ("shm", shm.name, n)
+
+
+def via_mmap(obj, state):
+    path = state["path"]
+    with open(path, "r+b") as f, mmap.mmap(f.fileno(), 1) as m:
+        pickle.dumps_into(obj, m, 5)
+    return None, ("mmap", path, os.path.getsize(path))
+
+
+def round_trips(conn, produce, obj, number, state):
+    best_produce = best_total = float("inf")
+    for _ in range(number):
+        start = time.perf_counter()
+        shm, request = produce(obj, state)
+        produced = time.perf_counter()
+        conn.send(request)
+        assert conn.recv() == len(obj)
+        end = time.perf_counter()
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+        best_produce = min(best_produce, produced - start)
+        best_total = min(best_total, end - start)
+    return best_produce, best_total
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    fd, path = tempfile.mkstemp(dir=directory)
+    os.write(fd, b"\0")
+    os.close(fd)
+    # The consumer shares the producer's resource tracker, which then sees
+    # each block unlinked once rather than leaked by the consumer.
+    resource_tracker.ensure_running()
+    conn, child_conn = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=consumer, args=(child_conn,))
+    process.start()
+    rows = []
+    try:
+        for name, obj in MESSAGES.items():
+            for method, produce in (("BytesIO + copy", via_copy),
+                                    ("dump_shared_memory", via_dump_shared_memory),
+                                    ("mmap of a file", via_mmap)):
+                produce_time, total = round_trips(conn, produce, obj, number,
+                                                  {"path": path})
+                rows.append((name, method, "%.1f" % (produce_time * 1e3),
+                             "%.1f" % (total * 1e3)))
+    finally:
+        conn.send(None)
+        process.join()
+        os.unlink(path)
+    print_table("round trips between two processes, best of %d" % number,
+                ("message", "producer", "pickle ms", "round trip ms"), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""Compare lib_pickle with the C _pickle module on a fixed corpus, for
+every protocol, and detect regressions against a stored baseline.
+
+The corpus is made of the cases of black_test and boundary_value_test
+that both modules can pickle with every protocol, pickled one by one
+("test cases"), and of values made by GenerateData with fixed seeds, 100
+per unit of --scale, pickled one by one ("generated") and as a single
+list ("generated list").
+
+For every workload, module and protocol, the suite reports the objects
+and the MB of pickle per second of the best of --repeat runs, each of
+which repeats the workload for at least 0.2 s, the relative standard
+deviation of the run times, and the peak of the memory allocated while
+pickling, traced by tracemalloc in a separate run.  "slower" is how many
+times longer lib_pickle takes than _pickle.
+
+Run from the repository root:
+
+    python -m benchmark.bench_suite [--scale 10] [--repeat 5]
+        [--save results.json] [--compare baseline.json] [--threshold 0.1]
+
+--save writes the results as JSON.  --compare reports the change of each
+best time from a file written by --save, and exits with status 1 if one
+is more than --threshold (10%) slower.
+"""
+import _pickle
+import argparse
+import json
+import platform
+import statistics
+import sys
+import timeit
+import tracemalloc
+
+from benchmark.bench_util import print_table, test_corpus
+from fuzzing.generate_data import GenerateData
+from lib_pickle import pickle
+
+MODULES = {"lib_pickle": pickle.dumps, "_pickle": _pickle.dumps}
+PROTOCOLS = range(pickle.HIGHEST_PROTOCOL + 1)
+
+
+def picklable(value):
+    for dumps in MODULES.values():
+        for protocol in PROTOCOLS:
+            try:
+                dumps(value, protocol)
+            except Exception:
+                return False
+    return True
+
+
+def build_corpus(scale):
+    """Return a dict mapping the name of each workload to the values to
+    pickle one by one and the number of objects they count for."""
+    cases = [value for directory in ("black_test", "boundary_value_test")
+             for value in test_corpus(directory).values()]
+    cases = [value for value in cases if picklable(value)]
+    generated = [GenerateData(seed=i).generate_random_value()
+                 for i in range(100 * scale)]
+    generated = [value for value in generated if picklable(value)]
+    return {
+        "test cases": (cases, len(cases)),
+        "generated": (generated, len(generated)),
+        "generated list": ([generated], len(generated)),
+    }
+
+
+def measure(dumps, values, protocol, repeat):
+    def run():
+        for value in values:
+            dumps(value, protocol)
+
+    size = sum(len(dumps(value, protocol)) for value in values)
+    # Each run loops for at least 0.2 s, so small workloads are timed
+    # with some precision.
+    timer = timeit.Timer(run)
+    number = timer.autorange()[0]
+    times = [t / number for t in timer.repeat(repeat, number)]
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return size, times, peak
+
+
+def run_suite(scale, repeat):
+    results = []
+    for workload, (values, objects) in build_corpus(scale).items():
+        for protocol in PROTOCOLS:
+            for module, dumps in MODULES.items():
+                size, times, peak = measure(dumps, values, protocol, repeat)
+                best = min(times)
+                results.append({
+                    "workload": workload, "module": module,
+                    "protocol": protocol, "objects": objects, "bytes": size,
+                    "best": best, "mean": statistics.mean(times),
+                    "stdev": statistics.stdev(times) if repeat > 1 else 0.0,
+                    "objects_per_s": objects / best,
+                    "mb_per_s": size / best / 1e6,
+                    "peak_alloc": peak,
+                })
+    return results
+
+
+def print_results(results):
+    best = {(r["workload"], r["module"], r["protocol"]): r["best"]
+            for r in results}
+    rows = []
+    for r in results:
+        slower = ""
+        if r["module"] == "lib_pickle":
+            slower = "%.1fx" % (
+                r["best"] / best[r["workload"], "_pickle", r["protocol"]])
+        rows.append((r["workload"], r["protocol"], r["module"],
+                     "%.0f" % r["objects_per_s"], "%.2f" % r["mb_per_s"],
+                     "%.1f%%" % (100 * r["stdev"] / r["mean"]),
+                     "%.0f" % (r["peak_alloc"] / 1024), slower))
+    print_table("lib_pickle and _pickle", (
+        "workload", "proto", "module", "objects/s", "MB/s", "stdev",
+        "peak KiB", "slower"), rows)
+
+
+def compare(results, baseline, threshold):
+    """Print the change of every best time from the baseline results and
+    return the number of regressions above threshold."""
+    previous = {(r["workload"], r["module"], r["protocol"]): r["best"]
+                for r in baseline["results"]}
+    rows = []
+    regressions = 0
+    for r in results:
+        key = (r["workload"], r["module"], r["protocol"])
+        if key not in previous:
+            continue
+        change = r["best"] / previous[key] - 1
+        flag = ""
+        if change > threshold:
+            regressions += 1
+            flag = "REGRESSION"
+        rows.append(key + ("%.2f" % (previous[key] * 1e3),
+                           "%.2f" % (r["best"] * 1e3),
+                           "%+.1f%%" % (100 * change), flag))
+    print_table("change from the baseline", (
+        "workload", "module", "proto", "baseline ms", "ms", "change", ""),
+        rows)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scale", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", metavar="PATH")
+    parser.add_argument("--compare", metavar="PATH")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.scale, args.repeat)
+    print_results(results)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"python": platform.python_version(),
+                       "platform": platform.platform(),
+                       "scale": args.scale, "repeat": args.repeat,
+                       "results": results}, f, indent=1)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""Measure the text protocols 0 and 1 against protocol 4 on the same data.
+
+Protocol 0 writes decimal and escaped text arguments and one APPEND or
+SETITEM per item; the columns show how far it is behind protocol 4 with
+the reference pickler and with lib_pickle.
+
+Run from the repository root:
+
+    python -m benchmark.bench_text_protocols
+"""
+from benchmark.bench_util import best_time, print_table, reference_dumps
+from lib_pickle import pickle
+
+N = 100000
+
+WORKLOADS = {
+    "ints": lambda: [i * 37 - 5000 for i in range(N)],
+    "large ints": lambda: [i * 7919 ** 3 for i in range(N)],
+    "floats": lambda: [i / 7 for i in range(N)],
+    "words": lambda: ["word%d" % (i % 2000) for i in range(N)],
+    "escaped strs": lambda: ["line %d\n" % i for i in range(N // 2)],
+    "records": lambda: [{"id": i, "name": "user%d" % (i % 500),
+                         "score": i / 3, "active": i % 2 == 0}
+                        for i in range(N // 4)],
+}
+
+
+def main():
+    rows = []
+    for name, make in WORKLOADS.items():
+        obj = make()
+        times = {}
+        for protocol in (0, 1, 4):
+            assert (pickle.dumps(obj, protocol) ==
+                    reference_dumps(obj, protocol))
+            times[protocol] = (
+                best_time(lambda: reference_dumps(obj, protocol), repeat=3),
+                best_time(lambda: pickle.dumps(obj, protocol), repeat=3))
+        for protocol in (0, 1):
+            reference, lib = times[protocol]
+            rows.append((name, protocol, "%.1f" % (reference * 1e3),
+                         "%.1f" % (lib * 1e3), "%.2fx" % (reference / lib),
+                         "%.2fx" % (reference / times[4][0]),
+                         "%.2fx" % (lib / times[4][1])))
+    print_table("text protocols", ("workload", "proto", "reference ms",
+                                   "lib_pickle ms", "speedup",
+                                   "reference / proto 4",
+                                   "lib_pickle / proto 4"), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+import io
+import pickle as std_pickle
+import timeit
+import unittest
+
+
+def best_time(func, number=1, repeat=5):
+    """Return the best wall-clock time of one call to func, in seconds."""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def reference_dumps(obj, protocol=None):
+    """Pickle obj with the pure-Python pickler of the running interpreter.
+
+    lib_pickle started out as a copy of that module, so it is the baseline
+    the optimizations are measured against.
+    """
+    f = io.BytesIO()
+    std_pickle._Pickler(f, protocol).dump(obj)
+    return f.getvalue()
+
+
+def print_table(title, header, rows):
+    print(title)
+    widths = [max(len(str(x)) for x in column) for column in zip(header, *rows)]
+    for row in [header] + rows:
+        print("  ".join(str(x).rjust(w) for x, w in zip(row, widths)))
+    print()
+
+
+def black_test_corpus():
+    """Return a dict mapping the names of the black_test cases to their values.
+
+    The cases are local to the test methods, so each method is run with a
+    dump_and_check() that records the value instead of checking it.
+    """
+    return test_corpus("black_test")
+
+
+def test_corpus(directory):
+    """Same as black_test_corpus() for the test cases in *directory*."""
+    corpus = {}
+
+    def record(value, case_name, protocol=4):
+        corpus[case_name] = value
+
+    suite = unittest.defaultTestLoader.discover(directory, top_level_dir=".")
+    stack = [suite]
+    while stack:
+        test = stack.pop()
+        if isinstance(test, unittest.TestSuite):
+            stack.extend(reversed(list(test)))
+            continue
+        test.dump_and_check = record
+        test.setUp()
+        try:
+            getattr(test, test._testMethodName)()
+        finally:
+            test.tearDown()
+    return corpus
@@ -0,0 +1,53 @@
+"""Measure the size and speed of pickling with value_memo=True.
+
+Run from the repository root:
+
+    python -m benchmark.bench_value_memo
+"""
+import random
+
+from benchmark.bench_util import best_time, print_table
+from lib_pickle import pickle
+
+N = 20000
+
+
+def build(s):
+    # Runtime-built strs are distinct objects even when equal
+    return "".join(list(s))
+
+
+def records():
+    rng = random.Random(0)
+    countries = ["Sweden", "Norway", "Denmark", "Finland", "Iceland"]
+    return [{"id": i,
+             "country": build(rng.choice(countries)),
+             "status": build(rng.choice(["active", "suspended", "closed"])),
+             "tags": (build("customer"), build("priority-%d" % (i % 3))),
+             "payload": build("x" * 64).encode()}
+            for i in range(N)]
+
+
+def main():
+    obj = records()
+    rows = []
+    for protocol in (2, 4):
+        plain = pickle.dumps(obj, protocol)
+        value_memo = pickle.ValueMemo()
+        deduplicated = pickle.dumps(obj, protocol, value_memo=value_memo)
+        stats = value_memo.stats()
+        plain_time = best_time(lambda: pickle.dumps(obj, protocol), repeat=3)
+        dedup_time = best_time(
+            lambda: pickle.dumps(obj, protocol, value_memo=True), repeat=3)
+        rows.append((protocol, len(plain), len(deduplicated),
+                     "%.0f%%" % (100 * len(deduplicated) / len(plain)),
+                     stats["hits"], stats["bytes_saved"],
+                     "%.1f" % (plain_time * 1e3),
+                     "%.1f" % (dedup_time * 1e3)))
+    print_table("value memo on %d records" % N,
+                ("proto", "plain bytes", "dedup bytes", "size", "hits",
+                 "bytes_saved", "plain ms", "dedup ms"), rows)
+
+
+if __name__ == '__main__':
+    main()
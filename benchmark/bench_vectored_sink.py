@@ -0,0 +1,105 @@
+"""Pickle to a pipe and to a socketpair through a file object and through
+the vectored sink used for file descriptors and sockets.
+
+Run from the repository root:
+
+    python -m benchmark.bench_vectored_sink
+"""
+import os
+import socket
+import threading
+
+from benchmark.bench_util import best_time, print_table
+from lib_pickle import pickle
+
+
+def workloads():
+    return {
+        "small objects": [(i, str(i), i / 3) for i in range(200000)],
+        "large payloads": [(i, bytes(256 * 1024)) for i in range(200)],
+    }
+
+
+class Counting:
+    # Wraps the write function of a file object or the send function of a
+    # vectored sink to count system calls.
+    def __init__(self, func):
+        self.func = func
+        self.calls = 0
+
+    def __call__(self, data):
+        self.calls += 1
+        return self.func(data)
+
+
+def pipe():
+    r, w = os.pipe()
+    return (w, lambda: os.close(w), lambda: os.read(r, 1 << 20),
+            lambda: os.close(r), lambda: open(w, 'wb', buffering=0,
+                                              closefd=False))
+
+
+def socketpair():
+    a, b = socket.socketpair()
+    return (a, lambda: a.shutdown(socket.SHUT_WR), lambda: b.recv(1 << 20),
+            lambda: (a.close(), b.close()),
+            lambda: a.makefile('wb', buffering=0))
+
+
+def run(channel, obj, vectored, count=False):
+    target, end, read, close, open_file = channel()
+    received = []
+
+    def drain():
+        while True:
+            data = read()
+            if not data:
+                break
+            received.append(len(data))
+
+    thread = threading.Thread(target=drain)
+    thread.start()
+    if vectored:
+        pickler = pickle._Pickler(target, 4)
+        sink = pickler.framer.file_writev.__self__
+        if count:
+            sink._send = Counting(sink._send)
+        counter = sink._send
+    else:
+        f = open_file()
+        pickler = pickle._Pickler(f, 4)
+        if count:
+            # Counting hides the file type from the framer, which then
+            # copies each frame; only the call count is reported from it.
+            pickler.framer.file_write = Counting(pickler.framer.file_write)
+            pickler._write_large_bytes = pickler.framer.write_large_bytes
+        counter = pickler.framer.file_write
+    pickler.dump(obj)
+    if not vectored:
+        f.close()
+    end()
+    thread.join()
+    close()
+    return counter.calls if count else sum(received)
+
+
+def main():
+    rows = []
+    for name, obj in workloads().items():
+        size = len(pickle.dumps(obj, 4))
+        for channel in (pipe, socketpair):
+            row = [name, channel.__name__, size >> 20]
+            for vectored in (False, True):
+                assert run(channel, obj, vectored) == size
+                row.append(run(channel, obj, vectored, count=True))
+            for vectored in (False, True):
+                row.append("%.1f" % (1e3 * best_time(
+                    lambda: run(channel, obj, vectored), repeat=3)))
+            rows.append(row)
+    print_table("protocol 4 to a pipe and a socketpair",
+                ("workload", "channel", "MiB", "file calls", "vectored calls",
+                 "file ms", "vectored ms"), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Measure whichmodule() and the pickling of functions, classes and
+singletons that have no __module__, in a process with many modules.
+
+Such objects are looked for in every module of sys.modules by the stdlib
+pickler; lib_pickle looks them up in a reverse index of the modules.
+
+Run from the repository root, optionally with the number of extra modules:
+
+    python -m benchmark.bench_whichmodule [2000]
+"""
+import pickle as std_pickle
+import sys
+import time
+import types
+
+from benchmark.bench_util import best_time, print_table, reference_dumps
+from lib_pickle import pickle
+
+MODULE = "bench_whichmodule_globals"
+
+
+def function():
+    pass
+
+
+class Class:
+    pass
+
+
+class Singleton:
+    def __reduce__(self):
+        return "SINGLETON"
+
+
+def make_modules(n):
+    # n modules with a few functions and classes each, like a large
+    # application, and one holding the objects without __module__
+    for i in range(n):
+        module = types.ModuleType("bench_whichmodule_%d" % i)
+        for j in range(10):
+            exec("def f%d(): pass\nclass C%d: pass" % (j, j), vars(module))
+        sys.modules[module.__name__] = module
+    module = types.ModuleType(MODULE)
+    for obj in (function, Class, Singleton):
+        obj.__module__ = None
+        setattr(module, obj.__qualname__, obj)
+    module.SINGLETON = Singleton()
+    sys.modules[MODULE] = module
+    return module
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    module = make_modules(n)
+    objs = [module.function, module.Class, module.SINGLETON]
+    start = time.perf_counter()
+    pickle.whichmodule(module.function, "function")
+    first = time.perf_counter() - start
+    for protocol in (2, 4):
+        assert pickle.dumps(objs, protocol) == reference_dumps(objs, protocol)
+    rows = []
+    for name, obj in (("function", module.function),
+                      ("Class", module.Class),
+                      ("SINGLETON", module.SINGLETON)):
+        std = best_time(lambda: std_pickle.whichmodule(obj, name), number=20)
+        lib = best_time(lambda: pickle.whichmodule(obj, name), number=2000)
+        rows.append(("whichmodule(%s)" % name, "%.1f" % (std * 1e6),
+                     "%.1f" % (lib * 1e6), "%.0f" % (std / lib)))
+    for protocol in (2, 4):
+        std = best_time(lambda: reference_dumps(objs, protocol), number=20)
+        lib = best_time(lambda: pickle.dumps(objs, protocol), number=2000)
+        rows.append(("dumps, protocol %d" % protocol, "%.1f" % (std * 1e6),
+                     "%.1f" % (lib * 1e6), "%.0f" % (std / lib)))
+    print_table("%d modules; first lookup, building the index: %.1f ms"
+                % (len(sys.modules), first * 1e3),
+                ("", "std us", "us", "speedup"), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -25,17 +25,32 @@ Misc variables:
 
 import _compat_pickle
 import codecs
+import collections
 import io
+import mmap
+import os
+import pickletools
 import re
 import sys
+import weakref
+from _pickle import Unpickler as _CUnpickler
+from array import array, _array_reconstructor
+from bisect import bisect_left
 from copyreg import _extension_registry
 from copyreg import dispatch_table
-from functools import partial
-from itertools import islice
-from struct import pack
-from types import FunctionType
-
-__all__ = ["PickleError", "PicklingError", "UnpicklingError", "Pickler", "dump", "dumps"]
+from functools import lru_cache, partial
+from itertools import accumulate, chain, islice, repeat
+from struct import Struct, pack, pack_into, unpack
+from time import perf_counter
+from types import (BuiltinFunctionType, FunctionType, GetSetDescriptorType,
+                   ModuleType)
+
+__all__ = ["PickleError", "PicklingError", "UnpicklingError", "Pickler", "dump", "dumps",
+           "dumps_into", "dumps_view", "dump_shared_memory", "dump_async",
+           "parallel_dumps", "ValueMemo",
+           "RecordLogWriter", "RecordLogReader", "BufferStore",
+           "CompressedFrameWriter", "CompressedFrameReader",
+           "ProfilingPickler"]
 
 try:
     from _pickle import PickleBuffer
@@ -200,57 +215,249 @@ READONLY_BUFFER = b'\x98'  # make top of stack readonly
 __all__.extend([x for x in dir() if re.match("[A-Z][A-Z0-9_]+$", x)])
 
 
+class _VectoredSink:
+    # A file object for a file descriptor or a socket.  writev() gathers
+    # several buffers into one system call, so that a frame, or the end
+    # of a frame followed by the header and payload of a large object,
+    # costs a single write.
+
+    def __init__(self, send):
+        # send(buffers) writes a prefix of buffers and returns its length
+        self._send = send
+
+    def write(self, data):
+        self.writev([data])
+
+    def writev(self, buffers):
+        buffers = [memoryview(b).cast('B') for b in buffers if len(b)]
+        while buffers:
+            n = self._send(buffers)
+            # Drop what was written, which may end inside a buffer.
+            i = 0
+            while i < len(buffers) and n >= len(buffers[i]):
+                n -= len(buffers[i])
+                i += 1
+            del buffers[:i]
+            if n:
+                buffers[0] = buffers[0][n:]
+
+
+def _vectored_send(file):
+    # Return the send function of a _VectoredSink writing to file, or None
+    # if file is neither a file descriptor nor a socket.
+    if isinstance(file, int):
+        if hasattr(os, 'writev'):
+            return partial(os.writev, file)
+        return lambda buffers: os.write(file, buffers[0])
+    if not hasattr(file, 'write') and hasattr(file, 'send'):
+        if hasattr(file, 'sendmsg'):
+            return file.sendmsg
+        return lambda buffers: file.send(buffers[0])
+    return None
+
+
+def _maps_file(m):
+    # Whether mmap m maps a file, which it can grow or shrink with.  A
+    # shared anonymous map can't grow: the pages past its original size
+    # fault when touched.
+    try:
+        m.size()
+    except OSError:
+        return False
+    return True
+
+
+class _BufferSink:
+    # A file object writing to a writable buffer from its start.  A
+    # bytearray grows as needed, and so does an mmap of a file, remapped
+    # by resize() to twice its size or more; other buffers must be large
+    # enough.  If measure is true, what doesn't fit is only counted.
+
+    def __init__(self, buffer, measure=False):
+        self._buffer = buffer
+        self.resizable = (isinstance(buffer, mmap.mmap) and
+                          _maps_file(buffer))
+        if isinstance(buffer, bytearray) or self.resizable:
+            # An mmap can't be resized while a view of it exists
+            self._view = None
+        else:
+            self._view = memoryview(buffer).cast('B')
+        self._measure = measure
+        self.size = 0
+
+    def write(self, data):
+        start = self.size
+        with memoryview(data).cast('B') as data:
+            end = start + len(data)
+            if self._view is None:
+                buffer = self._buffer
+                if end > len(buffer) and self.resizable:
+                    buffer.resize(max(end, 2 * len(buffer)))
+                buffer[start:end] = data
+            elif end > len(self._view):
+                if not self._measure:
+                    raise ValueError("buffer too small: the pickle is longer "
+                                     "than %d bytes" % len(self._view))
+            else:
+                self._view[start:end] = data
+        self.size = end
+
+    def release(self):
+        if self._view is not None:
+            self._view.release()
+
+
+# The types of file whose write() is done with the data by the time it
+# returns, so that the framer can hand it views of its own buffer.
+_COPYING_FILE_TYPES = frozenset([io.BytesIO, io.BufferedWriter,
+                                 io.BufferedRandom, io.FileIO,
+                                 _VectoredSink, _BufferSink])
+
+
 class _Framer:
     _FRAME_SIZE_MIN = 4
     _FRAME_SIZE_TARGET = 64 * 1024
+    # Room left at the start of the buffer for the FRAME opcode and size
+    _FRAME_HEADER_SIZE = 9
 
-    def __init__(self, file_write):
+    def __init__(self, file_write, file_writev=None, buffer=None):
         self.file_write = file_write
-        self.current_frame = None
+        self.file_writev = file_writev
+        # Everything is written to a single bytearray, reused from frame
+        # to frame, and reaches the file in one write() per frame.  The
+        # same buffer coalesces the writes of protocols without framing.
+        # If a buffer is given, the pickle is built in place in it and
+        # never written out.
+        self._in_place = buffer is not None
+        if buffer is None:
+            buffer = bytearray()
+        self.current_frame = buffer
+        self.write = buffer.extend
+        self._zero_copy = (type(getattr(file_write, '__self__', None))
+                           in _COPYING_FILE_TYPES)
+        # Where the data of the last dump() ends in the buffer
+        self._base = len(buffer)
+        self.clear()
+
+    def clear(self):
+        # Drop anything left over by a dump() that failed.
+        del self.current_frame[self._base:]
+        self.framing = False
+        self._frame_start = self._base
+        self._frame_limit = self._base + self._FRAME_SIZE_TARGET
 
     def start_framing(self):
-        self.current_frame = io.BytesIO()
+        # Flush what precedes the first frame (the PROTO opcode) and
+        # reserve the header of the frame.
+        self.flush()
+        self.framing = True
+        self._reserve_header()
+
+    def _reserve_header(self):
+        frame = self.current_frame
+        frame += bytes(self._FRAME_HEADER_SIZE)
+        self._frame_start = len(frame)
+        self._frame_limit = self._frame_start + self._FRAME_SIZE_TARGET
 
     def end_framing(self):
-        if self.current_frame and self.current_frame.tell() > 0:
-            self.commit_frame(force=True)
-            self.current_frame = None
+        self.flush()
+        if self._in_place:
+            if self.framing:
+                # Nothing follows the last frame
+                del self.current_frame[-self._FRAME_HEADER_SIZE:]
+            self._base = len(self.current_frame)
+        self.clear()
 
     def commit_frame(self, force=False):
-        if self.current_frame:
-            f = self.current_frame
-            if f.tell() >= self._FRAME_SIZE_TARGET or force:
-                data = f.getbuffer()
-                write = self.file_write
-                if len(data) >= self._FRAME_SIZE_MIN:
-                    # Issue a single call to the write method of the underlying
-                    # file object for the frame opcode with the size of the
-                    # frame. The concatenation is expected to be less expensive
-                    # than issuing an additional call to write.
-                    write(FRAME + pack("<Q", len(data)))
-
-                # Issue a separate call to write to append the frame
-                # contents without concatenation to the above to avoid a
-                # memory copy.
-                write(data)
-
-                # Start the new frame with a new io.BytesIO instance so that
-                # the file object can have delayed access to the previous frame
-                # contents via an unreleased memoryview of the previous
-                # io.BytesIO instance.
-                self.current_frame = io.BytesIO()
-
-    def write(self, data):
-        if self.current_frame:
-            return self.current_frame.write(data)
+        if len(self.current_frame) >= self._frame_limit or force:
+            self.flush()
+
+    def flush(self, *large):
+        # Write out the buffer.  The header and payload of a large object,
+        # if given, follow it in the same call to writev().
+        frame = self.current_frame
+        start = self._frame_start
+        size = len(frame) - start
+        if self._in_place:
+            self._end_frame_in_place(size, large)
+            return
+        if size <= 0 and not large:
+            return
+        if self.framing and size >= self._FRAME_SIZE_MIN:
+            # Fill in the header reserved at the start of the buffer so
+            # that the frame opcode and the frame contents go out in a
+            # single call to the write method of the underlying file.
+            start -= self._FRAME_HEADER_SIZE
+            pack_into("<cQ", frame, start, FRAME, size)
+        with memoryview(frame)[start:] as data:
+            if self.file_writev is not None:
+                self.file_writev([data, *large])
+            elif self._zero_copy:
+                self.file_write(data)
+            else:
+                # The file object may keep a reference to what it is given,
+                # so it gets a copy rather than a view of the buffer, which
+                # is about to be overwritten.
+                self.file_write(bytes(data))
+        del frame[self._frame_start:]
+
+    def _end_frame_in_place(self, size, large):
+        frame = self.current_frame
+        if not self.framing:
+            for data in large:
+                frame += data
+            self._frame_start = len(frame)
+            self._frame_limit = self._frame_start + self._FRAME_SIZE_TARGET
+            return
+        start = self._frame_start - self._FRAME_HEADER_SIZE
+        if size >= self._FRAME_SIZE_MIN:
+            pack_into("<cQ", frame, start, FRAME, size)
+        else:
+            del frame[start:self._frame_start]
+        for data in large:
+            frame += data
+        self._reserve_header()
+
+    def write_batch(self, data, ends):
+        # Write data, the encodings of several objects concatenated, where
+        # ends holds the offset at which each object ends.  The frame is
+        # committed exactly where separate save() calls for the objects
+        # would have committed it: before an object, once the frame is full.
+        frame = self.current_frame
+        if not self.framing:
+            frame += data
+            return
+        size = len(data)
+        start = 0
+        with memoryview(data) as view:
+            while start < size:
+                self.commit_frame()
+                # The object that fills the frame is the last one written to
+                # it before committing.
+                limit = start + self._frame_limit - len(frame)
+                i = bisect_left(ends, limit)
+                end = ends[i] if i < len(ends) else size
+                frame += view[start:end]
+                start = end
+
+    def write_pieces(self, pieces):
+        # Same as write_batch() for a list of encoded objects.
+        data = b''.join(pieces)
+        frame = self.current_frame
+        if (not self.framing or
+                len(frame) + len(data) - len(pieces[-1]) < self._frame_limit):
+            # No frame boundary within the batch
+            frame += data
         else:
-            return self.file_write(data)
+            self.write_batch(data, list(accumulate(map(len, pieces))))
 
     def write_large_bytes(self, header, payload):
+        if self.file_writev is not None or self._in_place:
+            self.flush(header, payload)
+            return
         write = self.file_write
-        if self.current_frame:
-            # Terminate the current frame and flush it to the file.
-            self.commit_frame(force=True)
+        # Terminate the current frame and flush it to the file.
+        self.flush()
 
         # Perform direct write of the header and payload of the large binary
         # object. Be careful not to concatenate the header and the payload
@@ -259,11 +466,21 @@ class _Framer:
         # We intentionally do not insert a protocol 4 frame opcode to make
         # it possible to optimize file.read calls in the loader.
         write(header)
+        if isinstance(payload, memoryview) and not self._zero_copy:
+            # The file may keep what it is given, and the view may be
+            # released, or its buffer modified, once this returns.
+            payload = payload.tobytes()
         write(payload)
 
 
 # Tools used for pickling.
 
+# Yielded to the iterative engine by the generators of containers after a
+# batch of items encoded in one go, which yields none of them, so that the
+# engine may pause there (see _Pickler._run_work_stack()).
+_PAUSE = object()
+
+
 def _getattribute(obj, name):
     for subpath in name.split('.'):
         if subpath == '<locals>':
@@ -278,24 +495,254 @@ def _getattribute(obj, name):
     return obj, parent
 
 
+class _ModuleIndex:
+    # Reverse index used by whichmodule() for objects with no __module__.
+    # It maps (id(obj), name) to the name of a module from which name gets
+    # obj, and that module.  It is built from the module globals, for the
+    # values that have no __module__ either, and brought up to date when
+    # sys.modules changes.  Every hit is checked against the module before
+    # it is returned, so a stale entry (a replaced or reloaded module, a
+    # reused id) only costs a scan of sys.modules, like a miss.
+
+    # Values of these types are never pickled as globals
+    _skipped_types = frozenset([type(None), bool, int, float, str, bytes,
+                                tuple, list, dict, set, frozenset,
+                                ModuleType])
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.entries = {}
+        # Maps module names to the module indexed and the keys it added
+        self.modules = {}
+        self.size = -1
+
+    def find(self, obj, name):
+        """Return the name of a module in which name is obj, or None."""
+        key = (id(obj), name)
+        if len(sys.modules) != self.size:
+            self.sync()
+        entry = self.entries.get(key)
+        if entry is not None and self._holds(entry, obj, name):
+            return entry[0]
+        # A module may have been replaced since the last sync
+        self.sync()
+        entry = self.entries.get(key)
+        if entry is not None and self._holds(entry, obj, name):
+            return entry[0]
+        return self._scan(obj, name, key)
+
+    def _holds(self, entry, obj, name):
+        module_name, module = entry
+        if sys.modules.get(module_name) is not module:
+            return False
+        try:
+            return _getattribute(module, name)[0] is obj
+        except AttributeError:
+            return False
+
+    def sync(self):
+        # Index the modules added to sys.modules or replaced in it since
+        # the last call, and forget the ones that left it.
+        current = sys.modules.copy()
+        modules = self.modules
+        for module_name in list(modules):
+            if current.get(module_name) is not modules[module_name][0]:
+                self._forget(module_name)
+        for module_name, module in current.items():
+            if (module_name in modules
+                    or module_name == '__main__'
+                    or module_name == '__mp_main__'  # bpo-42406
+                    or module is None):
+                continue
+            self._index(module_name, module)
+        self.size = len(current)
+
+    def _index(self, module_name, module):
+        entries = self.entries
+        skipped_types = self._skipped_types
+        keys = []
+        try:
+            namespace = list(vars(module).items())
+        except TypeError:
+            namespace = []
+        for name, value in namespace:
+            if type(value) in skipped_types:
+                continue
+            try:
+                if getattr(value, '__module__', None) is not None:
+                    continue
+            except Exception:
+                continue
+            key = (id(value), name)
+            # Like the scan, prefer the module that comes first
+            if key not in entries:
+                entries[key] = (module_name, module)
+                keys.append(key)
+        self.modules[module_name] = (module, keys)
+
+    def _forget(self, module_name):
+        module, keys = self.modules.pop(module_name)
+        entries = self.entries
+        for key in keys:
+            entry = entries.get(key)
+            if entry is not None and entry[1] is module:
+                del entries[key]
+
+    def _scan(self, obj, name, key):
+        # Protect the iteration by using a list copy of sys.modules against
+        # dynamic modules that trigger imports of other modules upon calls
+        # to getattr.
+        for module_name, module in sys.modules.copy().items():
+            if (module_name == '__main__'
+                    or module_name == '__mp_main__'  # bpo-42406
+                    or module is None):
+                continue
+            try:
+                if _getattribute(module, name)[0] is not obj:
+                    continue
+            except AttributeError:
+                continue
+            indexed = self.modules.get(module_name)
+            if indexed is not None and indexed[0] is module:
+                self.entries[key] = (module_name, module)
+                indexed[1].append(key)
+            return module_name
+        return None
+
+
+_module_index = _ModuleIndex()
+
+
 def whichmodule(obj, name):
     """Find the module an object belong to."""
     module_name = getattr(obj, '__module__', None)
     if module_name is not None:
         return module_name
-    # Protect the iteration by using a list copy of sys.modules against dynamic
-    # modules that trigger imports of other modules upon calls to getattr.
-    for module_name, module in sys.modules.copy().items():
-        if (module_name == '__main__'
-                or module_name == '__mp_main__'  # bpo-42406
-                or module is None):
-            continue
+    module_name = _module_index.find(obj, name)
+    if module_name is not None:
+        return module_name
+    return '__main__'
+
+
+class _GlobalRef:
+    # What save_global() found out about a class or function: the module
+    # it lives in and its parent there, the key of its extension code, and
+    # the opcodes encoded for it so far.  Refs are shared by all picklers
+    # in _global_refs, keyed by (id(obj), name), and only live as long as
+    # their object, which they don't keep alive.  Before each use, check()
+    # makes sure the name still leads to the object, so that a reloaded or
+    # replaced module, or a changed __module__, gets the global resolved
+    # again.  Extension codes are looked up on every use, since copyreg can
+    # change them at any time.
+
+    __slots__ = ('ref', 'module_name', 'module', 'name', 'ext_key',
+                 'globals', 'stack_args')
+
+    def __init__(self, module_name, module, name):
+        self.ref = None
+        self.module_name = module_name
+        # The module holds the object, so it isn't kept alive here either
+        try:
+            self.module = weakref.ref(module)
+        except TypeError:
+            # Anything can be put in sys.modules
+            self.module = partial(_identity, module)
+        self.name = name
+        self.ext_key = (module_name, name)
+        # GLOBAL opcodes, keyed by (proto >= 3, fix_imports)
+        self.globals = {}
+        # Encoded STACK_GLOBAL arguments, once known to be short
+        self.stack_args = None
+
+    def check(self, obj, module_name):
+        # Return the parent of obj, or None if this ref no longer applies
+        module = self.module()
+        if (module is None or self.ref() is not obj or
+                module_name != self.module_name or
+                sys.modules.get(module_name) is not module):
+            return None
+        name = self.name
+        if '.' not in name:
+            if getattr(module, name, None) is obj:
+                return module
+            return None
         try:
-            if _getattribute(module, name)[0] is obj:
-                return module_name
+            obj2, parent = _getattribute(module, name)
         except AttributeError:
-            pass
-    return '__main__'
+            return None
+        if obj2 is not obj:
+            return None
+        return parent
+
+
+_global_refs = {}
+
+
+def _forget_global_ref(key, wr):
+    ref = _global_refs.get(key)
+    if ref is not None and ref.ref is wr:
+        _global_refs.pop(key, None)
+
+
+def _resolve_global(obj, name):
+    # Find obj as name in its module, and return its parent and a
+    # _GlobalRef, which is kept in _global_refs when possible.
+    module_name = whichmodule(obj, name)
+    try:
+        __import__(module_name, level=0)
+        module = sys.modules[module_name]
+        obj2, parent = _getattribute(module, name)
+    except (ImportError, KeyError, AttributeError):
+        raise PicklingError(
+            "Can't lib_pickle %r: it's not found as %s.%s" %
+            (obj, module_name, name)) from None
+    else:
+        if obj2 is not obj:
+            raise PicklingError(
+                "Can't lib_pickle %r: it's not the same object as %s.%s" %
+                (obj, module_name, name))
+    ref = _GlobalRef(module_name, module, name)
+    # Objects found by scanning sys.modules are left to whichmodule()
+    if getattr(obj, '__module__', None) is not None:
+        key = (id(obj), name)
+        try:
+            ref.ref = weakref.ref(obj, partial(_forget_global_ref, key))
+        except TypeError:
+            # Built-in functions live as long as their module
+            if type(obj) is BuiltinFunctionType:
+                ref.ref = partial(_identity, obj)
+        if ref.ref is not None:
+            _global_refs[key] = ref
+    return parent, ref
+
+
+def _identity(obj):
+    return obj
+
+
+def _encode_short_str(obj):
+    # Return obj as save_str() writes it with protocol 4, or None if it is
+    # too long to go in a frame.
+    encoded = obj.encode('utf-8', 'surrogatepass')
+    n = len(encoded)
+    if n <= 0xff:
+        return SHORT_BINUNICODE + pack("<B", n) + encoded
+    if n < _Framer._FRAME_SIZE_TARGET:
+        return BINUNICODE + pack("<I", n) + encoded
+    return None
+
+
+def _interleave_opcode(opcode, data, size):
+    # Turn data, the packed arguments of several opcodes of size bytes each,
+    # into the opcodes themselves by inserting opcode before every argument.
+    n = len(data) // size
+    result = bytearray((size + 1) * n)
+    result[::size + 1] = opcode * n
+    for i in range(size):
+        result[i + 1::size + 1] = data[i::size]
+    return result
 
 
 def encode_long(x):
@@ -350,12 +797,370 @@ def decode_long(data):
     return int.from_bytes(data, byteorder='little', signed=True)
 
 
+class ValueMemo:
+    """Table used by Pickler(..., value_memo=...) to pickle equal values once.
+
+    The regular memo recognizes objects by identity.  This table remembers
+    the memo index of str and bytes objects, and of tuples and frozensets
+    holding only strs, bytes, ints, floats, bools and None, by value, so
+    that a later equal but distinct object is pickled as a memo GET.  The
+    unpickled objects are then shared.
+
+    Values whose payload (UTF-8 or raw length, summed over the items of
+    tuples and frozensets) is smaller than *min_size* are left alone.  At
+    most *max_entries* values are remembered; past that the oldest ones
+    are forgotten.
+
+    The statistics (hits, bytes_saved, evictions) accumulate over the
+    lifetime of the table; bytes_saved counts the payload bytes of the
+    values replaced by a GET, minus the size of the GET opcodes.
+    """
+
+    def __init__(self, min_size=8, max_entries=65536):
+        if max_entries < 1:
+            raise ValueError("max_entries must be positive")
+        self.min_size = min_size
+        self.max_entries = max_entries
+        self.table = {}
+        self.hits = 0
+        self.bytes_saved = 0
+        self.evictions = 0
+
+    def clear(self):
+        """Forget all values, keeping the statistics."""
+        self.table.clear()
+
+    def stats(self):
+        """Return the statistics as a dict."""
+        return {"entries": len(self.table), "hits": self.hits,
+                "bytes_saved": self.bytes_saved, "evictions": self.evictions}
+
+    def key(self, obj):
+        # Return (key, size) for obj, or None if obj is not eligible.  Keys
+        # must only compare equal for values that pickle the same, so the
+        # items of tuples and frozensets are tagged with their exact type
+        # (1, 1.0 and True are equal) and floats are compared bitwise (so
+        # are 0.0 and -0.0).
+        t = type(obj)
+        if t is str or t is bytes:
+            size = len(obj)
+            key = obj
+        elif t is tuple or t is frozenset:
+            size = 0
+            items = []
+            for x in obj:
+                tx = type(x)
+                if tx is str or tx is bytes:
+                    size += len(x)
+                elif tx is float:
+                    size += 8
+                    x = pack(">d", x)
+                elif tx is int or tx is bool:
+                    size += 4
+                elif x is not None:
+                    return None
+                items.append((tx, x))
+            key = (t, t(items))
+        else:
+            return None
+        if size < self.min_size:
+            return None
+        return key, size
+
+    def get(self, key):
+        return self.table.get(key)
+
+    def add(self, key, idx):
+        table = self.table
+        if len(table) >= self.max_entries:
+            del table[next(iter(table))]
+            self.evictions += 1
+        table[key] = idx
+
+
+_dict_setitem = dict.__setitem__
+
+
+class _Memo(dict):
+    # The Pickler memo.  It maps id(obj) to the memo key of obj like the
+    # plain dict memo did, but keeps obj alive in a list indexed by memo
+    # key instead of in a (key, obj) tuple stored with every entry.
+    # Reading or writing an entry with [] still gives or takes a
+    # (key, obj) tuple, for code written against the plain dict memo;
+    # the pickler itself uses lookup() and add().
+    __slots__ = ('objects',)
+
+    def __init__(self, *args, **kwargs):
+        self.objects = []
+        if args or kwargs:
+            self.update(*args, **kwargs)
+
+    # Return the memo key for an id, or None
+    lookup = dict.get
+
+    def add(self, key, idx, obj):
+        objects = self.objects
+        if idx == len(objects):
+            objects.append(obj)
+        else:
+            if idx > len(objects):
+                objects.extend([None] * (idx - len(objects)))
+                objects.append(obj)
+            else:
+                objects[idx] = obj
+        _dict_setitem(self, key, idx)
+
+    def __getitem__(self, key):
+        idx = dict.__getitem__(self, key)
+        return idx, self.objects[idx]
+
+    def get(self, key, default=None):
+        idx = dict.get(self, key)
+        if idx is None:
+            return default
+        return idx, self.objects[idx]
+
+    def __setitem__(self, key, value):
+        idx, obj = value
+        self.add(key, idx, obj)
+
+    def __delitem__(self, key):
+        self.objects[dict.pop(self, key)] = None
+
+    def pop(self, key, *default):
+        if key not in self and default:
+            return default[0]
+        value = self[key]
+        del self[key]
+        return value
+
+    def popitem(self):
+        key, idx = dict.popitem(self)
+        obj = self.objects[idx]
+        self.objects[idx] = None
+        return key, (idx, obj)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self):
+        dict.clear(self)
+        self.objects = []
+
+    def values(self):
+        objects = self.objects
+        return [(idx, objects[idx]) for idx in dict.values(self)]
+
+    def items(self):
+        objects = self.objects
+        return [(key, (idx, objects[idx]))
+                for key, idx in dict.items(self)]
+
+    def copy(self):
+        return dict(self.items())
+
+
+_HEAPTYPE = 1 << 9  # Py_TPFLAGS_HEAPTYPE
+
+_object_reduce_ex = object.__reduce_ex__
+_object_reduce = object.__reduce__
+_object_getstate = getattr(object, '__getstate__', None)
+_object_getattribute = object.__getattribute__
+
+
+class _PlainClass:
+    pass
+
+
+# The instance layout of a class defined in Python with no base but object
+_PLAIN_LAYOUT = (_PlainClass.__basicsize__, _PlainClass.__dictoffset__,
+                 _PlainClass.__weakrefoffset__)
+
+
+def _has_default_reduce(cls):
+    # Whether object.__reduce_ex__() reduces the instances of cls to
+    # copyreg.__newobj__(cls) with their __dict__, or None, as state, and
+    # nothing else: cls is defined in Python with no C base but object, has
+    # no __slots__, and doesn't override any of the methods involved.  C
+    # extension types can be heap types too, so the instance layout and
+    # __new__() tell them apart from Python classes.
+    mro = cls.__mro__
+    if len(mro) < 2 or mro[-1] is not object:
+        return False
+    for c in mro[:-1]:
+        if not c.__flags__ & _HEAPTYPE:
+            return False
+        if (c.__basicsize__, c.__dictoffset__,
+                c.__weakrefoffset__) != _PLAIN_LAYOUT:
+            return False
+        d = c.__dict__
+        if '__slots__' in d:
+            return False
+        descr = d.get('__dict__')
+        if descr is not None and type(descr) is not GetSetDescriptorType:
+            return False
+    return cls.__new__ is object.__new__ and _reduce_unchanged(cls)
+
+
+def _reduce_unchanged(cls):
+    # The part of _has_default_reduce() that can change after the class is
+    # created, cheap enough to check for every instance.
+    return (cls.__reduce_ex__ is _object_reduce_ex and
+            cls.__reduce__ is _object_reduce and
+            getattr(cls, '__getstate__', None) is _object_getstate and
+            cls.__getattribute__ is _object_getattribute and
+            getattr(cls, '__getnewargs_ex__', None) is None and
+            getattr(cls, '__getnewargs__', None) is None)
+
+
+def _instance_overrides_reduce(state):
+    # Whether the __dict__ of an instance overrides one of the methods that
+    # pickling looks up on the instance rather than on its class
+    return ('__reduce_ex__' in state or '__reduce__' in state or
+            '__getstate__' in state)
+
+
+# Save strategies shared by the picklers of each class, keyed by
+# configuration (see _Pickler._refresh_save_strategies())
+_shared_strategies = weakref.WeakKeyDictionary()
+
+
+# The types that _Pickler._save_scalars() encodes itself
+_SCALAR_TYPES = frozenset([str, int, float, bool, type(None)])
+
+# The types that Pickler(..., buffer_threshold=...) saves out-of-band
+_OUT_OF_BAND_TYPES = frozenset([bytes, bytearray, memoryview, array])
+
+
+@lru_cache()
+def _array_mformat_code(typecode):
+    # The machine format code that array._array_reconstructor() takes for
+    # the items of an array with this typecode, in the native byte order
+    return array(typecode).__reduce_ex__(3)[1][2]
+
+
+# BININT1, BINGET and BINPUT opcodes for every value they can hold, indexed
+# by value
+_bbinint1 = [BININT1 + pack("<B", i) for i in range(256)]
+_bbinget = [BINGET + pack("<B", i) for i in range(256)]
+_bbinput = [BINPUT + pack("<B", i) for i in range(256)]
+# Headers of the SHORT_BINUNICODE and BINUNICODE opcodes of the strs encoded
+# in fewer than 256 bytes, indexed by length
+_short_binunicode = [SHORT_BINUNICODE + pack("<B", n) for n in range(256)]
+_binunicode = [BINUNICODE + pack("<I", n) for n in range(256)]
+# The pack() of the formats used for every scalar, compiled once
+_pack_binint = Struct("<ci").pack
+_pack_binfloat = Struct(">cd").pack
+_pack_long_memo = Struct("<cI").pack
+
+
+def _escape_unicode(obj):
+    # The argument of the UNICODE opcode is encoded with raw-unicode-escape,
+    # which leaves these alone.  Return obj itself if nothing was escaped.
+    obj = obj.replace("\\", "\\u005c")
+    obj = obj.replace("\0", "\\u0000")
+    obj = obj.replace("\n", "\\u000a")
+    obj = obj.replace("\r", "\\u000d")
+    obj = obj.replace("\x1a", "\\u001a")  # EOF on DOS
+    return obj
+
+
+def _encode_text_str(obj):
+    # Return the opcode that save_str() writes for obj with protocol 0, or
+    # None if obj has to be escaped: save_str() memoizes the escaped str
+    # then, a new object that has to be made anyway.
+    if _escape_unicode(obj) is not obj:
+        return None
+    return UNICODE + obj.encode('raw-unicode-escape') + b'\n'
+
+
+# Protocol 0 opcodes with a decimal argument, to be formatted with %
+_TEXT_PUT = PUT + b'%d\n'
+_TEXT_GET = GET + b'%d\n'
+_TEXT_INT = INT + b'%d\n'
+_TEXT_LONG = LONG + b'%dL\n'
+_TEXT_FLOAT = FLOAT + b'%r\n'
+
+
+class _ConstantPool:
+    # The opcodes of the most common constants, encoded once for a group of
+    # protocols that encode them the same way (see _constant_pool()): ints
+    # from -256 to 65535 and bools.  Protocol 0 also has an LRU cache of
+    # recently used short strs, whose escaping is costly, and the PUT and
+    # GET opcodes of the first memo keys.  Only the encoding is cached;
+    # strs are memoized as usual.  The binary protocols encode strs inline:
+    # the call to the cache costs more than the encoding it saves, unless
+    # the same values come back in distinct objects.
+
+    SMALLEST_INT = -256
+    LARGEST_INT = 0xffff
+    # Longest str, in code points, that goes through the str cache
+    SHORT_STR = 64
+    STR_CACHE_SIZE = 4096
+    # Number of memo keys whose protocol 0 PUT and GET opcodes are kept
+    MEMO_KEYS = 4096
+
+    def __init__(self, proto, ints):
+        # ints[i - SMALLEST_INT] is the opcode of int i
+        self.ints = ints
+        # Indexed by False and True
+        if proto >= 2:
+            self.bools = (NEWFALSE, NEWTRUE)
+        else:
+            self.bools = (FALSE, TRUE)
+        # encode_str(obj) is the protocol 0 opcode of a short str, or None
+        # for a str that has to be escaped
+        if proto >= 1:
+            self.encode_str = None
+            self.puts = self.gets = None
+            # What _Pickler._save_scalars() needs, unpacked in one go
+            self.scalars = (ints, self.SMALLEST_INT, self.LARGEST_INT,
+                            self.bools, proto >= 4,
+                            _short_binunicode if proto >= 4 else _binunicode)
+        else:
+            self.encode_str = lru_cache(self.STR_CACHE_SIZE)(
+                _encode_text_str)
+            self.puts = [_TEXT_PUT % i for i in range(self.MEMO_KEYS)]
+            self.gets = [_TEXT_GET % i for i in range(self.MEMO_KEYS)]
+
+
+_constant_pools = {}
+
+
+def _constant_pool(proto):
+    """Return the _ConstantPool of a protocol, building it on first use."""
+    # Protocols 2 and 3, and 4 and 5, encode all the constants the same way
+    group = proto if proto < 2 else min(proto, 4) // 2 * 2
+    pool = _constant_pools.get(group)
+    if pool is None:
+        ints = _constant_pools.get((proto >= 1, "ints"))
+        if ints is None:
+            lo = _ConstantPool.SMALLEST_INT
+            hi = _ConstantPool.LARGEST_INT
+            if proto >= 1:
+                ints = ([BININT + pack("<i", i) for i in range(lo, 0)] +
+                        _bbinint1 +
+                        [BININT2 + pack("<H", i) for i in range(256, hi + 1)])
+            else:
+                ints = [_TEXT_INT % i for i in range(lo, hi + 1)]
+            _constant_pools[(proto >= 1, "ints")] = ints
+        pool = _constant_pools[group] = _ConstantPool(group, ints)
+    return pool
+
+
 # Pickling machinery
 
 class _Pickler:
 
     def __init__(self, file, protocol=None, *, fix_imports=True,
-                 buffer_callback=None):
+                 buffer_callback=None, iterative=False, value_memo=False,
+                 fast=False, buffer_threshold=None):
         """This takes a binary file for writing a lib_pickle data stream.
 
         The optional *protocol* argument tells the pickler to use the
@@ -371,7 +1176,11 @@ class _Pickler:
         The *file* argument must have a write() method that accepts a
         single bytes argument. It can thus be a file object opened for
         binary writing, an io.BytesIO instance, or any other custom
-        object that meets this interface.
+        object that meets this interface.  It can also be a file
+        descriptor or a blocking socket, in which case each frame, and
+        each large object together with the end of the frame before it,
+        is written with a single os.writev() or socket.sendmsg() call.
+        If it is a bytearray, the pickle is appended to it in place.
 
         If *fix_imports* is True and *protocol* is less than 3, lib_pickle
         will try to map the new Python 3 names to the old module names
@@ -388,6 +1197,32 @@ class _Pickler:
 
         It is an error if *buffer_callback* is not None and *protocol*
         is None or smaller than 5.
+
+        If *buffer_threshold* is not None, bytes, bytearray, memoryview
+        and array.array objects of at least that many bytes are passed to
+        *buffer_callback* as if they were wrapped in a PickleBuffer, and
+        rebuilt from the buffer it gives back when loading: bytes,
+        bytearray and array.array objects as copies, memoryviews as the
+        buffer itself.  A BufferStore is a *buffer_callback* that keeps
+        these buffers in a file.  *buffer_callback* is then required.
+
+        If *iterative* is true, nested containers and the results of
+        reduce() are saved from an explicit work stack instead of through
+        recursive calls, so the nesting depth of the pickled object is only
+        limited by memory, not by the recursion limit.  The output is the
+        same.
+
+        If *value_memo* is true, equal strs and bytes, and equal tuples and
+        frozensets of such scalars, are pickled once and referred to by
+        memo GETs afterwards even when they are distinct objects.  Pass a
+        ValueMemo instance to choose its size threshold and bound, and to
+        read its statistics after pickling.
+
+        If *fast* is true, nothing is memoized: no PUT or MEMOIZE opcodes
+        are written, and an object referred to more than once is pickled
+        in full every time.  This is faster, and gives shorter pickles,
+        for data without shared objects.  A recursive object raises
+        PicklingError instead of being pickled.
         """
         if protocol is None:
             protocol = DEFAULT_PROTOCOL
@@ -397,19 +1232,56 @@ class _Pickler:
             raise ValueError("lib_pickle protocol must be <= %d" % HIGHEST_PROTOCOL)
         if buffer_callback is not None and protocol < 5:
             raise ValueError("buffer_callback needs protocol >= 5")
+        if buffer_threshold is not None and buffer_callback is None:
+            raise ValueError("buffer_threshold needs a buffer_callback")
         self._buffer_callback = buffer_callback
-        try:
-            self._file_write = file.write
-        except AttributeError:
-            raise TypeError("file must have a 'write' attribute")
-        self.framer = _Framer(self._file_write)
+        self._buffer_threshold = buffer_threshold
+        file_writev = None
+        buffer = None
+        send = _vectored_send(file)
+        if send is not None:
+            file = _VectoredSink(send)
+            file_writev = file.writev
+        if isinstance(file, bytearray):
+            buffer = file
+            self._file_write = buffer.extend
+        else:
+            try:
+                self._file_write = file.write
+            except AttributeError:
+                raise TypeError("file must have a 'write' attribute")
+        self.framer = _Framer(self._file_write, file_writev, buffer)
         self.write = self.framer.write
         self._write_large_bytes = self.framer.write_large_bytes
-        self.memo = {}
+        self.memo = _Memo()
         self.proto = int(protocol)
         self.bin = protocol >= 1
-        self.fast = 0
+        self._constants = _constant_pool(self.proto)
+        self.fast = fast
+        self._in_progress = set()
+        self._reducing = set()
         self.fix_imports = fix_imports and protocol < 3
+        self.iterative = iterative
+        if value_memo is True:
+            value_memo = ValueMemo()
+        elif not value_memo:
+            value_memo = None
+        else:
+            value_memo.clear()
+        self.value_memo = value_memo
+        self._save_config = self._save_tables = None
+        self._refresh_save_strategies()
+
+    @property
+    def memo(self):
+        return self._memo
+
+    @memo.setter
+    def memo(self, memo):
+        # Like the memo of _pickle.Pickler, an assigned dict is copied.
+        if type(memo) is not _Memo:
+            memo = _Memo(memo)
+        self._memo = memo
 
     def clear_memo(self):
         """Clears the pickler's "memo".
@@ -420,6 +1292,8 @@ class _Pickler:
         useful when re-using picklers.
         """
         self.memo.clear()
+        if self.value_memo is not None:
+            self.value_memo.clear()
 
     def dump(self, obj):
         """Write a pickled representation of obj to the open file."""
@@ -428,13 +1302,37 @@ class _Pickler:
         if not hasattr(self, "_file_write"):
             raise PicklingError("Pickler.__init__() was not called by "
                                 "%s.__init__()" % (self.__class__.__name__,))
-        if self.proto >= 2:
-            self.write(PROTO + pack("<B", self.proto))
-        if self.proto >= 4:
-            self.framer.start_framing()
-        self.save(obj)
-        self.write(STOP)
-        self.framer.end_framing()
+        self._refresh_save_strategies()
+        self.framer.clear()
+        try:
+            if self.proto >= 2:
+                self.write(PROTO + pack("<B", self.proto))
+            if self.proto >= 4:
+                self.framer.start_framing()
+            self.save(obj)
+            self.write(STOP)
+            self.framer.end_framing()
+        except BaseException:
+            # Don't leave part of the pickle in the framer's buffer
+            self.framer.clear()
+            raise
+
+    def _dump_steps(self, obj, checkpoint):
+        # dump() on the iterative engine, as a generator that pauses
+        # whenever checkpoint() returns true before saving an object.
+        self._refresh_save_strategies()
+        self.framer.clear()
+        try:
+            if self.proto >= 2:
+                self.write(PROTO + pack("<B", self.proto))
+            if self.proto >= 4:
+                self.framer.start_framing()
+            yield from self._run_work_stack(iter((obj,)), checkpoint)
+            self.write(STOP)
+            self.framer.end_framing()
+        except BaseException:
+            self.framer.clear()
+            raise
 
     def memoize(self, obj):
         """Store an object in the memo."""
@@ -453,10 +1351,17 @@ class _Pickler:
         # growable) array, indexed by memo key.
         if self.fast:
             return
-        assert id(obj) not in self.memo
-        idx = len(self.memo)
+        memo = self._memo
+        assert id(obj) not in memo
+        idx = len(memo)
         self.write(self.put(idx))
-        self.memo[id(obj)] = idx, obj
+        objects = memo.objects
+        if idx == len(objects):
+            # Same as memo.add(), without the call
+            _dict_setitem(memo, id(obj), idx)
+            objects.append(obj)
+        else:
+            memo.add(id(obj), idx, obj)
 
     # Return a PUT (BINPUT, LONG_BINPUT) opcode string, with argument i.
     def put(self, idx):
@@ -467,8 +1372,10 @@ class _Pickler:
                 return BINPUT + pack("<B", idx)
             else:
                 return LONG_BINPUT + pack("<I", idx)
+        elif idx < _ConstantPool.MEMO_KEYS:
+            return self._constants.puts[idx]
         else:
-            return PUT + repr(idx).encode("ascii") + b'\n'
+            return _TEXT_PUT % idx
 
     # Return a GET (BINGET, LONG_BINGET) opcode string, with argument i.
     def get(self, i):
@@ -477,61 +1384,489 @@ class _Pickler:
                 return BINGET + pack("<B", i)
             else:
                 return LONG_BINGET + pack("<I", i)
-
-        return GET + repr(i).encode("ascii") + b'\n'
+        if i < _ConstantPool.MEMO_KEYS:
+            return self._constants.gets[i]
+        return _TEXT_GET % i
+
+    def _refresh_save_strategies(self):
+        # save() resolves the way to pickle each concrete type only once and
+        # caches the result.  The cached strategies depend on which hooks
+        # this pickler defines and on the reduction tables it consults, so
+        # they are thrown away whenever that configuration changes (e.g. a
+        # dispatch_table attribute assigned after __init__()).  Picklers of
+        # the same class and configuration that use the stock tables share
+        # their strategies, so a new pickler doesn't resolve them again.
+        persistent_id = getattr(self.persistent_id, '__func__',
+                                self.persistent_id)
+        has_persistent_id = persistent_id is not _Pickler.persistent_id
+        has_reducer_override = (
+            getattr(self, "reducer_override", None) is not None)
+        table = getattr(self, 'dispatch_table', dispatch_table)
+        config = (has_persistent_id, has_reducer_override, self.dispatch,
+                  table, self.bin, self.fast, self.iterative,
+                  self.value_memo is not None,
+                  self._buffer_threshold is not None)
+        # The tables are compared by identity in config, and by contents
+        # with the copies taken when the strategies were resolved, since
+        # their entries can be removed, added or replaced in place.
+        tables = (self.dispatch, table)
+        if config == self._save_config and tables == self._save_tables:
+            return
+        self._save_config = config
+        self._has_persistent_id = has_persistent_id
+        self._has_reducer_override = has_reducer_override
+        cls = type(self)
+        shared = None
+        if table is dispatch_table and self.dispatch is cls.dispatch:
+            shared = _shared_strategies.get(cls)
+            if shared is None:
+                shared = _shared_strategies[cls] = {}
+            # Same as config, without the tables, whose contents are
+            # checked against the copies stored with the strategies
+            key = (has_persistent_id, has_reducer_override, self.bin,
+                   self.fast, self.iterative, self.value_memo is not None,
+                   self._buffer_threshold is not None)
+            strategies = shared.get(key)
+            if strategies is not None and strategies[0] == tables:
+                (self._save_tables, self._shared_save_strategies,
+                 self._shared_iter_strategies, self._atomic_dispatch,
+                 self._bulk_dispatch, self._scalar_types) = strategies
+                self._save_strategies = {}
+                self._iter_strategies = {}
+                self._scalars_inline = (
+                    self.bin and _SCALAR_TYPES <= self._scalar_types)
+                return
+        self._save_tables = tables = (dict(self.dispatch), dict(table))
+        # The strategies resolved by this pickler are shared through weak
+        # dicts, which don't keep the classes alive, and cached again in
+        # plain dicts for the lookups of save().
+        self._save_strategies = {}
+        self._iter_strategies = {}
+        self._shared_save_strategies = weakref.WeakKeyDictionary()
+        self._shared_iter_strategies = weakref.WeakKeyDictionary()
+        # Scalars handled by the stock save functions are never memoized,
+        # so unless a reducer_override() may memoize them they can skip the
+        # memo lookup altogether.
+        if has_reducer_override:
+            self._atomic_dispatch = {}
+        else:
+            self._atomic_dispatch = {
+                t: f for t, f in self.dispatch.items()
+                if f in self._atomic_savers}
+        # Batches of scalars can be encoded in one go when nothing could
+        # observe the individual save() calls.  The bulk encoders write
+        # binary opcodes only.
+        if (not has_persistent_id and not has_reducer_override
+                and type(self).save is _Pickler.save):
+            self._bulk_dispatch = {
+                t: self._bulk_savers[f] for t, f in self.dispatch.items()
+                if f in self._bulk_savers and self.bin}
+            self._scalar_types = {
+                t for t, f in self.dispatch.items()
+                if f in self._scalar_savers}
+            if (self.value_memo is not None or
+                    cls.memoize is not _Pickler.memoize or
+                    cls.get is not _Pickler.get or
+                    cls.put is not _Pickler.put):
+                # strs have to go through _save_deduplicated(), or
+                # memoize(), get() and put()
+                self._bulk_dispatch.pop(str, None)
+                self._scalar_types.discard(str)
+        else:
+            self._bulk_dispatch = {}
+            self._scalar_types = set()
+        # Whether _save_scalars() can be given any objects, and left to
+        # call save() for those it doesn't encode itself
+        self._scalars_inline = self.bin and _SCALAR_TYPES <= self._scalar_types
+        if shared is not None:
+            shared[key] = (tables, self._shared_save_strategies,
+                           self._shared_iter_strategies,
+                           self._atomic_dispatch, self._bulk_dispatch,
+                           self._scalar_types)
+
+    def _resolve_save_strategy(self, t):
+        # Called by save() for the types missing from _save_strategies
+        shared = self._shared_save_strategies
+        f = shared.get(t)
+        if f is None:
+            f = shared[t] = self._get_save_strategy(t)
+        self._save_strategies[t] = f
+        return f
+
+    def _resolve_iter_strategy(self, t):
+        # Same as _resolve_save_strategy(), for _iter_strategies, which
+        # also caches the types that have no generator strategy
+        shared = self._shared_iter_strategies
+        try:
+            g = shared[t]
+        except KeyError:
+            g = shared[t] = self._get_iter_strategy(t)
+        self._iter_strategies[t] = g
+        return g
+
+    def _forget_strategies(self, t):
+        # Drop the strategies cached for type t, resolved from a reduction
+        # table entry that has since been removed, so that the next object
+        # of type t resolves them again.
+        for strategies in (self._save_strategies, self._iter_strategies,
+                           self._shared_save_strategies,
+                           self._shared_iter_strategies):
+            strategies.pop(t, None)
+
+    def _get_save_strategy(self, t):
+        # Return an unbound function f such that f(self, obj) saves an
+        # object of type t that is neither memoized nor handled by
+        # persistent_id() or reducer_override().
+        if self.iterative:
+            g = self._get_iter_strategy(t)
+            if g is not None:
+                def save_iteratively(self, obj):
+                    self._save_iteratively(g(self, obj))
+                return save_iteratively
+
+        f = self._get_recursive_save_strategy(t)
+        if self._buffer_threshold is not None and t in _OUT_OF_BAND_TYPES:
+            g = f
+
+            def save_large_out_of_band(self, obj):
+                if not self._save_out_of_band(obj):
+                    g(self, obj)
+            f = save_large_out_of_band
+        if self.fast and f not in self._leaf_savers:
+            # Nothing is memoized, so cycles have to be caught here
+            def save_checking_cycles(self, obj):
+                self._save_checking_cycles(obj, f, self, obj)
+            return save_checking_cycles
+        return f
+
+    def _get_recursive_save_strategy(self, t):
+        # Check the type dispatch table
+        f = self.dispatch.get(t)
+        if f is not None:
+            if (self.value_memo is not None and
+                    f in self._value_memo_savers and not self.fast):
+                def save_deduplicated(self, obj):
+                    self._save_deduplicated(f, obj)
+                return save_deduplicated
+            return f
+
+        # Check private dispatch table if any, or else
+        # copyreg.dispatch_table
+        table = getattr(self, 'dispatch_table', dispatch_table)
+        reduce = table.get(t)
+        if reduce is not None:
+            def save_from_table(self, obj):
+                # The strategy may outlive the reducer, which copyreg.pickle()
+                # can replace, and a del can remove
+                r = table.get(t)
+                if r is None:
+                    # Without the wrappers of _get_save_strategy(), which
+                    # obj has already gone through
+                    self._forget_strategies(t)
+                    self._get_recursive_save_strategy(t)(self, obj)
+                    return
+                self._save_reduce_value(obj, r(obj), r)
+            return save_from_table
+
+        # Check for a class with a custom metaclass; treat as regular
+        # class
+        if issubclass(t, type):
+            return type(self).save_global
+
+        if self._can_inline_reductions() and _has_default_reduce(t):
+            return type(self)._save_plain_instance
+
+        return type(self)._save_reduce_ex
+
+    def _can_inline_reductions(self):
+        # _save_plain_instance() and save_array() skip calls to save() and
+        # save_reduce() that a subclass or a hook could otherwise observe.
+        cls = type(self)
+        return (self.bin and not self._has_persistent_id and
+                not self._has_reducer_override and
+                cls.save is _Pickler.save and
+                cls.save_reduce is _Pickler.save_reduce)
+
+    def _get_iter_strategy(self, t):
+        # Like _get_save_strategy(), but return a generator function g such
+        # that g(self, obj) yields the objects to be saved in place of the
+        # recursive save() calls, or None if type t has no generator
+        # counterpart and is saved with a plain function.
+        g = self._find_iter_strategy(t)
+        if g is not None and self.fast:
+            def iter_save_checking_cycles(self, obj):
+                return self._iter_checking_cycles(obj, g(self, obj))
+            return iter_save_checking_cycles
+        return g
+
+    def _find_iter_strategy(self, t):
+        if self._buffer_threshold is not None and t in _OUT_OF_BAND_TYPES:
+            # See _get_save_strategy()
+            return None
+        f = self.dispatch.get(t)
+        if f is not None:
+            g = self._iter_savers.get(f)
+            if (g is not None and self.value_memo is not None and
+                    f in self._value_memo_savers and not self.fast):
+                def iter_save_deduplicated(self, obj):
+                    return self._iter_save_deduplicated(g, obj)
+                return iter_save_deduplicated
+            return g
+
+        # Reductions can only be unrolled when save_reduce() is not
+        # overridden by a subclass.
+        if type(self).save_reduce is not _Pickler.save_reduce:
+            return None
+
+        table = getattr(self, 'dispatch_table', dispatch_table)
+        reduce = table.get(t)
+        if reduce is not None:
+            def iter_save_from_table(self, obj):
+                # See _get_recursive_save_strategy()
+                r = table.get(t)
+                if r is None:
+                    self._forget_strategies(t)
+                    g = self._find_iter_strategy(t)
+                    if g is not None:
+                        return g(self, obj)
+                    self._get_recursive_save_strategy(t)(self, obj)
+                    return iter(())
+                return self._iter_save_reduce_value(obj, r(obj), r)
+            return iter_save_from_table
+
+        if issubclass(t, type):
+            return None
+
+        if self._can_inline_reductions() and _has_default_reduce(t):
+            return _Pickler._iter_save_plain_instance
+
+        return _Pickler._iter_save_reduce_ex
 
     def save(self, obj, save_persistent_id=True):
         self.framer.commit_frame()
 
         # Check for persistent id (defined by a subclass)
-        pid = self.persistent_id(obj)
-        if pid is not None and save_persistent_id:
-            self.save_pers(pid)
+        if self._has_persistent_id:
+            pid = self.persistent_id(obj)
+            if pid is not None and save_persistent_id:
+                self.save_pers(pid)
+                return
+
+        t = type(obj)
+        f = self._atomic_dispatch.get(t)
+        if f is not None:
+            f(self, obj)  # Call unbound method with explicit self
             return
 
         # Check the memo
-        x = self.memo.get(id(obj))
+        x = self._memo.lookup(id(obj))
         if x is not None:
-            self.write(self.get(x[0]))
+            self.write(self.get(x))
             return
 
-        rv = NotImplemented
-        reduce = getattr(self, "reducer_override", None)
-        if reduce is not None:
+        if self._has_reducer_override:
+            reduce = self.reducer_override
             rv = reduce(obj)
+            if rv is not NotImplemented:
+                if self.fast:
+                    self._save_checking_cycles(obj, self._save_reduce_value,
+                                               obj, rv, reduce)
+                else:
+                    self._save_reduce_value(obj, rv, reduce)
+                return
+
+        f = self._save_strategies.get(t)
+        if f is None:
+            f = self._resolve_save_strategy(t)
+        f(self, obj)  # Call unbound method with explicit self
+
+    def _save_iteratively(self, gen):
+        for _ in self._run_work_stack(gen):
+            pass
+
+    def _run_work_stack(self, gen, checkpoint=None):
+        # Run the generator of a container or reduction, and all the
+        # generators of the objects it contains, from an explicit stack.
+        # Each object yielded goes through the same steps as in save();
+        # the ones that contain other objects push their own generator
+        # instead of recursing.  This is itself a generator, which pauses
+        # before the next object whenever checkpoint() returns true.
+        stack = [gen]
+        push = stack.append
+        pop = stack.pop
+        commit_frame = self.framer.commit_frame
+        write = self.write
+        memo_lookup = self._memo.lookup
+        atomic_dispatch = self._atomic_dispatch
+        save_strategies = self._save_strategies
+        iter_strategies = self._iter_strategies
+        has_persistent_id = self._has_persistent_id
+        has_reducer_override = self._has_reducer_override
+        iter_reduce = type(self).save_reduce is _Pickler.save_reduce
+        while stack:
+            if checkpoint is not None and checkpoint():
+                yield
+            try:
+                obj = next(stack[-1])
+            except StopIteration:
+                pop()
+                continue
+            if obj is _PAUSE:
+                continue
+
+            commit_frame()
+
+            if has_persistent_id:
+                pid = self.persistent_id(obj)
+                if pid is not None:
+                    self.save_pers(pid)
+                    continue
 
-        if rv is NotImplemented:
-            # Check the type dispatch table
             t = type(obj)
-            f = self.dispatch.get(t)
+            f = atomic_dispatch.get(t)
             if f is not None:
-                f(self, obj)  # Call unbound method with explicit self
-                return
+                f(self, obj)
+                continue
 
-            # Check private dispatch table if any, or else
-            # copyreg.dispatch_table
-            reduce = getattr(self, 'dispatch_table', dispatch_table).get(t)
-            if reduce is not None:
+            x = memo_lookup(id(obj))
+            if x is not None:
+                write(self.get(x))
+                continue
+
+            gen = None
+            if has_reducer_override:
+                reduce = self.reducer_override
                 rv = reduce(obj)
-            else:
-                # Check for a class with a custom metaclass; treat as regular
-                # class
-                if issubclass(t, type):
-                    self.save_global(obj)
-                    return
+                if rv is not NotImplemented:
+                    if not iter_reduce:
+                        if self.fast:
+                            self._save_checking_cycles(
+                                obj, self._save_reduce_value, obj, rv, reduce)
+                        else:
+                            self._save_reduce_value(obj, rv, reduce)
+                        continue
+                    gen = self._iter_save_reduce_value(obj, rv, reduce)
+                    if self.fast:
+                        gen = self._iter_checking_cycles(obj, gen)
+
+            if gen is None:
+                try:
+                    g = iter_strategies[t]
+                except KeyError:
+                    g = self._resolve_iter_strategy(t)
+                if g is None:
+                    f = save_strategies.get(t)
+                    if f is None:
+                        f = self._resolve_save_strategy(t)
+                    f(self, obj)
+                    continue
+                gen = g(self, obj)
+
+            push(gen)
+
+    def _save_checking_cycles(self, obj, f, *args):
+        # Call f(*args) to save obj in fast mode, failing if obj is already
+        # being saved further up.
+        key = id(obj)
+        in_progress = self._in_progress
+        if key in in_progress:
+            self._cycle_error(obj)
+        in_progress.add(key)
+        try:
+            f(*args)
+        finally:
+            in_progress.discard(key)
+
+    def _iter_checking_cycles(self, obj, gen):
+        # Generator counterpart of _save_checking_cycles()
+        key = id(obj)
+        in_progress = self._in_progress
+        if key in in_progress:
+            self._cycle_error(obj)
+        in_progress.add(key)
+        try:
+            yield from gen
+        finally:
+            in_progress.discard(key)
+
+    def _cycle_error(self, obj):
+        raise PicklingError("fast mode: can't pickle cyclic objects "
+                            "including object type %s at %#x" %
+                            (type(obj).__name__, id(obj)))
+
+    def _save_deduplicated(self, f, obj):
+        # Save obj with f, unless an equal value is in the value memo.
+        value_memo = self.value_memo
+        key = value_memo.key(obj)
+        if key is None:
+            f(self, obj)
+            return
+        key, size = key
+        idx = value_memo.get(key)
+        if idx is not None:
+            get = self.get(idx)
+            self.write(get)
+            value_memo.hits += 1
+            value_memo.bytes_saved += size - len(get)
+            return
+        f(self, obj)
+        x = self._memo.lookup(id(obj))
+        if x is not None:
+            value_memo.add(key, x)
+
+    def _iter_save_deduplicated(self, g, obj):
+        # Generator counterpart of _save_deduplicated()
+        value_memo = self.value_memo
+        key = value_memo.key(obj)
+        if key is None:
+            yield from g(self, obj)
+            return
+        key, size = key
+        idx = value_memo.get(key)
+        if idx is not None:
+            get = self.get(idx)
+            self.write(get)
+            value_memo.hits += 1
+            value_memo.bytes_saved += size - len(get)
+            return
+        yield from g(self, obj)
+        x = self._memo.lookup(id(obj))
+        if x is not None:
+            value_memo.add(key, x)
 
-                # Check for a __reduce_ex__ method, fall back to __reduce__
-                reduce = getattr(obj, "__reduce_ex__", None)
-                if reduce is not None:
-                    rv = reduce(self.proto)
-                else:
-                    reduce = getattr(obj, "__reduce__", None)
-                    if reduce is not None:
-                        rv = reduce()
-                    else:
-                        raise PicklingError("Can't lib_pickle %r object: %r" %
-                                            (t.__name__, obj))
+    def _save_reduce_ex(self, obj):
+        # Check for a __reduce_ex__ method, fall back to __reduce__
+        reduce = getattr(obj, "__reduce_ex__", None)
+        if reduce is not None:
+            rv = reduce(self.proto)
+        else:
+            reduce = getattr(obj, "__reduce__", None)
+            if reduce is not None:
+                rv = reduce()
+            else:
+                raise PicklingError("Can't lib_pickle %r object: %r" %
+                                    (type(obj).__name__, obj))
+        self._save_reduce_value(obj, rv, reduce)
+
+    def _save_plain_instance(self, obj):
+        # Same as _save_reduce_ex() for an instance of a class for which
+        # _has_default_reduce() is true, without calling __reduce_ex__():
+        # save_reduce(copyreg.__newobj__, (cls,), obj.__dict__ or None).
+        cls = type(obj)
+        state = obj.__dict__
+        if (self.proto < 2 or not _reduce_unchanged(cls) or
+                state and _instance_overrides_reduce(state)):
+            self._save_reduce_ex(obj)
+            return
+        self.save(cls)
+        self.framer.commit_frame()  # as save(()) does
+        self.write(EMPTY_TUPLE + NEWOBJ)
+        self.memoize(obj)
+        if state:
+            self.save(state)
+            self.write(BUILD)
 
+    def _save_reduce_value(self, obj, rv, reduce):
         # Check for string returned by reduce(), meaning "save as global"
         if isinstance(rv, str):
             self.save_global(obj, rv)
@@ -691,14 +2026,14 @@ class _Pickler:
     dispatch[type(None)] = save_none
 
     def save_bool(self, obj):
-        if self.proto >= 2:
-            self.write(NEWTRUE if obj else NEWFALSE)
-        else:
-            self.write(TRUE if obj else FALSE)
+        self.write(self._constants.bools[obj])
 
     dispatch[bool] = save_bool
 
     def save_long(self, obj):
+        if -256 <= obj <= 0xffff:  # see _ConstantPool
+            self.write(self._constants.ints[obj + 256])
+            return
         if self.bin:
             # If the int is small enough to fit in a signed 4-byte 2's-comp
             # format, we can store it more efficiently than the general
@@ -724,9 +2059,9 @@ class _Pickler:
                 self.write(LONG4 + pack("<i", n) + encoded)
             return
         if -0x80000000 <= obj <= 0x7fffffff:
-            self.write(INT + repr(obj).encode("ascii") + b'\n')
+            self.write(_TEXT_INT % obj)
         else:
-            self.write(LONG + repr(obj).encode("ascii") + b'L\n')
+            self.write(_TEXT_LONG % obj)
 
     dispatch[int] = save_long
 
@@ -734,7 +2069,7 @@ class _Pickler:
         if self.bin:
             self.write(BINFLOAT + pack('>d', obj))
         else:
-            self.write(FLOAT + repr(obj).encode("ascii") + b'\n')
+            self.write(_TEXT_FLOAT % obj)
 
     dispatch[float] = save_float
 
@@ -775,6 +2110,81 @@ class _Pickler:
 
     dispatch[bytearray] = save_bytearray
 
+    def _save_bytes_view(self, m, obj, writable=False):
+        # Write the data of m, a contiguous view of bytes, as save_bytes()
+        # would write a bytes copy of it (save_bytearray() a bytearray copy
+        # if writable), but straight from the view, and memoize obj in
+        # place of the copy.  Protocols 3 and up.
+        n = len(m)
+        if writable:
+            header = BYTEARRAY8 + pack("<Q", n)
+        elif n <= 0xff:
+            header = SHORT_BINBYTES + pack("<B", n)
+        elif n > 0xffffffff and self.proto >= 4:
+            header = BINBYTES8 + pack("<Q", n)
+        else:
+            header = BINBYTES + pack("<I", n)
+        if n >= self.framer._FRAME_SIZE_TARGET:
+            self._write_large_bytes(header, m)
+        else:
+            self.write(header)
+            self.write(m)
+        self.memoize(obj)
+
+    def save_memoryview(self, obj):
+        # A contiguous memoryview is pickled as the bytes it holds
+        if not obj.contiguous:
+            self._save_reduce_ex(obj)  # fails
+            return
+        if self.proto < 3:
+            self.save_bytes(obj.tobytes())
+            return
+        with PickleBuffer(obj).raw() as m:
+            self._save_bytes_view(m, obj)
+
+    if _HAVE_PICKLE_BUFFER:
+        dispatch[memoryview] = save_memoryview
+
+    def save_array(self, obj):
+        # Same as save_reduce(*obj.__reduce_ex__(self.proto), obj=obj),
+        # without the copy of the items that __reduce_ex__() makes for
+        # protocols 3 and up: array._array_reconstructor(array, typecode,
+        # mformat_code, items), where the machine format code tells the
+        # byte order and size of the items to the unpickler.
+        reduce = getattr(self, 'dispatch_table', dispatch_table).get(array)
+        if reduce is not None:
+            # As with no dispatch entry for array
+            self._save_reduce_value(obj, reduce(obj), reduce)
+            return
+        if (self.proto < 3 or self.value_memo is not None or
+                not self._can_inline_reductions()):
+            self._save_reduce_ex(obj)
+            return
+        save = self.save
+        write = self.write
+        typecode = obj.typecode
+        with memoryview(obj) as view, view.cast('B') as data:
+            save(_array_reconstructor)
+            args = (array, typecode, _array_mformat_code(typecode), data)
+            self.framer.commit_frame()  # as save(args) does
+            write(MARK)
+            save(array)
+            save(typecode)
+            save(args[2])
+            if len(data) <= 1:
+                # __reduce_ex__() gives the shared empty or one byte bytes
+                # objects, which may be in the memo already
+                save(bytes(data.tolist()))
+            else:
+                self.framer.commit_frame()  # as save(items) does
+                self._save_bytes_view(data, data)
+            write(TUPLE)
+            self.memoize(args)
+        write(REDUCE)
+        self.memoize(obj)
+
+    dispatch[array] = save_array
+
     if _HAVE_PICKLE_BUFFER:
         def save_picklebuffer(self, obj):
             if self.proto < 5:
@@ -788,12 +2198,8 @@ class _Pickler:
                 if self._buffer_callback is not None:
                     in_band = bool(self._buffer_callback(obj))
                 if in_band:
-                    # Write data in-band
-                    # XXX The C implementation avoids a copy here
-                    if m.readonly:
-                        self.save_bytes(m.tobytes())
-                    else:
-                        self.save_bytearray(m.tobytes())
+                    # Write data in-band, without copying it
+                    self._save_bytes_view(m, m, writable=not m.readonly)
                 else:
                     # Write data out-of-band
                     self.write(NEXT_BUFFER)
@@ -802,6 +2208,36 @@ class _Pickler:
 
         dispatch[PickleBuffer] = save_picklebuffer
 
+    def _save_out_of_band(self, obj):
+        # Save a bytes, bytearray, memoryview or array.array object of at
+        # least _buffer_threshold bytes as a PickleBuffer of its data,
+        # passed to the buffer callback, and the call that rebuilds it
+        # from the buffer.  Return False, having written nothing, if obj
+        # is smaller or not contiguous.
+        with memoryview(obj) as m:
+            if m.nbytes < self._buffer_threshold or not m.contiguous:
+                return False
+        t = type(obj)
+        if t is memoryview:
+            self.save_picklebuffer(PickleBuffer(obj))
+            self.memoize(obj)
+        elif t is array:
+            # Same as obj.__reduce_ex__(3), with bytes(buffer) for the
+            # bytes of the items
+            save = self.save
+            write = self.write
+            save(_array_reconstructor)
+            write(MARK)
+            save(t)
+            save(obj.typecode)
+            save(_array_mformat_code(obj.typecode))
+            self.save_reduce(bytes, (PickleBuffer(obj),))
+            write(TUPLE + REDUCE)
+            self.memoize(obj)
+        else:
+            self.save_reduce(t, (PickleBuffer(obj),), obj=obj)
+        return True
+
     def save_str(self, obj):
         if self.bin:
             encoded = obj.encode('utf-8', 'surrogatepass')
@@ -815,11 +2251,15 @@ class _Pickler:
             else:
                 self.write(BINUNICODE + pack("<I", n) + encoded)
         else:
-            obj = obj.replace("\\", "\\u005c")
-            obj = obj.replace("\0", "\\u0000")
-            obj = obj.replace("\n", "\\u000a")
-            obj = obj.replace("\r", "\\u000d")
-            obj = obj.replace("\x1a", "\\u001a")  # EOF on DOS
+            if len(obj) <= _ConstantPool.SHORT_STR:
+                encoded = self._constants.encode_str(obj)
+                if encoded is not None:
+                    self.write(encoded)
+                    self.memoize(obj)
+                    return
+            # Note that the str memoized below is the escaped one, which is
+            # a different object when anything was escaped
+            obj = _escape_unicode(obj)
             self.write(UNICODE + obj.encode('raw-unicode-escape') +
                        b'\n')
         self.memoize(obj)
@@ -896,10 +2336,15 @@ class _Pickler:
         write = self.write
 
         if not self.bin:
-            for x in items:
-                save(x)
-                write(APPEND)
-            return
+            it = iter(items)
+            while True:
+                tmp = list(islice(it, self._BATCHSIZE))
+                if not self._save_text_appends(tmp):
+                    for x in tmp:
+                        save(x)
+                        write(APPEND)
+                if len(tmp) < self._BATCHSIZE:
+                    return
 
         it = iter(items)
         while True:
@@ -907,8 +2352,9 @@ class _Pickler:
             n = len(tmp)
             if n > 1:
                 write(MARK)
-                for x in tmp:
-                    save(x)
+                if not self._save_homogeneous(tmp):
+                    for x in tmp:
+                        save(x)
                 write(APPENDS)
             elif n:
                 save(tmp[0])
@@ -917,6 +2363,237 @@ class _Pickler:
             if n < self._BATCHSIZE:
                 return
 
+    def _save_homogeneous(self, items):
+        # Save a batch of list items whose types are all the same exact
+        # int, float or str type with one bulk encoder instead of calling
+        # save() for each of them.  Return False, having written nothing,
+        # if the batch doesn't qualify.
+        f = self._bulk_dispatch.get(type(items[0]))
+        if f is None or len(set(map(type, items))) != 1:
+            return False
+        return f(self, items)
+
+    def _bulk_save_longs(self, items):
+        lo = min(items)
+        hi = max(items)
+        if lo < -0x80000000 or hi > 0x7fffffff:
+            # LONG1 and friends are rare enough to go through save_long()
+            return False
+        if lo >= 0 and hi <= 0xff:
+            data = _interleave_opcode(BININT1, bytes(items), 1)
+            ends = range(2, len(data) + 1, 2)
+        elif lo > 0xff and hi <= 0xffff:
+            data = _interleave_opcode(
+                BININT2, pack("<%dH" % len(items), *items), 2)
+            ends = range(3, len(data) + 1, 3)
+        elif lo > 0xffff or hi < 0:
+            data = _interleave_opcode(
+                BININT, pack("<%di" % len(items), *items), 4)
+            ends = range(5, len(data) + 1, 5)
+        else:
+            # Mixed widths
+            self._save_scalars(items)
+            return True
+        self.framer.write_batch(data, ends)
+        return True
+
+    def _bulk_save_floats(self, items):
+        data = _interleave_opcode(BINFLOAT, pack(">%dd" % len(items), *items),
+                                  8)
+        self.framer.write_batch(data, range(9, len(data) + 1, 9))
+        return True
+
+    def _bulk_save_strs(self, items):
+        self._save_scalars(items)
+        return True
+
+    def _save_scalars(self, objs):
+        # Write objs, whose types are all in _scalar_types unless
+        # _scalars_inline is true, as separate save() calls would.  The
+        # uncommon cases, and the objects of other types, are left to
+        # save().
+        memo = self._memo
+        memo_lookup = memo.lookup
+        objects = memo.objects
+        add_object = objects.append
+        fast = self.fast
+        ints, lo, hi, bools, proto4, headers = self._constants.scalars
+        large = self.framer._FRAME_SIZE_TARGET
+        # The memo key of the next str, counted here while the memo has no
+        # gaps (see _Memo.add())
+        idx = len(memo)
+        dense = idx == len(objects)
+        pieces = []
+        append = pieces.append
+        for x in objs:
+            t = type(x)
+            if t is str:
+                key = id(x)
+                i = memo_lookup(key)
+                if i is not None:
+                    # Same as get() and put(), which aren't overridden
+                    append(_bbinget[i] if i < 256
+                           else _pack_long_memo(LONG_BINGET, i))
+                    continue
+                try:
+                    # Faster than naming the error handler, which only lone
+                    # surrogates need
+                    encoded = x.encode()
+                except UnicodeEncodeError:
+                    encoded = x.encode('utf-8', 'surrogatepass')
+                n = len(encoded)
+                if n <= 0xff:
+                    piece = headers[n] + encoded
+                elif n < large:
+                    piece = _pack_long_memo(BINUNICODE, n) + encoded
+                else:
+                    # Large strs bypass the frame
+                    self._write_pieces(pieces)
+                    pieces = []
+                    append = pieces.append
+                    self.save(x)
+                    idx = len(memo)
+                    dense = idx == len(objects)
+                    continue
+                if fast:
+                    append(piece)
+                    continue
+                # Same as memoize()
+                if dense:
+                    _dict_setitem(memo, key, idx)
+                    add_object(x)
+                else:
+                    memo.add(key, idx, x)
+                if proto4:
+                    append(piece + MEMOIZE)
+                elif idx < 256:
+                    append(piece + _bbinput[idx])
+                else:
+                    append(piece + _pack_long_memo(LONG_BINPUT, idx))
+                idx += 1
+                continue
+            elif t is int:
+                if lo <= x <= hi:
+                    append(ints[x - lo])
+                    continue
+                if -0x80000000 <= x <= 0x7fffffff:
+                    append(_pack_binint(BININT, x))
+                    continue
+            elif t is float:
+                append(_pack_binfloat(BINFLOAT, x))
+                continue
+            elif x is None:
+                append(NONE)
+                continue
+            elif t is bool:
+                append(bools[x])
+                continue
+            self._write_pieces(pieces)
+            pieces = []
+            append = pieces.append
+            self.save(x)
+            idx = len(memo)
+            dense = idx == len(objects)
+        if pieces:
+            self.framer.write_pieces(pieces)
+
+    def _write_pieces(self, pieces):
+        if pieces:
+            self.framer.write_pieces(pieces)
+
+    def _save_scalar_items(self, items):
+        # Save a batch of dict items whose keys and values are all ints,
+        # floats, strs, bools or None in one encoding pass instead of
+        # calling save() twice per item.  Return False, having written
+        # nothing, if the batch doesn't qualify.
+        scalar_types = self._scalar_types
+        if (not scalar_types or
+                not set(map(type, chain.from_iterable(items))) <=
+                scalar_types):
+            return False
+        self._save_scalars(chain.from_iterable(items))
+        return True
+
+    def _encode_text_scalars(self, objs):
+        # Protocol 0 counterpart of _save_scalars(): return the opcodes that
+        # separate save() calls would write for objs, or None, having
+        # written and memoized nothing, unless their types are all in
+        # _scalar_types.
+        scalar_types = self._scalar_types
+        if not scalar_types or not set(map(type, objs)) <= scalar_types:
+            return None
+        memo = self._memo
+        memo_lookup = memo.lookup
+        objects = memo.objects
+        put = self.put
+        get = self.get
+        fast = self.fast
+        constants = self._constants
+        ints = constants.ints
+        lo = constants.SMALLEST_INT
+        hi = constants.LARGEST_INT
+        bools = constants.bools
+        encode_str = constants.encode_str
+        short = constants.SHORT_STR
+        pieces = []
+        append = pieces.append
+        for x in objs:
+            t = type(x)
+            if t is str:
+                idx = memo_lookup(id(x))
+                if idx is not None:
+                    append(get(idx))
+                    continue
+                piece = encode_str(x) if len(x) <= short else None
+                if piece is None:
+                    # See save_str()
+                    x = _escape_unicode(x)
+                    piece = UNICODE + x.encode('raw-unicode-escape') + b'\n'
+                if not fast:
+                    # Same as memoize()
+                    idx = len(memo)
+                    if idx == len(objects):
+                        _dict_setitem(memo, id(x), idx)
+                        objects.append(x)
+                    else:
+                        memo.add(id(x), idx, x)
+                    piece += put(idx)
+                append(piece)
+            elif t is int:
+                if lo <= x <= hi:
+                    append(ints[x - lo])
+                elif -0x80000000 <= x <= 0x7fffffff:
+                    append(_TEXT_INT % x)
+                else:
+                    append(_TEXT_LONG % x)
+            elif t is float:
+                append(_TEXT_FLOAT % x)
+            elif x is None:
+                append(NONE)
+            else:
+                append(bools[x])
+        return pieces
+
+    def _save_text_appends(self, items):
+        # Protocol 0 has no APPENDS: write a batch of scalar list items,
+        # each followed by APPEND, in one go.  Return False, having written
+        # nothing, if the batch doesn't qualify.
+        pieces = self._encode_text_scalars(items)
+        if not pieces:
+            return False
+        self.write(APPEND.join(pieces) + APPEND)
+        return True
+
+    def _save_text_setitems(self, items):
+        # Same as _save_text_appends() for dict items and SETITEM
+        pieces = self._encode_text_scalars(list(chain.from_iterable(items)))
+        if not pieces:
+            return False
+        it = iter(pieces)
+        self.write(b''.join(chain.from_iterable(
+            zip(it, it, repeat(SETITEM)))))
+        return True
+
     def save_dict(self, obj):
         if self.bin:
             self.write(EMPTY_DICT)
@@ -924,7 +2601,13 @@ class _Pickler:
             self.write(MARK + DICT)
 
         self.memoize(obj)
-        self._batch_setitems(obj.items())
+        if self._scalars_inline and 1 < len(obj) <= self._BATCHSIZE:
+            # A single batch, as _batch_setitems() would write it
+            self.write(MARK)
+            self._save_scalars(chain.from_iterable(list(obj.items())))
+            self.write(SETITEMS)
+        else:
+            self._batch_setitems(obj.items())
 
     dispatch[dict] = save_dict
     if PyStringMap is not None:
@@ -936,11 +2619,16 @@ class _Pickler:
         write = self.write
 
         if not self.bin:
-            for k, v in items:
-                save(k)
-                save(v)
-                write(SETITEM)
-            return
+            it = iter(items)
+            while True:
+                tmp = list(islice(it, self._BATCHSIZE))
+                if not self._save_text_setitems(tmp):
+                    for k, v in tmp:
+                        save(k)
+                        save(v)
+                        write(SETITEM)
+                if len(tmp) < self._BATCHSIZE:
+                    return
 
         it = iter(items)
         while True:
@@ -948,9 +2636,14 @@ class _Pickler:
             n = len(tmp)
             if n > 1:
                 write(MARK)
-                for k, v in tmp:
-                    save(k)
-                    save(v)
+                if self._scalars_inline:
+                    # Checking the types first would cost more than the
+                    # save() calls it spares for the other objects.
+                    self._save_scalars(chain.from_iterable(tmp))
+                elif not self._save_scalar_items(tmp):
+                    for k, v in tmp:
+                        save(k)
+                        save(v)
                 write(SETITEMS)
             elif n:
                 k, v = tmp[0]
@@ -1019,23 +2712,21 @@ class _Pickler:
         if name is None:
             name = obj.__name__
 
-        module_name = whichmodule(obj, name)
-        try:
-            __import__(module_name, level=0)
-            module = sys.modules[module_name]
-            obj2, parent = _getattribute(module, name)
-        except (ImportError, KeyError, AttributeError):
-            raise PicklingError(
-                "Can't lib_pickle %r: it's not found as %s.%s" %
-                (obj, module_name, name)) from None
+        # Resolving the global is the costly part, so it is done once per
+        # process while the module stays the same (see _GlobalRef).
+        module_name = getattr(obj, '__module__', None)
+        ref = _global_refs.get((id(obj), name))
+        if ref is not None and module_name is not None:
+            parent = ref.check(obj, module_name)
         else:
-            if obj2 is not obj:
-                raise PicklingError(
-                    "Can't lib_pickle %r: it's not the same object as %s.%s" %
-                    (obj, module_name, name))
+            parent = None
+        if parent is None:
+            parent, ref = _resolve_global(obj, name)
+            module_name = ref.module_name
+        module = ref.module()
 
         if self.proto >= 2:
-            code = _extension_registry.get((module_name, name))
+            code = _extension_registry.get(ref.ext_key)
             if code:
                 assert code > 0
                 if code <= 0xff:
@@ -1050,32 +2741,60 @@ class _Pickler:
             name = lastname
         # Non-ASCII identifiers are supported only with protocols >= 3.
         if self.proto >= 4:
-            self.save(module_name)
-            self.save(name)
+            stack_args = ref.stack_args
+            if stack_args is None:
+                stack_args = ref.stack_args = (_encode_short_str(module_name),
+                                               _encode_short_str(name))
+            if (str in self._scalar_types and stack_args[0] is not None
+                    and stack_args[1] is not None):
+                # Same as save(module_name) and save(name), with the strs
+                # already encoded
+                commit_frame = self.framer.commit_frame
+                memo_lookup = self._memo.lookup
+                for s, encoded in zip((module_name, name), stack_args):
+                    commit_frame()
+                    x = memo_lookup(id(s))
+                    if x is not None:
+                        write(self.get(x))
+                    else:
+                        write(encoded)
+                        self.memoize(s)
+            else:
+                self.save(module_name)
+                self.save(name)
             write(STACK_GLOBAL)
         elif parent is not module:
             self.save_reduce(getattr, (parent, lastname))
-        elif self.proto >= 3:
-            write(GLOBAL + bytes(module_name, "utf-8") + b'\n' +
-                  bytes(name, "utf-8") + b'\n')
         else:
-            if self.fix_imports:
-                r_name_mapping = _compat_pickle.REVERSE_NAME_MAPPING
-                r_import_mapping = _compat_pickle.REVERSE_IMPORT_MAPPING
-                if (module_name, name) in r_name_mapping:
-                    module_name, name = r_name_mapping[(module_name, name)]
-                elif module_name in r_import_mapping:
-                    module_name = r_import_mapping[module_name]
-            try:
-                write(GLOBAL + bytes(module_name, "ascii") + b'\n' +
-                      bytes(name, "ascii") + b'\n')
-            except UnicodeEncodeError:
-                raise PicklingError(
-                    "can't lib_pickle global identifier '%s.%s' using "
-                    "lib_pickle protocol %i" % (module, name, self.proto)) from None
+            key = (self.proto >= 3, self.fix_imports)
+            opcode = ref.globals.get(key)
+            if opcode is None:
+                opcode = ref.globals[key] = self._encode_global(
+                    module, module_name, name)
+            write(opcode)
 
         self.memoize(obj)
 
+    def _encode_global(self, module, module_name, name):
+        # Return the GLOBAL opcode of a global in protocols 0 to 3
+        if self.proto >= 3:
+            return (GLOBAL + bytes(module_name, "utf-8") + b'\n' +
+                    bytes(name, "utf-8") + b'\n')
+        if self.fix_imports:
+            r_name_mapping = _compat_pickle.REVERSE_NAME_MAPPING
+            r_import_mapping = _compat_pickle.REVERSE_IMPORT_MAPPING
+            if (module_name, name) in r_name_mapping:
+                module_name, name = r_name_mapping[(module_name, name)]
+            elif module_name in r_import_mapping:
+                module_name = r_import_mapping[module_name]
+        try:
+            return (GLOBAL + bytes(module_name, "ascii") + b'\n' +
+                    bytes(name, "ascii") + b'\n')
+        except UnicodeEncodeError:
+            raise PicklingError(
+                "can't lib_pickle global identifier '%s.%s' using "
+                "lib_pickle protocol %i" % (module, name, self.proto)) from None
+
     def save_type(self, obj):
         if obj is type(None):
             return self.save_reduce(type, (None,), obj=obj)
@@ -1088,21 +2807,1323 @@ class _Pickler:
     dispatch[FunctionType] = save_global
     dispatch[type] = save_type
 
+    # Stock save functions that never memoize the object they write.
+    _atomic_savers = frozenset([save_none, save_bool, save_long, save_float])
+
+    # Stock save functions that never save other objects, so fast mode
+    # needs no cycle check for them.
+    _leaf_savers = _atomic_savers | frozenset([save_bytes, save_bytearray,
+                                               save_memoryview, save_array,
+                                               save_str, save_global,
+                                               save_type])
+
+    # Maps stock save functions to the bulk encoders used for homogeneous
+    # list batches (see _save_homogeneous()).
+    _bulk_savers = {
+        save_long: _bulk_save_longs,
+        save_float: _bulk_save_floats,
+        save_str: _bulk_save_strs,
+    }
+
+    # Stock save functions whose objects the value memo can deduplicate.
+    _value_memo_savers = frozenset([save_str, save_bytes, save_tuple,
+                                    save_frozenset])
+
+    # Stock save functions whose objects _save_scalars() can encode.
+    _scalar_savers = frozenset([save_none, save_bool, save_long, save_float,
+                                save_str])
+
+    # Generator counterparts of the recursive save functions, used by the
+    # iterative engine (see _save_iteratively()).  They write exactly the
+    # same opcodes as the functions they mirror, but yield each contained
+    # object instead of calling save() on it.
+
+    def _iter_save_reduce_ex(self, obj):
+        reduce = getattr(obj, "__reduce_ex__", None)
+        if reduce is not None:
+            rv = reduce(self.proto)
+        else:
+            reduce = getattr(obj, "__reduce__", None)
+            if reduce is not None:
+                rv = reduce()
+            else:
+                raise PicklingError("Can't lib_pickle %r object: %r" %
+                                    (type(obj).__name__, obj))
+        return self._iter_save_reduce_value(obj, rv, reduce)
+
+    def _iter_save_plain_instance(self, obj):
+        cls = type(obj)
+        state = obj.__dict__
+        if (self.proto < 2 or not _reduce_unchanged(cls) or
+                state and _instance_overrides_reduce(state)):
+            yield from self._iter_save_reduce_ex(obj)
+            return
+        yield cls
+        self.framer.commit_frame()
+        self.write(EMPTY_TUPLE + NEWOBJ)
+        self.memoize(obj)
+        if state:
+            yield state
+            self.write(BUILD)
+
+    def _iter_save_reduce_value(self, obj, rv, reduce):
+        if isinstance(rv, str):
+            self.save_global(obj, rv)
+            return
+        if not isinstance(rv, tuple):
+            raise PicklingError("%s must return string or tuple" % reduce)
+        l = len(rv)
+        if not (2 <= l <= 6):
+            raise PicklingError("Tuple returned by %s must have "
+                                "two to six elements" % reduce)
+        yield from self._iter_save_reduce(obj=obj, *rv)
+
+    def _iter_save_reduce(self, func, args, state=None, listitems=None,
+                          dictitems=None, state_setter=None, *, obj=None):
+        if not isinstance(args, tuple):
+            raise PicklingError("args from save_reduce() must be a tuple")
+        if not callable(func):
+            raise PicklingError("func from save_reduce() must be callable")
+
+        write = self.write
+
+        # A reduction whose func or args lead back to obj before it is
+        # memoized would be unrolled forever, where the recursive engine
+        # runs into the recursion limit.
+        key = id(obj)
+        reducing = self._reducing
+        if obj is not None:
+            if key in reducing:
+                raise RecursionError("the reduction of %s object refers to "
+                                     "the object itself"
+                                     % type(obj).__name__)
+            reducing.add(key)
+        try:
+            func_name = getattr(func, "__name__", "")
+            if self.proto >= 2 and func_name == "__newobj_ex__":
+                cls, args, kwargs = args
+                if not hasattr(cls, "__new__"):
+                    raise PicklingError("args[0] from {} args has no __new__"
+                                        .format(func_name))
+                if obj is not None and cls is not obj.__class__:
+                    raise PicklingError("args[0] from {} args has the wrong "
+                                        "class".format(func_name))
+                if self.proto >= 4:
+                    yield cls
+                    yield args
+                    yield kwargs
+                    write(NEWOBJ_EX)
+                else:
+                    func = partial(cls.__new__, cls, *args, **kwargs)
+                    yield func
+                    yield ()
+                    write(REDUCE)
+            elif self.proto >= 2 and func_name == "__newobj__":
+                cls = args[0]
+                if not hasattr(cls, "__new__"):
+                    raise PicklingError(
+                        "args[0] from __newobj__ args has no __new__")
+                if obj is not None and cls is not obj.__class__:
+                    raise PicklingError(
+                        "args[0] from __newobj__ args has the wrong class")
+                args = args[1:]
+                yield cls
+                yield args
+                write(NEWOBJ)
+            else:
+                yield func
+                yield args
+                write(REDUCE)
+        finally:
+            if obj is not None:
+                reducing.discard(key)
+
+        if obj is not None:
+            if id(obj) in self.memo:
+                write(POP + self.get(self.memo[id(obj)][0]))
+            else:
+                self.memoize(obj)
+
+        if listitems is not None:
+            yield from self._iter_batch_appends(listitems)
+
+        if dictitems is not None:
+            yield from self._iter_batch_setitems(dictitems)
+
+        if state is not None:
+            if state_setter is None:
+                yield state
+                write(BUILD)
+            else:
+                yield state_setter
+                yield obj
+                yield state
+                write(TUPLE2)
+                write(REDUCE)
+                write(POP)
+
+    def _iter_save_tuple(self, obj):
+        if not obj:  # tuple is empty
+            if self.bin:
+                self.write(EMPTY_TUPLE)
+            else:
+                self.write(MARK + TUPLE)
+            return
+
+        n = len(obj)
+        memo = self.memo
+        if n <= 3 and self.proto >= 2:
+            yield from obj
+            if id(obj) in memo:
+                get = self.get(memo[id(obj)][0])
+                self.write(POP * n + get)
+            else:
+                self.write(_tuplesize2code[n])
+                self.memoize(obj)
+            return
+
+        write = self.write
+        write(MARK)
+        yield from obj
+
+        if id(obj) in memo:
+            get = self.get(memo[id(obj)][0])
+            if self.bin:
+                write(POP_MARK + get)
+            else:  # proto 0 -- POP_MARK not available
+                write(POP * (n + 1) + get)
+            return
+
+        write(TUPLE)
+        self.memoize(obj)
+
+    def _iter_save_list(self, obj):
+        if self.bin:
+            self.write(EMPTY_LIST)
+        else:  # proto 0 -- can't use EMPTY_LIST
+            self.write(MARK + LIST)
+
+        self.memoize(obj)
+        yield from self._iter_batch_appends(obj)
+
+    def _iter_batch_appends(self, items):
+        write = self.write
+
+        if not self.bin:
+            it = iter(items)
+            while True:
+                tmp = list(islice(it, self._BATCHSIZE))
+                if not self._save_text_appends(tmp):
+                    for x in tmp:
+                        yield x
+                        write(APPEND)
+                else:
+                    yield _PAUSE
+                if len(tmp) < self._BATCHSIZE:
+                    return
+
+        it = iter(items)
+        while True:
+            tmp = list(islice(it, self._BATCHSIZE))
+            n = len(tmp)
+            if n > 1:
+                write(MARK)
+                if not self._save_homogeneous(tmp):
+                    yield from tmp
+                else:
+                    yield _PAUSE
+                write(APPENDS)
+            elif n:
+                yield tmp[0]
+                write(APPEND)
+            if n < self._BATCHSIZE:
+                return
+
+    def _iter_save_dict(self, obj):
+        if self.bin:
+            self.write(EMPTY_DICT)
+        else:  # proto 0 -- can't use EMPTY_DICT
+            self.write(MARK + DICT)
+
+        self.memoize(obj)
+        yield from self._iter_batch_setitems(obj.items())
 
-def _dump(obj, file, protocol=None, *, fix_imports=True, buffer_callback=None):
+    def _iter_batch_setitems(self, items):
+        write = self.write
+
+        if not self.bin:
+            it = iter(items)
+            while True:
+                tmp = list(islice(it, self._BATCHSIZE))
+                if not self._save_text_setitems(tmp):
+                    for k, v in tmp:
+                        yield k
+                        yield v
+                        write(SETITEM)
+                else:
+                    yield _PAUSE
+                if len(tmp) < self._BATCHSIZE:
+                    return
+
+        it = iter(items)
+        while True:
+            tmp = list(islice(it, self._BATCHSIZE))
+            n = len(tmp)
+            if n > 1:
+                write(MARK)
+                if not self._save_scalar_items(tmp):
+                    for k, v in tmp:
+                        yield k
+                        yield v
+                else:
+                    yield _PAUSE
+                write(SETITEMS)
+            elif n:
+                k, v = tmp[0]
+                yield k
+                yield v
+                write(SETITEM)
+            if n < self._BATCHSIZE:
+                return
+
+    def _iter_save_set(self, obj):
+        write = self.write
+
+        if self.proto < 4:
+            yield from self._iter_save_reduce(set, (list(obj),), obj=obj)
+            return
+
+        write(EMPTY_SET)
+        self.memoize(obj)
+
+        it = iter(obj)
+        while True:
+            batch = list(islice(it, self._BATCHSIZE))
+            n = len(batch)
+            if n > 0:
+                write(MARK)
+                yield from batch
+                write(ADDITEMS)
+            if n < self._BATCHSIZE:
+                return
+
+    def _iter_save_frozenset(self, obj):
+        write = self.write
+
+        if self.proto < 4:
+            yield from self._iter_save_reduce(frozenset, (list(obj),),
+                                              obj=obj)
+            return
+
+        write(MARK)
+        yield from obj
+
+        if id(obj) in self.memo:
+            write(POP_MARK + self.get(self.memo[id(obj)][0]))
+            return
+
+        write(FROZENSET)
+        self.memoize(obj)
+
+    # Maps the stock save functions to their generator counterparts.
+    _iter_savers = {
+        save_tuple: _iter_save_tuple,
+        save_list: _iter_save_list,
+        save_dict: _iter_save_dict,
+        save_set: _iter_save_set,
+        save_frozenset: _iter_save_frozenset,
+    }
+
+
+# Globals that a record log may pickle once for all the records
+_SHARED_TYPES = (type, FunctionType, type(len))
+
+
+class _RecordPickler(_Pickler):
+    # Pickles the records of a RecordLogWriter.  Memo keys are written
+    # explicitly with (LONG_)BINPUT or PUT, even under protocol 4, instead
+    # of following the length of the memo: keys below max_shared belong to
+    # the globals shared by all the records, the objects of a record get
+    # the keys from max_shared up.  A shared global is memoized in the
+    # first record that refers to it, from which the reader picks it up;
+    # the following records refer to it by its key as a persistent id.
+    # Within that first record, it is fetched from the memo as usual.
+
+    def __init__(self, file, protocol, max_shared, **kwargs):
+        super().__init__(file, protocol, **kwargs)
+        self.max_shared = max_shared
+        self.shared = {}
+        # The keys of the globals defined by the current record start here,
+        # and those of its other objects at max_shared
+        self.record_shared = 0
+
+    def memoize(self, obj):
+        if self.fast or not self.max_shared:
+            super().memoize(obj)
+            return
+        memo = self.memo
+        assert id(obj) not in memo
+        shared = self.shared
+        if isinstance(obj, _SHARED_TYPES) and len(shared) < self.max_shared:
+            idx = len(shared)
+            shared[id(obj)] = idx, obj
+        else:
+            idx = self.max_shared + len(memo) - len(shared)
+        memo.add(id(obj), idx, obj)
+        if not self.bin:
+            self.write(PUT + repr(idx).encode("ascii") + b'\n')
+        elif idx < 256:
+            self.write(BINPUT + pack("<B", idx))
+        else:
+            self.write(LONG_BINPUT + pack("<I", idx))
+
+    def get(self, i):
+        if i >= self.record_shared:
+            return super().get(i)
+        if not self.bin:
+            return PERSID + repr(i).encode("ascii") + b'\n'
+        if i < 256:
+            return _bbinint1[i] + BINPERSID
+        return BININT + pack("<i", i) + BINPERSID
+
+    def start_record(self):
+        # Forget the objects of the previous record, but not the globals
+        self.clear_memo()
+        self.memo.update(self.shared)
+        self.record_shared = len(self.shared)
+
+    def forget_shared(self, count):
+        # Drop the globals first pickled by a record that failed
+        for key, entry in list(self.shared.items()):
+            if entry[0] >= count:
+                del self.shared[key]
+
+
+class RecordLogWriter:
+    """Append records to a binary file, each as a separate pickle.
+
+    Every record is a complete pickle that reaches *file* as a whole by the
+    time append() returns, so the log can be read back record by record
+    with RecordLogReader (or with an Unpickler when *shared_globals* is
+    0).  Unlike repeated Pickler.dump() calls, the memo is emptied between
+    records, so the log holds no reference to the records written.
+
+    If *shared_globals* is positive, up to that many classes and functions
+    are pickled only in the first record that refers to them, and by a
+    small persistent id in the following ones.  Such a log must be read
+    with a RecordLogReader given the same *shared_globals*.  Otherwise
+    each record is the same as what dumps() returns.
+
+    If *index* is given, it is a binary file to which two 8-byte integers
+    are appended for every record: the offset of the record in *file* and
+    the number of shared globals defined before it.  RecordLogReader uses
+    it to read record N without reading the ones before.  *file* must then
+    be seekable.
+
+    If a record can't be pickled, append() raises the error, and truncates
+    *file* back to where the record started when *file* is seekable.
+    Otherwise the part of the record already written stays in the log.
+
+    The other arguments are the same as for Pickler.
+    """
+
+    def __init__(self, file, protocol=None, *, index=None, shared_globals=0,
+                 fix_imports=True, iterative=False, value_memo=False):
+        self.file = file
+        self.index = index
+        self.records = 0
+        self._pickler = _RecordPickler(file, protocol, shared_globals,
+                                       fix_imports=fix_imports,
+                                       iterative=iterative,
+                                       value_memo=value_memo)
+        try:
+            seekable = file.seekable()
+        except AttributeError:
+            seekable = False
+        if index is not None and not seekable:
+            raise ValueError("an index needs a seekable file")
+        # Where the next record starts, to index it or roll it back
+        self._offset = file.tell() if seekable else None
+
+    def __len__(self):
+        return self.records
+
+    def append(self, obj):
+        """Write obj as the next record and return its number."""
+        pickler = self._pickler
+        shared = len(pickler.shared)
+        pickler.start_record()
+        try:
+            pickler.dump(obj)
+        except BaseException:
+            # Frames already written belong to an incomplete record
+            pickler.forget_shared(shared)
+            if self._offset is not None:
+                self.file.seek(self._offset)
+                self.file.truncate()
+            raise
+        if self.index is not None:
+            self.index.write(pack("<QQ", self._offset, shared))
+        if self._offset is not None:
+            self._offset = self.file.tell()
+        self.records += 1
+        return self.records - 1
+
+    def flush(self):
+        """Flush the log and the index to their files."""
+        self.file.flush()
+        if self.index is not None:
+            self.index.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+
+
+class RecordLogReader:
+    """Read the records written by a RecordLogWriter.
+
+    *shared_globals* must be the value the log was written with.  Reading
+    a given record (reader[n]) requires the *index* written along with the
+    log and a seekable *file*; iterating reads the records that follow the
+    current position of *file*.
+    """
+
+    _INDEX_ENTRY = 16
+
+    def __init__(self, file, index=None, *, shared_globals=0):
+        self.file = file
+        self.index = index
+        self.max_shared = shared_globals
+        self.shared = {}
+        self._unpickler_class = _CUnpickler
+
+    def _load(self):
+        unpickler = self._unpickler_class(self.file)
+        unpickler.persistent_load = self._persistent_load
+        obj = unpickler.load()
+        shared = self.shared
+        if len(shared) < self.max_shared:
+            for key, value in unpickler.memo.copy().items():
+                if key < self.max_shared:
+                    shared[key] = value
+        return obj
+
+    def _persistent_load(self, pid):
+        try:
+            return self.shared[int(pid)]
+        except KeyError:
+            raise UnpicklingError("shared global %s is not defined by an "
+                                  "earlier record" % pid) from None
+
+    def __iter__(self):
+        while True:
+            try:
+                obj = self._load()
+            except EOFError:
+                # The end of the log, or a record cut short by a crash
+                return
+            yield obj
+
+    def __len__(self):
+        if self.index is None:
+            raise TypeError("a record log without index has no length")
+        return self.index.seek(0, io.SEEK_END) // self._INDEX_ENTRY
+
+    def _entry(self, n):
+        self.index.seek(n * self._INDEX_ENTRY)
+        return unpack("<QQ", self.index.read(self._INDEX_ENTRY))
+
+    def __getitem__(self, n):
+        size = len(self)
+        if n < 0:
+            n += size
+        if not 0 <= n < size:
+            raise IndexError("record index out of range")
+        offset, shared = self._entry(n)
+        while len(self.shared) < shared:
+            # Read the record that defines the first missing global: the
+            # last one that starts with no more globals than are known.
+            lo, hi = 0, n
+            while lo < hi:
+                mid = (lo + hi + 1) // 2
+                if self._entry(mid)[1] <= len(self.shared):
+                    lo = mid
+                else:
+                    hi = mid - 1
+            self.file.seek(self._entry(lo)[0])
+            self._load()
+        self.file.seek(offset)
+        return self._load()
+
+
+class BufferStore:
+    """Keep the out-of-band buffers of protocol 5 pickles in a file.
+
+    Opened for writing (*mode* 'w'), a BufferStore is a buffer_callback
+    for Pickler and dumps(): it appends the data of every buffer it is
+    given to the file at *path*, at offsets aligned to ALIGNMENT bytes,
+    and keeps the buffer out of band.  close() ends the file with the
+    offset and length of every buffer.
+
+        with BufferStore(path, 'w') as store:
+            data = dumps(obj, 5, buffer_callback=store,
+                         buffer_threshold=1 << 20)
+
+    Opened for reading (*mode* 'r'), the file is mapped in memory, and
+    the buffers are views of the mapping, in the order they were written:
+    pass the store as the *buffers* argument of pickle.loads().  Several
+    pickles that shared a store are loaded in the order they were dumped,
+    with one iterator over the store.  The mapping is copy-on-write, so
+    writable buffers can be modified without changing the file, and it
+    can't be closed while views of it are still alive.
+    """
+
+    ALIGNMENT = 64
+
+    def __init__(self, path, mode='r'):
+        if mode not in ('r', 'w'):
+            raise ValueError("mode must be 'r' or 'w', not %r" % (mode,))
+        self.mode = mode
+        if mode == 'w':
+            self._file = open(path, 'wb')
+            self._entries = []
+            self._size = 0
+            return
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        self._view = memoryview(self._map)
+        count, = unpack("<Q", self._view[-8:])
+        end = len(self._view) - 8
+        entries = unpack("<%dQ" % (2 * count),
+                         self._view[end - 16 * count:end])
+        self._entries = list(zip(entries[::2], entries[1::2]))
+
+    def __call__(self, buffer):
+        if self.mode != 'w':
+            raise ValueError("buffer store not opened for writing")
+        with buffer.raw() as m:
+            offset = self._size + -self._size % self.ALIGNMENT
+            if offset > self._size:
+                self._file.write(bytes(offset - self._size))
+            # Large data goes straight from the buffer to the file
+            self._file.write(m)
+            self._entries.append((offset, len(m)))
+            self._size = offset + len(m)
+        return False
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getitem__(self, n):
+        if self.mode != 'r':
+            raise ValueError("buffer store not opened for reading")
+        offset, size = self._entries[n]
+        return self._view[offset:offset + size]
+
+    def __iter__(self):
+        for n in range(len(self._entries)):
+            yield self[n]
+
+    def close(self):
+        """Write the index of a store opened for writing and close the
+        file, or unmap the file of a store opened for reading."""
+        if self.mode == 'w':
+            if not self._file.closed:
+                entries = self._entries
+                self._file.write(
+                    pack("<%dQ" % (2 * len(entries)),
+                         *chain.from_iterable(entries)) +
+                    pack("<Q", len(entries)))
+                self._file.close()
+        elif not self._map.closed:
+            self._view.release()
+            self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _type_name(t):
+    if t.__module__ == 'builtins':
+        return t.__qualname__
+    return "%s.%s" % (t.__module__, t.__qualname__)
+
+
+class ProfilingPickler(_Pickler):
+    """A Pickler that records where the time and the bytes of the pickles
+    it writes go.
+
+    For every object saved, it counts the calls, the time spent and the
+    bytes written, both in total and without the objects saved from
+    within, by type and by the save function that handles the type
+    (save_str, save_reduce, save_global, ...; get for objects found in
+    the memo).  It also counts the memo lookups that hit and miss, the
+    opcodes of the pickles and the frames they are cut into.  The
+    statistics of successive dump() calls add up; stats() returns them
+    as a dict, and report() as text.
+
+    The pickles are the same as a Pickler writes, but all the objects go
+    through save(): the iterative engine and the shortcuts that encode
+    batches of scalars and plain instances in one go aren't used, so
+    profiling is slower than pickling.  A copy of each pickle is kept
+    until dump() returns, to count its opcodes.  Pickler itself records
+    nothing and pays nothing for this class.
+    """
+
+    def __init__(self, file, protocol=None, *, fix_imports=True,
+                 buffer_callback=None, value_memo=False, fast=False,
+                 buffer_threshold=None):
+        super().__init__(file, protocol, fix_imports=fix_imports,
+                         buffer_callback=buffer_callback,
+                         value_memo=value_memo, fast=fast,
+                         buffer_threshold=buffer_threshold)
+        framer = self.framer
+        if not framer._in_place:
+            file_write = framer.file_write
+            framer.file_write = lambda data: file_write(self._tee(data))
+            if framer.file_writev is not None:
+                file_writev = framer.file_writev
+                framer.file_writev = lambda buffers: file_writev(
+                    [self._tee(b) for b in buffers])
+        self._copy = None
+        self._written = 0
+        self._functions_by_type = {}
+        self._children = []
+        self.clear_stats()
+
+    def clear_stats(self):
+        """Forget the statistics recorded so far."""
+        # name -> [calls, time, own time, bytes, own bytes]
+        self.types = {}
+        self.functions = {}
+        self.opcodes = collections.Counter()
+        self.frames = []
+        self.memo_hits = 0
+        self.memo_misses = 0
+        self.dumps = 0
+        self.time = 0.0
+        self.bytes = 0
+
+    def _tee(self, data):
+        self._written += memoryview(data).nbytes
+        if self._copy is not None:
+            self._copy += data
+        return data
+
+    def _position(self):
+        # How many bytes of the pickle have been written so far
+        framer = self.framer
+        if framer._in_place:
+            return len(framer.current_frame)
+        return self._written + len(framer.current_frame) - framer._frame_start
+
+    def dump(self, obj):
+        framer = self.framer
+        base = len(framer.current_frame)
+        self._copy = None if framer._in_place else bytearray()
+        start = perf_counter()
+        try:
+            super().dump(obj)
+            self.time += perf_counter() - start
+            if framer._in_place:
+                data = framer.current_frame[base:]
+            else:
+                data = self._copy
+        finally:
+            self._copy = None
+            del self._children[:]
+        for opcode, arg, pos in pickletools.genops(data):
+            self.opcodes[opcode.name] += 1
+            if opcode.name == 'FRAME':
+                self.frames.append(arg)
+        self.bytes += len(data)
+        self.dumps += 1
+
+    def _function_name(self, t):
+        name = self._functions_by_type.get(t)
+        if name is None:
+            f = self.dispatch.get(t)
+            if f is not None:
+                name = f.__name__
+            elif issubclass(t, type) and t not in getattr(
+                    self, 'dispatch_table', dispatch_table):
+                name = 'save_global'
+            else:
+                name = 'save_reduce'
+            self._functions_by_type[t] = name
+        return name
+
+    def save(self, obj, save_persistent_id=True):
+        t = type(obj)
+        name = self._function_name(t)
+        if t not in self._atomic_dispatch:
+            if self._memo.lookup(id(obj)) is not None:
+                self.memo_hits += 1
+                name = 'get'
+            else:
+                self.memo_misses += 1
+        children = self._children
+        children.append([0.0, 0])
+        position = self._position()
+        start = perf_counter()
+        try:
+            super().save(obj, save_persistent_id)
+        finally:
+            elapsed = perf_counter() - start
+            size = self._position() - position
+            inner_time, inner_size = children.pop()
+            if children:
+                children[-1][0] += elapsed
+                children[-1][1] += size
+            for table, key in ((self.types, _type_name(t)),
+                               (self.functions, name)):
+                entry = table.get(key)
+                if entry is None:
+                    entry = table[key] = [0, 0.0, 0.0, 0, 0]
+                entry[0] += 1
+                entry[1] += elapsed
+                entry[2] += elapsed - inner_time
+                entry[3] += size
+                entry[4] += size - inner_size
+
+    def stats(self):
+        """Return the statistics as a dict."""
+        def entries(table):
+            return {key: {"calls": calls, "time": total, "own_time": own,
+                          "bytes": size, "own_bytes": own_size}
+                    for key, (calls, total, own, size, own_size)
+                    in table.items()}
+
+        frames = self.frames
+        stats = {
+            "dumps": self.dumps, "time": self.time, "bytes": self.bytes,
+            "types": entries(self.types),
+            "functions": entries(self.functions),
+            "opcodes": dict(self.opcodes),
+            "memo": {"hits": self.memo_hits, "misses": self.memo_misses},
+            "frames": {"count": len(frames), "bytes": sum(frames),
+                       "min": min(frames, default=0),
+                       "max": max(frames, default=0)},
+        }
+        if self.value_memo is not None:
+            stats["value_memo"] = self.value_memo.stats()
+        return stats
+
+    def report(self, limit=15):
+        """Return the statistics as text, with the *limit* types and save
+        functions that took the most time of their own."""
+        stats = self.stats()
+        lines = ["%d pickles, %d bytes in %.3f s" % (
+            stats["dumps"], stats["bytes"], stats["time"])]
+        for title in ("types", "functions"):
+            lines.append("")
+            lines.append("%-32s %9s %10s %10s %12s %12s" % (
+                "by " + title[:-1], "calls", "time", "own time", "bytes",
+                "own bytes"))
+            rows = sorted(stats[title].items(),
+                          key=lambda item: -item[1]["own_time"])
+            for key, entry in rows[:limit]:
+                lines.append("%-32s %9d %10.4f %10.4f %12d %12d" % (
+                    key[-32:], entry["calls"], entry["time"],
+                    entry["own_time"], entry["bytes"], entry["own_bytes"]))
+        lines.append("")
+        lines.append("opcodes: " + ", ".join(
+            "%s %d" % item for item in sorted(
+                stats["opcodes"].items(), key=lambda item: -item[1])))
+        memo = stats["memo"]
+        lines.append("memo: %d hits, %d misses" % (memo["hits"],
+                                                   memo["misses"]))
+        frames = stats["frames"]
+        if frames["count"]:
+            lines.append("frames: %d, %d bytes, %d to %d bytes each" % (
+                frames["count"], frames["bytes"], frames["min"],
+                frames["max"]))
+        return "\n".join(lines)
+
+
+# The codecs of CompressedFrameWriter: their tag in the block headers, their
+# module and the keyword of their compression level
+_FRAME_CODECS = {
+    'zlib': (b'z', 'zlib', 'level'),
+    'lzma': (b'x', 'lzma', 'preset'),
+    'bz2': (b'b', 'bz2', 'compresslevel'),
+}
+# Tag of the blocks stored as they are, which didn't compress
+_STORED = b'n'
+_BLOCK_HEADER = "<cI"
+_BLOCK_HEADER_SIZE = 5
+
+
+def _compress_block(compress, tag, data):
+    packed = compress(data)
+    if len(packed) >= len(data):
+        tag, packed = _STORED, bytes(data)
+    return pack(_BLOCK_HEADER, tag, len(packed)), packed
+
+
+class CompressedFrameWriter:
+    """A binary file for dump() and Pickler that compresses what is
+    written to it, in blocks, in threads, while pickling goes on.
+
+    What is written is cut into blocks of at least *block_size* bytes,
+    one for each frame of protocol 4 and 5 pickles, and large objects in
+    pieces.  Each block is compressed with *codec*, 'zlib', 'lzma' or
+    'bz2', at *level* (the codec's default if None) by the threads of
+    *executor*, or of a new ThreadPoolExecutor with *workers* threads;
+    the codecs release the GIL while they run.  The blocks are written
+    to *file* in order, each after a 5-byte header: a tag naming the
+    codec and the length of the block.  A block that doesn't compress is
+    stored as it is.  CompressedFrameReader reads the stream back.
+
+        with CompressedFrameWriter(f, 'zlib') as out:
+            dump(obj, out)
+
+    close() waits for the remaining blocks and writes them; it doesn't
+    close *file*.
+    """
+
+    def __init__(self, file, codec='zlib', *, level=None,
+                 block_size=_Framer._FRAME_SIZE_TARGET, workers=None,
+                 executor=None):
+        if codec not in _FRAME_CODECS:
+            raise ValueError("unknown codec %r" % (codec,))
+        tag, module, keyword = _FRAME_CODECS[codec]
+        compress = __import__(module).compress
+        if level is not None:
+            compress = partial(compress, **{keyword: level})
+        self.file = file
+        self.block_size = block_size
+        self._compress = partial(_compress_block, compress, tag)
+        self._own_executor = executor is None
+        if executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            executor = ThreadPoolExecutor(workers)
+        self._executor = executor
+        # Bounds the memory held by blocks waiting for their turn
+        self._max_pending = 2 * (workers or os.cpu_count() or 1)
+        self._pending = collections.deque()
+        self._buffer = bytearray()
+        self.closed = False
+
+    def write(self, data):
+        if self.closed:
+            raise ValueError("write to closed file")
+        size = len(data)
+        buffer = self._buffer
+        if size < self.block_size:
+            buffer += data
+            if len(buffer) >= self.block_size:
+                self._submit(bytes(buffer))
+                del buffer[:]
+            return size
+        if not isinstance(data, bytes):
+            # The block is compressed after this returns
+            data = bytes(data)
+        count = size // self.block_size
+        view = memoryview(data)
+        for i in range(count):
+            block = view[i * size // count:(i + 1) * size // count]
+            if buffer:
+                # What was written before goes in the first block
+                buffer += block
+                block = bytes(buffer)
+                del buffer[:]
+            self._submit(block)
+        return size
+
+    def _submit(self, data):
+        pending = self._pending
+        pending.append(self._executor.submit(self._compress, data))
+        while pending and (len(pending) > self._max_pending or
+                           pending[0].done()):
+            self._write_block(pending.popleft())
+
+    def _write_block(self, future):
+        header, data = future.result()
+        self.file.write(header)
+        self.file.write(data)
+
+    def flush(self):
+        """Compress and write everything written so far."""
+        if self._buffer:
+            self._submit(bytes(self._buffer))
+            del self._buffer[:]
+        pending = self._pending
+        while pending:
+            self._write_block(pending.popleft())
+        flush = getattr(self.file, 'flush', None)
+        if flush is not None:
+            flush()
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self.closed = True
+            if self._own_executor:
+                self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class CompressedFrameReader(io.BufferedIOBase):
+    """Read back the stream a CompressedFrameWriter wrote to *file*, as a
+    binary file for pickle.load() and Unpickler.
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self._block = b''
+        self._pos = 0
+        self._decompressors = {_STORED: bytes}
+
+    def readable(self):
+        return True
+
+    def _next_block(self):
+        # Decompress the next block; false at the end of the stream.
+        header = self.file.read(_BLOCK_HEADER_SIZE)
+        if not header:
+            return False
+        if len(header) < _BLOCK_HEADER_SIZE:
+            raise EOFError("compressed frame stream cut short")
+        tag, size = unpack(_BLOCK_HEADER, header)
+        decompress = self._decompressors.get(tag)
+        if decompress is None:
+            for codec_tag, module, keyword in _FRAME_CODECS.values():
+                if codec_tag == tag:
+                    break
+            else:
+                raise ValueError("unknown compressed frame tag %r" % (tag,))
+            decompress = self._decompressors[tag] = __import__(
+                module).decompress
+        data = self.file.read(size)
+        if len(data) < size:
+            raise EOFError("compressed frame stream cut short")
+        self._block = decompress(data)
+        self._pos = 0
+        return True
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = sys.maxsize
+        chunks = []
+        while size > 0:
+            if self._pos >= len(self._block) and not self._next_block():
+                break
+            chunk = self._block[self._pos:self._pos + size]
+            self._pos += len(chunk)
+            size -= len(chunk)
+            chunks.append(chunk)
+        return b''.join(chunks)
+
+    def readline(self, size=-1):
+        if size is None or size < 0:
+            size = sys.maxsize
+        chunks = []
+        while size > 0:
+            if self._pos >= len(self._block) and not self._next_block():
+                break
+            block = self._block
+            end = block.find(b'\n', self._pos, self._pos + size)
+            end = self._pos + size if end < 0 else end + 1
+            chunk = block[self._pos:end]
+            self._pos += len(chunk)
+            size -= len(chunk)
+            chunks.append(chunk)
+            if chunk.endswith(b'\n'):
+                break
+        return b''.join(chunks)
+
+
+def _dump(obj, file, protocol=None, *, fix_imports=True, buffer_callback=None,
+          iterative=False, value_memo=False, fast=False,
+          buffer_threshold=None):
     _Pickler(file, protocol, fix_imports=fix_imports,
-             buffer_callback=buffer_callback).dump(obj)
+             buffer_callback=buffer_callback, iterative=iterative,
+             value_memo=value_memo, fast=fast,
+             buffer_threshold=buffer_threshold).dump(obj)
 
 
-def _dumps(obj, protocol=None, *, fix_imports=True, buffer_callback=None):
+def _dumps(obj, protocol=None, *, fix_imports=True, buffer_callback=None,
+           iterative=False, value_memo=False, fast=False,
+           buffer_threshold=None):
     f = io.BytesIO()
     _Pickler(f, protocol, fix_imports=fix_imports,
-             buffer_callback=buffer_callback).dump(obj)
+             buffer_callback=buffer_callback, iterative=iterative,
+             value_memo=value_memo, fast=fast,
+             buffer_threshold=buffer_threshold).dump(obj)
     res = f.getvalue()
     assert isinstance(res, bytes_types)
     return res
 
 
+def _dumps_into(obj, buffer, protocol=None, *, fix_imports=True,
+                buffer_callback=None, iterative=False, value_memo=False,
+                fast=False, buffer_threshold=None):
+    sink = _BufferSink(buffer)
+    try:
+        _Pickler(sink, protocol, fix_imports=fix_imports,
+                 buffer_callback=buffer_callback, iterative=iterative,
+                 value_memo=value_memo, fast=fast,
+                 buffer_threshold=buffer_threshold).dump(obj)
+    finally:
+        sink.release()
+    if sink.resizable and len(buffer) != sink.size:
+        # Truncate the map, and the file it maps, to the pickle
+        buffer.resize(sink.size)
+    return sink.size
+
+
+def _dump_shared_memory(obj, protocol=None, *, size=None, name=None,
+                        fix_imports=True, iterative=False, value_memo=False,
+                        fast=False):
+    """Pickle obj into a new multiprocessing.shared_memory.SharedMemory
+    block and return the block and the length of the pickle.
+
+    The block is created with *size* bytes, or 1 MiB, and the pickle is
+    written in it from its start, with no intermediate copy; loads()
+    ignores the bytes that follow it.  If the pickle doesn't fit, it is
+    measured and pickled again into a block of its exact size, which
+    can't grow in place.  *name* is the name of the block, chosen by
+    SharedMemory if None.  The caller owns the block: it must close() it,
+    and unlink() it once no process needs it.
+    """
+    from multiprocessing.shared_memory import SharedMemory
+    while True:
+        shm = SharedMemory(name, create=True, size=size or 1 << 20)
+        sink = _BufferSink(shm.buf, measure=True)
+        try:
+            _Pickler(sink, protocol, fix_imports=fix_imports,
+                     iterative=iterative, value_memo=value_memo,
+                     fast=fast).dump(obj)
+        except BaseException:
+            sink.release()
+            shm.close()
+            shm.unlink()
+            raise
+        sink.release()
+        if sink.size <= shm.size:
+            return shm, sink.size
+        shm.close()
+        shm.unlink()
+        size = sink.size
+
+
+class _ChunkList(list):
+    # A file that keeps what is written to it for dump_async() to send.
+    write = list.append
+
+
+# Large objects are passed to the stream writer in pieces of this size
+_STREAM_CHUNK_SIZE = 1 << 20
+
+
+async def _dump_async(obj, writer, protocol=None, *, fix_imports=True,
+                      buffer_callback=None, value_memo=False, fast=False,
+                      buffer_threshold=None, yield_every=1000,
+                      yield_interval=0.005):
+    """Write a pickled representation of obj to the asyncio.StreamWriter
+    *writer* without blocking the event loop for the whole of it.
+
+    Each frame is written as soon as it is complete, and drain() is
+    awaited after it, so pickling stops while the transport is above its
+    high-water mark; large objects are written in pieces of 1 MiB.
+    Pickling also gives way to the other tasks, after at most
+    *yield_every* objects and *yield_interval* seconds, either of which
+    may be None.  The pickle is the one dump() writes with the same
+    arguments; the iterative engine is always used.
+    """
+    import asyncio
+    try:
+        loop = asyncio.get_running_loop()
+    except AttributeError:
+        # Python 3.6, where get_event_loop() gives the running loop when
+        # called from a coroutine
+        loop = asyncio.get_event_loop()
+    clock = loop.time
+    chunks = _ChunkList()
+    pickler = _Pickler(chunks, protocol, fix_imports=fix_imports,
+                       buffer_callback=buffer_callback, iterative=True,
+                       value_memo=value_memo, fast=fast,
+                       buffer_threshold=buffer_threshold)
+    limit = yield_every or 0
+    interval = yield_interval if yield_interval is not None else float('inf')
+    count = 0
+    deadline = clock() + interval
+
+    def checkpoint():
+        nonlocal count
+        count += 1
+        return bool(chunks) or count == limit or clock() >= deadline
+
+    async def send():
+        for chunk in chunks:
+            if len(chunk) <= _STREAM_CHUNK_SIZE:
+                writer.write(chunk)
+                await writer.drain()
+                continue
+            view = memoryview(chunk)
+            for start in range(0, len(view), _STREAM_CHUNK_SIZE):
+                writer.write(view[start:start + _STREAM_CHUNK_SIZE])
+                await writer.drain()
+        del chunks[:]
+
+    steps = pickler._dump_steps(obj, checkpoint)
+    try:
+        for _ in steps:
+            await send()
+            if count == limit or clock() >= deadline:
+                await asyncio.sleep(0)
+                count = 0
+                deadline = clock() + interval
+    finally:
+        steps.close()
+    await send()
+
+
+def _dumps_view(obj, protocol=None, *, fix_imports=True,
+                buffer_callback=None, iterative=False, value_memo=False,
+                fast=False, buffer_threshold=None):
+    buffer = bytearray()
+    _Pickler(buffer, protocol, fix_imports=fix_imports,
+             buffer_callback=buffer_callback, iterative=iterative,
+             value_memo=value_memo, fast=fast,
+             buffer_threshold=buffer_threshold).dump(obj)
+    return memoryview(buffer)
+
+
+class _ChunkPickler(_Pickler):
+    # Pickles a slice of the items of a container for parallel_dumps(),
+    # as complete frames with no PROTO or STOP.  Memo keys are written
+    # explicitly from 1 up, key 0 being the container's, so that the
+    # chunks can be concatenated: each chunk redefines the keys it uses
+    # before getting them.
+
+    def memoize(self, obj):
+        if self.fast:
+            return
+        memo = self.memo
+        assert id(obj) not in memo
+        idx = len(memo) + 1
+        if not self.bin:
+            self.write(PUT + repr(idx).encode("ascii") + b'\n')
+        elif idx < 256:
+            self.write(BINPUT + pack("<B", idx))
+        else:
+            self.write(LONG_BINPUT + pack("<I", idx))
+        memo.add(id(obj), idx, obj)
+
+
+def _pickle_chunk(kind, items, protocol, fix_imports):
+    buffer = bytearray()
+    pickler = _ChunkPickler(buffer, protocol, fix_imports=fix_imports)
+    pickler._refresh_save_strategies()
+    framer = pickler.framer
+    if pickler.proto >= 4:
+        framer.start_framing()
+    if kind is list:
+        pickler._batch_appends(items)
+    elif kind is dict:
+        pickler._batch_setitems(items)
+    else:
+        for x in items:
+            pickler.save(x)
+    framer.end_framing()
+    return buffer
+
+
+def _parallel_dumps(obj, protocol=None, *, workers=None, chunk_size=None,
+                    executor=None, fix_imports=True):
+    """Return the pickled representation of obj, pickling the items of a
+    large list, tuple or dict in parallel in worker processes.
+
+    The items are split into chunks of *chunk_size* items (by default
+    enough for four chunks per worker), which are sent to the worker
+    processes of *executor*, or of a new ProcessPoolExecutor with
+    *workers* processes, so they must be picklable by the standard
+    pickle module and importable by the workers.  The pickled chunks are
+    joined into a single stream.
+
+    Each chunk has its own memo: objects referred to several times within
+    a chunk are still pickled once, but sharing between the items of
+    different chunks, or between an item and obj itself, is not preserved
+    and such objects are unpickled as separate copies.  The stream differs
+    from the one dumps() returns, but unpickles the same otherwise.
+
+    Other objects, and containers with too few items to split, are pickled
+    with dumps().
+    """
+    if protocol is None:
+        protocol = DEFAULT_PROTOCOL
+    if protocol < 0:
+        protocol = HIGHEST_PROTOCOL
+    kind = type(obj)
+    if kind not in (list, tuple, dict):
+        return _dumps(obj, protocol, fix_imports=fix_imports)
+    if executor is None:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(workers) as executor:
+            return _parallel_dumps(obj, protocol, workers=workers,
+                                   chunk_size=chunk_size, executor=executor,
+                                   fix_imports=fix_imports)
+    n = len(obj)
+    if chunk_size is None:
+        chunk_size = -(-n // (4 * (workers or os.cpu_count() or 1)))
+    # Whole APPENDS and SETITEMS batches, as in the sequential stream
+    batch = _Pickler._BATCHSIZE
+    chunk_size = max(batch, -(-chunk_size // batch) * batch)
+    if n <= chunk_size:
+        return _dumps(obj, protocol, fix_imports=fix_imports)
+
+    items = list(obj.items()) if kind is dict else obj
+    futures = [executor.submit(_pickle_chunk, kind, items[i:i + chunk_size],
+                               protocol, fix_imports)
+               for i in range(0, n, chunk_size)]
+
+    buffer = bytearray()
+    pickler = _Pickler(buffer, protocol, fix_imports=fix_imports)
+    framer = pickler.framer
+    write = pickler.write
+    if protocol >= 2:
+        write(PROTO + pack("<B", protocol))
+    if protocol >= 4:
+        framer.start_framing()
+    if kind is tuple:
+        write(MARK)
+    else:
+        if kind is list:
+            write(EMPTY_LIST if pickler.bin else MARK + LIST)
+        else:
+            write(EMPTY_DICT if pickler.bin else MARK + DICT)
+        write(pickler.put(0))
+    for future in futures:
+        # Chunks are made of whole frames, so they go between frames.
+        framer.write_large_bytes(b'', future.result())
+    if kind is tuple:
+        write(TUPLE)
+        write(pickler.put(0))
+    write(STOP)
+    framer.end_framing()
+    return bytes(buffer)
+
+
 # Use the python version _pickle
 Pickler = _Pickler
 dump, dumps, = _dump, _dumps
+dumps_into, dumps_view = _dumps_into, _dumps_view
+dump_shared_memory = _dump_shared_memory
+dump_async = _dump_async
+parallel_dumps = _parallel_dumps
@@ -0,0 +1,79 @@
+import array
+import copyreg
+import io
+import pickle as std_pickle
+import unittest
+
+from black_test.Base_test_class import BaseTestClass
+from lib_pickle import pickle
+
+
+class OverridingPickler(pickle._Pickler):
+    def reducer_override(self, obj):
+        if type(obj) is array.array:
+            return list, (obj.tolist(),)
+        return NotImplemented
+
+
+def reduce_array(obj):
+    return list, (obj.tolist(),)
+
+
+class TestArray(BaseTestClass):
+    # TC_078
+    def test_same_output(self):
+        one = array.array("B", [7])
+        empty = array.array("d")
+        val = [[array.array(t, range(50)) for t in "bBhHiIlLqQfd"],
+               [one, array.array("B", [7]), empty, array.array("i"), one],
+               array.array("u", "h\xe9llo€"),
+               array.array("d", range(20000)),
+               array.array("b", range(-100, 100)) * 400]
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            for iterative in (False, True):
+                with self.subTest(protocol=protocol, iterative=iterative):
+                    data = pickle.dumps(val, protocol, iterative=iterative)
+                    self.assertEqual(data, std_pickle._dumps(val, protocol))
+                    loaded = std_pickle.loads(data)
+                    self.assertEqual(loaded, val)
+                    self.assertIs(loaded[1][0], loaded[1][4])
+
+    # TC_079
+    def test_memoryview(self):
+        data = bytes(range(256)) * 300
+        ints = array.array("i", range(1000))
+        views = [memoryview(data), memoryview(bytearray(b"abc")),
+                 memoryview(ints), memoryview(data)[10:20],
+                 memoryview(ints).cast("B").cast("i", (10, 100)),
+                 memoryview(b"")]
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            for view in views:
+                with self.subTest(protocol=protocol, view=view):
+                    loaded = std_pickle.loads(
+                        pickle.dumps([view, view], protocol))
+                    self.assertEqual(loaded, [view.tobytes()] * 2)
+                    self.assertIs(type(loaded[0]), bytes)
+            with self.assertRaises(TypeError):
+                pickle.dumps(memoryview(data)[::2], protocol)
+        self.assertEqual(pickle.dumps(memoryview(data), 4),
+                         std_pickle._dumps(data, 4))
+
+    # TC_080
+    def test_hooks(self):
+        val = [array.array("d", [1.5, 2.5])]
+        f = io.BytesIO()
+        OverridingPickler(f, 4).dump(val)
+        self.assertEqual(std_pickle.loads(f.getvalue()), [[1.5, 2.5]])
+        copyreg.pickle(array.array, reduce_array)
+        try:
+            self.assertEqual(std_pickle.loads(pickle.dumps(val, 4)),
+                             [[1.5, 2.5]])
+            self.assertEqual(pickle.dumps(val, 4), std_pickle._dumps(val, 4))
+        finally:
+            del copyreg.dispatch_table[array.array]
+        self.assertEqual(pickle.dumps(val, 4, value_memo=True),
+                         std_pickle._dumps(val, 4))
+
+
+if __name__ == '__main__':
+    unittest.main()
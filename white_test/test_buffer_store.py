@@ -0,0 +1,122 @@
+import array
+import os
+import pickle as std_pickle
+import shutil
+import tempfile
+import unittest
+
+from black_test.Base_test_class import BaseTestClass
+from lib_pickle import pickle
+
+THRESHOLD = 4096
+
+
+def values():
+    data = os.urandom(3 * THRESHOLD)
+    return {
+        "bytes": data,
+        "same bytes": data,
+        "bytearray": bytearray(data),
+        "memoryview": memoryview(bytearray(data)),
+        "doubles": array.array("d", range(THRESHOLD)),
+        "shorts": array.array("h", range(-THRESHOLD, THRESHOLD)),
+        "at threshold": bytes(THRESHOLD),
+        "below threshold": bytes(THRESHOLD - 1),
+        "small array": array.array("i", [1, 2, 3]),
+    }
+
+
+class TestBufferStore(BaseTestClass):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "buffers")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    # TC_075
+    def test_round_trip(self):
+        val = values()
+        expected = dict(val, memoryview=bytes(val["memoryview"]))
+        for iterative in (False, True):
+            with self.subTest(iterative=iterative):
+                with pickle.BufferStore(self.path, "w") as store:
+                    data = pickle.dumps(val, 5, buffer_callback=store,
+                                        buffer_threshold=THRESHOLD,
+                                        iterative=iterative)
+                self.assertEqual(len(store), 6)
+                self.assertLess(len(data), 2 * THRESHOLD)
+                with pickle.BufferStore(self.path) as store:
+                    loaded = std_pickle.loads(data, buffers=store)
+                    self.assertIs(loaded["same bytes"], loaded["bytes"])
+                    for key in ("bytes", "bytearray", "doubles",
+                                "small array"):
+                        self.assertIs(type(loaded[key]), type(val[key]))
+                    self.assertIsInstance(loaded["memoryview"], memoryview)
+                    loaded["memoryview"] = bytes(loaded["memoryview"])
+                    self.assertEqual(loaded, expected)
+                    # The loaded memoryview is a view of the mapping
+                    self.assertEqual(store[2], expected["memoryview"])
+        # Without a threshold nothing changes
+        self.assertEqual(pickle.dumps(val["bytes"], 5,
+                                      buffer_callback=lambda b: False),
+                         std_pickle._dumps(val["bytes"], 5,
+                                           buffer_callback=lambda b: False))
+
+    # TC_076
+    def test_layout(self):
+        chunks = [os.urandom(n) for n in (THRESHOLD, THRESHOLD + 1, 10000)]
+        with pickle.BufferStore(self.path, "w") as store:
+            pickles = [pickle.dumps([chunk, bytearray(chunk)], 5,
+                                    buffer_callback=store,
+                                    buffer_threshold=THRESHOLD)
+                       for chunk in chunks]
+        with pickle.BufferStore(self.path) as store:
+            self.assertEqual(len(store), 2 * len(chunks))
+            for offset, size in store._entries:
+                self.assertEqual(offset % store.ALIGNMENT, 0)
+            # Pickles that share a store are loaded with one iterator
+            buffers = iter(store)
+            for chunk, data in zip(chunks, pickles):
+                self.assertEqual(std_pickle.loads(data, buffers=buffers),
+                                 [chunk, bytearray(chunk)])
+            self.assertEqual(store[5], chunks[2])
+            # Copy-on-write
+            view = store[0]
+            view[0] ^= 0xff
+            self.assertNotEqual(view, chunks[0])
+            with self.assertRaises(BufferError):
+                store.close()
+            view.release()
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(THRESHOLD), chunks[0])
+
+    # TC_077
+    def test_errors_and_other_callbacks(self):
+        with self.assertRaisesRegex(ValueError, "needs a buffer_callback"):
+            pickle.dumps(b"", 5, buffer_threshold=0)
+        with self.assertRaisesRegex(ValueError, "protocol >= 5"):
+            pickle.dumps(b"", 4, buffer_callback=list.append,
+                         buffer_threshold=0)
+        with self.assertRaises(ValueError):
+            pickle.BufferStore(self.path, "a")
+        # Non-contiguous memoryviews still can't be pickled
+        view = memoryview(bytearray(2 * THRESHOLD))[::2]
+        with self.assertRaises(TypeError):
+            pickle.dumps(view, 5, buffer_callback=list.append,
+                         buffer_threshold=0)
+        # Any buffer_callback will do, and buffers it keeps in-band are
+        # pickled inside the rebuilding call
+        val = [bytes(THRESHOLD), array.array("b", range(100))]
+        buffers = []
+        data = pickle.dumps(val, 5, buffer_callback=buffers.append,
+                            buffer_threshold=100)
+        self.assertEqual(len(buffers), 2)
+        self.assertEqual(std_pickle.loads(data, buffers=buffers), val)
+        data = pickle.dumps(val, 5, buffer_callback=lambda b: True,
+                            buffer_threshold=100)
+        self.assertEqual(std_pickle.loads(data), val)
+
+
+if __name__ == '__main__':
+    unittest.main()
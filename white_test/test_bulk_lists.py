@@ -0,0 +1,86 @@
+import io
+import pickle as std_pickle
+import unittest
+
+from black_test.Base_test_class import BaseTestClass
+from lib_pickle import pickle
+
+
+class ItemwisePickler(pickle.Pickler):
+    # A reducer_override() makes every item observable, which turns the
+    # bulk encoders off.
+    def reducer_override(self, obj):
+        return NotImplemented
+
+
+class LongMemoPickler(pickle.Pickler):
+    # Writes every memo key on four bytes
+    def put(self, idx):
+        return std_pickle.LONG_BINPUT + idx.to_bytes(4, "little")
+
+    def get(self, i):
+        return std_pickle.LONG_BINGET + i.to_bytes(4, "little")
+
+
+class StdLongMemoPickler(std_pickle._Pickler):
+    put = LongMemoPickler.put
+    get = LongMemoPickler.get
+
+
+def itemwise_dumps(obj, protocol):
+    f = io.BytesIO()
+    ItemwisePickler(f, protocol).dump(obj)
+    return f.getvalue()
+
+
+class TestBulkLists(BaseTestClass):
+    # TC_027
+    def test_homogeneous_lists(self):
+        shared = "shared"
+        test_cases = {
+            "bulk_small_ints": [i % 256 for i in range(5000)],
+            "bulk_int16": [256 + i for i in range(5000)],
+            "bulk_int32": [-i * 1000 for i in range(5000)],
+            "bulk_mixed_ints": [(-1) ** i * i ** 3 for i in range(5000)],
+            "bulk_big_ints": [2 ** 40 + i for i in range(5000)],
+            "bulk_floats": [i / 7 for i in range(20000)],
+            "bulk_special_floats": [float("inf"), float("-inf"), -0.0] * 9,
+            "bulk_strs": [str(i) * (i % 300) for i in range(5000)],
+            "bulk_shared_strs": [shared, "x", shared] * 2000,
+            "bulk_large_strs": ["a", "b" * (64 * 1024), "c"],
+            "bulk_bools": [True, False] * 100,
+            "bulk_one_item": [1.5],
+        }
+        for name, val in test_cases.items():
+            for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+                with self.subTest(name=name, protocol=protocol):
+                    self.assertEqual(pickle.dumps(val, protocol),
+                                     itemwise_dumps(val, protocol))
+            with self.subTest(name=name):
+                self.dump_and_check(val, name)
+
+    # TC_028
+    def test_batch_across_frames(self):
+        # Batches that straddle the frame boundary at every possible offset
+        for size in range(9):
+            val = ["x" * size] + [i / 3 for i in range(7300)]
+            with self.subTest(size=size):
+                self.assertEqual(pickle.dumps(val, 4),
+                                 itemwise_dumps(val, 4))
+
+    # TC_098
+    def test_overridden_memo_opcodes(self):
+        shared = "shared"
+        val = [[shared, "x", shared] * 100,
+               {"key%d" % i: shared for i in range(100)}]
+        for protocol in range(1, pickle.HIGHEST_PROTOCOL + 1):
+            with self.subTest(protocol=protocol):
+                f = io.BytesIO()
+                LongMemoPickler(f, protocol).dump(val)
+                expected = io.BytesIO()
+                StdLongMemoPickler(expected, protocol).dump(val)
+                self.assertEqual(f.getvalue(), expected.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
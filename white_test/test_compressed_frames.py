@@ -0,0 +1,98 @@
+import io
+import os
+import pickle as std_pickle
+import struct
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from black_test.Base_test_class import BaseTestClass
+from lib_pickle import pickle
+
+VALUE = [list(range(50000)), {str(i): i / 3 for i in range(3000)},
+         b"x" * (1 << 20), "\xe9" * 70000, ["shared"] * 10]
+
+
+def blocks(data):
+    # The tag and size of every block of a compressed stream
+    result = []
+    pos = 0
+    while pos < len(data):
+        tag, size = struct.unpack_from("<cI", data, pos)
+        result.append((tag, size))
+        pos += 5 + size
+    return result
+
+
+class TestCompressedFrames(BaseTestClass):
+    # TC_087
+    def test_round_trip(self):
+        for codec in ("zlib", "lzma", "bz2"):
+            for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+                with self.subTest(codec=codec, protocol=protocol):
+                    f = io.BytesIO()
+                    with pickle.CompressedFrameWriter(f, codec,
+                                                      level=1) as out:
+                        pickle.dump(VALUE, out, protocol)
+                        pickle.dump("next", out, protocol)
+                    expected = std_pickle._dumps(VALUE, protocol)
+                    self.assertLess(len(f.getvalue()), len(expected) // 4)
+                    f.seek(0)
+                    reader = pickle.CompressedFrameReader(f)
+                    self.assertEqual(std_pickle.load(reader), VALUE)
+                    self.assertEqual(std_pickle.load(reader), "next")
+                    self.assertEqual(reader.read(), b"")
+                    f.seek(0)
+                    self.assertEqual(
+                        pickle.CompressedFrameReader(f).read(),
+                        expected + std_pickle._dumps("next", protocol))
+
+    # TC_088
+    def test_blocks(self):
+        noise = os.urandom(300000)
+        f = io.BytesIO()
+        with ThreadPoolExecutor(2) as executor:
+            out = pickle.CompressedFrameWriter(f, block_size=1 << 16,
+                                               workers=2, executor=executor)
+            pickle.dump([VALUE, noise], out, 4)
+            out.close()
+            out.close()
+            # A given executor is left running
+            self.assertEqual(executor.submit(len, "ab").result(), 2)
+        with self.assertRaises(ValueError):
+            out.write(b"x")
+        found = blocks(f.getvalue())
+        self.assertEqual({tag for tag, size in found}, {b"z", b"n"})
+        # Blocks of at least block_size bytes: one per frame, and large
+        # objects in pieces, with what preceded them in the first one
+        raw = std_pickle._dumps([VALUE, noise], 4)
+        self.assertLessEqual(len(found), len(raw) // (1 << 16) + 1)
+        # The noise is stored as it is
+        stored = [size for tag, size in found
+                  if tag == b"n" and size >= 1 << 16]
+        self.assertEqual(len(stored), len(noise) // (1 << 16))
+        self.assertLess(sum(stored) - len(noise), 1 << 16)
+        f.seek(0)
+        self.assertEqual(pickle.CompressedFrameReader(f).read(), raw)
+        with self.assertRaises(ValueError):
+            pickle.CompressedFrameWriter(io.BytesIO(), "gzip")
+
+    # TC_089
+    def test_reader_errors(self):
+        f = io.BytesIO()
+        with pickle.CompressedFrameWriter(f, "bz2") as out:
+            pickle.dump(VALUE, out, 5)
+        data = f.getvalue()
+        for end in (3, 5, len(data) - 1):
+            with self.subTest(end=end):
+                with self.assertRaises(EOFError):
+                    std_pickle.load(
+                        pickle.CompressedFrameReader(io.BytesIO(data[:end])))
+        with self.assertRaisesRegex(ValueError, "unknown compressed frame"):
+            pickle.CompressedFrameReader(io.BytesIO(b"?" + data[1:])).read()
+        reader = pickle.CompressedFrameReader(io.BytesIO(data))
+        self.assertEqual(reader.read(3), std_pickle._dumps(VALUE, 5)[:3])
+        self.assertEqual(reader.readline(0), b"")
+
+
+if __name__ == '__main__':
+    unittest.main()
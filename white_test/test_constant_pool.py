@@ -0,0 +1,75 @@
+import pickle as std_pickle
+import pickletools
+import unittest
+
+from black_test.Base_test_class import BaseTestClass
+from lib_pickle import pickle
+
+
+def fresh(s):
+    # An equal str that is a distinct object
+    return "".join(list(s))
+
+
+class TestConstantPool(BaseTestClass):
+    # TC_066
+    def test_same_output(self):
+        ints = list(range(-300, 70000, 7)) + [-256, -1, 0, 255, 256, 65535,
+                                              65536, 2 ** 31, -2 ** 31 - 1]
+        val = [ints, [x for i in ints for x in (i, str(i), i % 3 == 0)],
+               {str(i): (i, None, True, False) for i in ints[:500]},
+               ["€", "\udc80", "x" * 64, "y" * 65, "a\\b\n"]]
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            for iterative in (False, True):
+                with self.subTest(protocol=protocol, iterative=iterative):
+                    self.assertEqual(
+                        pickle.dumps(val, protocol, iterative=iterative),
+                        std_pickle._dumps(val, protocol))
+                    for obj in (-256, -1, 0, 256, 65535, True, False, None,
+                                "short"):
+                        self.assertEqual(pickle.dumps(obj, protocol),
+                                         std_pickle._dumps(obj, protocol))
+
+    # TC_067
+    def test_memo_unchanged(self):
+        word = fresh("shared word")
+        escaped = fresh("back\\slash")
+        val = [word, word, fresh("shared word"), escaped, escaped]
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            with self.subTest(protocol=protocol):
+                data = pickle.dumps(val, protocol)
+                self.assertEqual(data, std_pickle._dumps(val, protocol))
+                # Only the same object is fetched from the memo, not an
+                # equal one whose encoding came from the cache.  Protocol 0
+                # memoizes the escaped copy of a str with a backslash, so
+                # that str is written twice.
+                gets = [op.name for op, _, _ in pickletools.genops(data)
+                        if "GET" in op.name]
+                self.assertEqual(len(gets), 2 if protocol else 1)
+
+    # TC_068
+    def test_pools(self):
+        self.assertIs(pickle._constant_pool(2), pickle._constant_pool(3))
+        self.assertIs(pickle._constant_pool(4), pickle._constant_pool(5))
+        self.assertIsNot(pickle._constant_pool(1), pickle._constant_pool(2))
+        self.assertIs(pickle._constant_pool(1).ints,
+                      pickle._constant_pool(4).ints)
+        # Protocol 0 strs that have to be escaped aren't cached
+        self.assertEqual(pickle._constant_pool(0).encode_str("ab"), b"Vab\n")
+        self.assertIsNone(pickle._constant_pool(0).encode_str("a\\b"))
+        pool = pickle._constant_pool(4)
+        self.assertEqual(len(pool.ints), 65536 + 256)
+        # The binary protocols encode strs inline
+        self.assertIsNone(pool.encode_str)
+        pool = pickle._constant_pool(0)
+        encode_str = pool.encode_str
+        pickle.dumps([str(i) for i in range(2 * pool.STR_CACHE_SIZE)], 0)
+        info = encode_str.cache_info()
+        self.assertEqual(info.maxsize, pool.STR_CACHE_SIZE)
+        self.assertEqual(info.currsize, pool.STR_CACHE_SIZE)
+        # Long strs don't go through the cache
+        pickle.dumps("z" * (pool.SHORT_STR + 1), 0)
+        self.assertEqual(encode_str.cache_info().misses, info.misses)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import asyncio
+import pickle as std_pickle
+import socket
+import unittest
+
+from black_test.Base_test_class import BaseTestClass
+from lib_pickle import pickle
+
+VALUE = [list(range(50000)), {str(i): i / 3 for i in range(3000)},
+         b"x" * (3 << 20), ["shared"] * 10, (1, [2, (3,)]), {1, 2},
+         frozenset("ab"), "\xe9" * 70000, [[[]]]]
+
+
+async def connect():
+    # Both ends of a local connection; the first is read from.
+    a, b = socket.socketpair()
+    reader, reader_writer = await asyncio.open_connection(sock=a)
+    writer_reader, writer = await asyncio.open_connection(sock=b)
+    return reader, writer, (reader_writer, writer_reader)
+
+
+class TestDumpAsync(BaseTestClass):
+    def run_async(self, coro):
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(coro)
+        finally:
+            loop.close()
+
+    # TC_084
+    def test_same_output(self):
+        async def dump_and_read(protocol, **kwargs):
+            reader, writer, ends = await connect()
+            expected = std_pickle._dumps(VALUE, protocol)
+            task = asyncio.ensure_future(
+                pickle.dump_async(VALUE, writer, protocol, **kwargs))
+            data = await reader.readexactly(len(expected))
+            await task
+            writer.close()
+            return data, expected
+
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            for kwargs in ({}, {"yield_every": 1},
+                           {"yield_every": None, "yield_interval": None},
+                           {"yield_interval": 0}):
+                with self.subTest(protocol=protocol, **kwargs):
+                    data, expected = self.run_async(
+                        dump_and_read(protocol, **kwargs))
+                    self.assertEqual(data, expected)
+
+    # TC_085
+    def test_backpressure_and_yields(self):
+        async def main():
+            reader, writer, ends = await connect()
+            writer.transport.set_write_buffer_limits(high=1 << 16)
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0)
+
+            ticking = asyncio.ensure_future(ticker())
+            val = [list(range(200000)), [str(i) for i in range(50000)],
+                   b"y" * (8 << 20)]
+            expected = std_pickle._dumps(val, 5)
+            task = asyncio.ensure_future(
+                pickle.dump_async(val, writer, 5, yield_every=100))
+            # Nothing is read: pickling stops once the socket and the
+            # transport are full, long before the end of the pickle.
+            await asyncio.sleep(0.2)
+            self.assertFalse(task.done())
+            self.assertLessEqual(writer.transport.get_write_buffer_size(),
+                                 (1 << 16) + (1 << 20))
+            self.assertGreater(ticks, 10)
+            data = await reader.readexactly(len(expected))
+            await task
+            ticking.cancel()
+            writer.close()
+            self.assertEqual(data, expected)
+
+        self.run_async(main())
+
+    # TC_086
+    def test_error(self):
+        async def main():
+            reader, writer, ends = await connect()
+            with self.assertRaises(pickle.PicklingError):
+                await pickle.dump_async([list(range(10 ** 5)), lambda: 0],
+                                        writer, 4)
+            # What came before the error was sent, as with dump()
+            writer.close()
+            data = await reader.read()
+            self.assertGreater(len(data), 0)
+            self.assertLess(len(data),
+                            len(std_pickle._dumps(list(range(10 ** 5)), 4)))
+
+        self.run_async(main())
+
+
+if __name__ == '__main__':
+    unittest.main()
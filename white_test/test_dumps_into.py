@@ -0,0 +1,77 @@
+import gc
+import io
+import pickle as std_pickle
+import tracemalloc
+import unittest
+
+from black_test.Base_test_class import BaseTestClass
+from lib_pickle import pickle
+
+
+def peak_memory(func):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+class TestDumpsInto(BaseTestClass):
+    values = [None, [1, 2, 3], list(range(100000)),
+              [b"x" * 200000, "y" * 70000, bytearray(100000)],
+              [str(i) for i in range(30000)]]
+
+    # TC_041
+    def test_same_output(self):
+        for val in self.values:
+            for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+                with self.subTest(protocol=protocol):
+                    expected = std_pickle._dumps(val, protocol)
+                    self.assertEqual(pickle.dumps_view(val, protocol),
+                                     expected)
+                    buffer = bytearray(b"old contents")
+                    n = pickle.dumps_into(val, buffer, protocol)
+                    self.assertEqual(n, len(expected))
+                    self.assertEqual(buffer[:n], expected)
+                    buffer = memoryview(bytearray(n + 10))
+                    self.assertEqual(pickle.dumps_into(val, buffer, protocol),
+                                     n)
+                    self.assertEqual(buffer[:n], expected)
+
+    # TC_042
+    def test_pickler_appends_to_bytearray(self):
+        val = [b"x" * 200000, list(range(30000)), [1, 2, 3]]
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            with self.subTest(protocol=protocol):
+                f = io.BytesIO()
+                std_pickler = std_pickle._Pickler(f, protocol)
+                buffer = bytearray(b"head")
+                pickler = pickle._Pickler(buffer, protocol)
+                for _ in range(2):
+                    std_pickler.dump(val)
+                    pickler.dump(val)
+                self.assertEqual(buffer, b"head" + f.getvalue())
+                with self.assertRaises(pickle.PicklingError):
+                    pickler.dump([1, lambda: None])
+                self.assertEqual(buffer, b"head" + f.getvalue())
+
+    # TC_043
+    def test_buffer_too_small(self):
+        with self.assertRaises(ValueError):
+            pickle.dumps_into(list(range(1000)), memoryview(bytearray(100)))
+
+    # TC_044
+    def test_peak_memory(self):
+        val = [bytes(1000) + b"%d" % i for i in range(20000)]
+        size = len(pickle.dumps(val, 4))
+        buffer = bytearray(size)
+        self.assertGreater(peak_memory(lambda: pickle.dumps(val, 4)), size)
+        self.assertLess(
+            peak_memory(lambda: pickle.dumps_into(val, buffer, 4)),
+            size // 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
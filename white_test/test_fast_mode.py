@@ -0,0 +1,104 @@
+import io
+import pickle as std_pickle
+import pickletools
+import unittest
+
+from black_test.Base_test_class import BaseTestClass
+from black_test.test_nested import Address, Person
+from lib_pickle import pickle
+
+
+def reference_fast_dumps(obj, protocol):
+    f = io.BytesIO()
+    pickler = std_pickle._Pickler(f, protocol)
+    pickler.fast = 1
+    pickler.dump(obj)
+    return f.getvalue()
+
+
+class ReducingPickler(pickle._Pickler):
+    def reducer_override(self, obj):
+        if type(obj) is Address:
+            return Address, (obj.street, obj.city, obj.zip_code)
+        return NotImplemented
+
+
+class TestFastMode(BaseTestClass):
+    # TC_054
+    def test_no_memo_opcodes(self):
+        shared = ["shared", 1.5]
+        val = [shared, shared, {"a": (shared, "x" * 300)},
+               Person("John Doe", 30, Address("123 Main St", "Anytown", "1")),
+               frozenset([1, 2]), {3, 4}, bytearray(b"ab"),
+               [str(i) for i in range(3000)]]
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            for iterative in (False, True):
+                with self.subTest(protocol=protocol, iterative=iterative):
+                    data = pickle.dumps(val, protocol, fast=True,
+                                        iterative=iterative)
+                    self.assertEqual(data,
+                                     reference_fast_dumps(val, protocol))
+                    opcodes = {op.name for op, _, _ in
+                               pickletools.genops(data)}
+                    self.assertFalse(opcodes & {"PUT", "BINPUT",
+                                                "LONG_BINPUT", "MEMOIZE"})
+                    res = std_pickle.loads(data)
+                    self.assertEqual(res[:3], val[:3])
+                    self.assertIsNot(res[0], res[1])
+                    self.assertEqual(res[7], val[7])
+
+    # TC_055
+    def test_cycles_raise(self):
+        lst = [1]
+        lst.append(lst)
+        dct = {}
+        dct["self"] = [dct]
+        tup = ([],)
+        tup[0].append(tup)
+        person = Person("John Doe", 30, None)
+        person.address = [person]
+        address = Address("123 Main St", "Anytown", None)
+        address.zip_code = address
+        for iterative in (False, True):
+            for val in (lst, dct, tup, person):
+                for protocol in (0, 2, 4):
+                    with self.subTest(val=type(val), protocol=protocol,
+                                      iterative=iterative):
+                        f = io.BytesIO()
+                        pickler = pickle._Pickler(f, protocol, fast=True,
+                                                  iterative=iterative)
+                        with self.assertRaisesRegex(pickle.PicklingError,
+                                                    "cyclic"):
+                            pickler.dump(val)
+                        # The pickler is still usable
+                        pickler.dump([1, (2, 3)])
+                        self.assertEqual(pickler._in_progress, set())
+            with self.subTest(reducer_override=True, iterative=iterative):
+                pickler = ReducingPickler(io.BytesIO(), fast=True,
+                                          iterative=iterative)
+                with self.assertRaises(pickle.PicklingError):
+                    pickler.dump(address)
+
+    # TC_056
+    def test_keyword(self):
+        val = {"k": [1, 2, "three"], "t": ("a", "b")}
+        expected = reference_fast_dumps(val, 4)
+        self.assertEqual(pickle.dumps(val, 4, fast=True), expected)
+        f = io.BytesIO()
+        pickle.dump(val, f, 4, fast=True)
+        self.assertEqual(f.getvalue(), expected)
+        self.assertEqual(bytes(pickle.dumps_view(val, 4, fast=True)), expected)
+        buffer = bytearray(100)
+        size = pickle.dumps_into(val, buffer, 4, fast=True)
+        self.assertEqual(buffer[:size], expected)
+        self.assertNotEqual(pickle.dumps(val, 4), expected)
+        # Setting the attribute after __init__() works too
+        f = io.BytesIO()
+        pickler = pickle.Pickler(f, 4)
+        pickler.fast = 1
+        pickler.dump(val)
+        self.assertEqual(f.getvalue(), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+
+from black_test.Base_test_class import BaseTestClass
+from lib_pickle import pickle
+from white_test.test_bulk_lists import itemwise_dumps
+
+
+class TestFlatDicts(BaseTestClass):
+    # TC_029
+    def test_scalar_items(self):
+        shared = "shared"
+        test_cases = {
+            "flat_record": {"id": 7, "name": "Alice", "score": 1.5,
+                            "active": True, "manager": None, "age": 300,
+                            "balance": -70000, "big": 2 ** 70},
+            "flat_records": [{"id": i, "name": str(i), "ok": i % 2 == 0}
+                             for i in range(500)],
+            "flat_config": {"option_%d" % i: "value_%d" % (i % 7)
+                            for i in range(3000)},
+            "flat_int_keys": {i: i / 3 for i in range(3000)},
+            "flat_shared_values": {str(i): shared for i in range(300)},
+            "flat_large_value": {"a": "x" * (64 * 1024), "b": 1},
+            "flat_mixed": {"a": [1], "b": 2},
+        }
+        for name, val in test_cases.items():
+            for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+                with self.subTest(name=name, protocol=protocol):
+                    self.assertEqual(pickle.dumps(val, protocol),
+                                     itemwise_dumps(val, protocol))
+            with self.subTest(name=name):
+                self.dump_and_check(val, name)
+
+    # TC_030
+    def test_many_memoized_keys(self):
+        # More than 256 memoized keys need LONG_BINGET
+        keys = ["key%d" % i for i in range(600)]
+        val = [dict.fromkeys(keys, 0), dict.fromkeys(keys, 1)]
+        for protocol in (1, 3, 4):
+            with self.subTest(protocol=protocol):
+                self.assertEqual(pickle.dumps(val, protocol),
+                                 itemwise_dumps(val, protocol))
+
+
+if __name__ == '__main__':
+    unittest.main()
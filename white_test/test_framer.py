@@ -0,0 +1,65 @@
+import io
+import pickle as std_pickle
+import unittest
+
+from black_test.Base_test_class import BaseTestClass
+from lib_pickle import pickle
+
+
+class ChunkFile:
+    # Keeps whatever write() is given
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(data)
+
+
+class TestFramer(BaseTestClass):
+    # TC_035
+    def test_one_write_per_frame(self):
+        val = [str(i) for i in range(50000)]
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            with self.subTest(protocol=protocol):
+                f = ChunkFile()
+                pickle._Pickler(f, protocol).dump(val)
+                data = b"".join(f.chunks)
+                self.assertEqual(data, std_pickle._dumps(val, protocol))
+                if protocol >= 4:
+                    # PROTO, then each frame with its header
+                    self.assertEqual(len(f.chunks[0]), 2)
+                    for chunk in f.chunks[1:-1]:
+                        self.assertEqual(chunk[:1], pickle.FRAME)
+                        self.assertGreaterEqual(
+                            len(chunk), pickle._Framer._FRAME_SIZE_TARGET)
+                else:
+                    # Coalesced into chunks of about the frame size
+                    self.assertLessEqual(
+                        len(f.chunks),
+                        len(data) // pickle._Framer._FRAME_SIZE_TARGET + 1)
+
+    # TC_036
+    def test_retained_chunks_stay_valid(self):
+        val = [b"x" * 100000, list(range(30000)), "y" * 70000, None]
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            with self.subTest(protocol=protocol):
+                f = ChunkFile()
+                pickle._Pickler(f, protocol).dump(val)
+                self.assertEqual(b"".join(f.chunks),
+                                 std_pickle._dumps(val, protocol))
+                self.dump_and_check(val, "framer_retained", protocol)
+
+    # TC_037
+    def test_reused_pickler_after_error(self):
+        f = io.BytesIO()
+        pickler = pickle._Pickler(f, 4)
+        with self.assertRaises(pickle.PicklingError):
+            pickler.dump([1, 2, lambda: None])
+        f.seek(0)
+        f.truncate()
+        pickler.dump([1, 2, 3])
+        self.assertEqual(f.getvalue(), std_pickle._dumps([1, 2, 3], 4))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+import copyreg
+import gc
+import pickle as std_pickle
+import sys
+import types
+import unittest
+import weakref
+
+from black_test.Base_test_class import BaseTestClass
+from black_test.test_customer_class import Person
+from lib_pickle import pickle
+
+MODULE = "global_refs_test_module"
+
+
+class Point:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+def reduce_point(point):
+    return Point, (point.x, point.y)
+
+
+def reduce_point_swapped(point):
+    return Point, (point.y, point.x)
+
+
+def make_module(**attrs):
+    module = types.ModuleType(MODULE)
+    for name, obj in attrs.items():
+        obj.__module__ = MODULE
+        setattr(module, name, obj)
+    sys.modules[MODULE] = module
+    return module
+
+
+def make_class(name):
+    return type(name, (), {"__module__": MODULE})
+
+
+class TestGlobalRefs(BaseTestClass):
+    def tearDown(self):
+        sys.modules.pop(MODULE, None)
+
+    # TC_060
+    def test_shared_by_picklers(self):
+        val = [Person, Person("John Doe", 30), pickle.dumps, len,
+               std_pickle.Pickler, Person.greet]
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            for fix_imports in (True, False):
+                with self.subTest(protocol=protocol, fix_imports=fix_imports):
+                    for _ in range(2):
+                        self.assertEqual(
+                            pickle.dumps(val, protocol,
+                                         fix_imports=fix_imports),
+                            std_pickle._dumps(val, protocol,
+                                              fix_imports=fix_imports))
+        ref = pickle._global_refs[(id(Person), "Person")]
+        pickle.dumps(Person)
+        self.assertIs(pickle._global_refs[(id(Person), "Person")], ref)
+        self.assertIn((id(len), "len"), pickle._global_refs)
+
+    # TC_061
+    def test_copyreg_changes(self):
+        Class = make_class("Class")
+        make_module(Class=Class)
+        code = 0xf0f0
+        for protocol in (2, 4):
+            pickle.dumps(Class, protocol)
+            copyreg.add_extension(MODULE, "Class", code)
+            try:
+                self.assertIn(std_pickle.EXT2, pickle.dumps(Class, protocol))
+                self.assertEqual(pickle.dumps(Class, protocol),
+                                 std_pickle._dumps(Class, protocol))
+            finally:
+                copyreg.remove_extension(MODULE, "Class", code)
+            self.assertNotIn(std_pickle.EXT2, pickle.dumps(Class, protocol))
+        # Reducers replaced with copyreg.pickle() apply to new picklers
+        # even when the strategies are shared
+        try:
+            copyreg.pickle(Point, reduce_point)
+            point = std_pickle.loads(pickle.dumps(Point(1, 2)))
+            self.assertEqual(point.x, 1)
+            copyreg.pickle(Point, reduce_point_swapped)
+            point = std_pickle.loads(pickle.dumps(Point(1, 2)))
+            self.assertEqual(point.x, 2)
+        finally:
+            del copyreg.dispatch_table[Point]
+
+    # TC_062
+    def test_reloaded_and_replaced_modules(self):
+        old = make_class("Class")
+        module = make_module(Class=old)
+        data = pickle.dumps(old)
+        # Like importlib.reload(): the module stays, its globals change
+        new = make_class("Class")
+        module.Class = new
+        with self.assertRaisesRegex(pickle.PicklingError,
+                                    "not the same object"):
+            pickle.dumps(old)
+        self.assertEqual(pickle.dumps(new), data)
+        # A module replaced in sys.modules
+        make_module(Class=old)
+        self.assertEqual(pickle.dumps(old), data)
+        # A changed __module__
+        old.__module__ = __name__
+        globals()["Class"] = old
+        try:
+            self.assertEqual(pickle.dumps(old),
+                             std_pickle._dumps(old, pickle.DEFAULT_PROTOCOL))
+        finally:
+            del globals()["Class"]
+        # Refs don't keep their global alive
+        key = (id(old), "Class")
+        self.assertIn(key, pickle._global_refs)
+        del old, new, module
+        sys.modules.pop(MODULE)
+        gc.collect()
+        self.assertNotIn(key, pickle._global_refs)
+        # Nor do the save strategies shared by the picklers keep the classes
+        # of the objects alive
+        module = make_module()
+        refs = []
+        for i in range(200):
+            cls = make_class("Class%d" % i)
+            setattr(module, cls.__name__, cls)
+            for iterative in (False, True):
+                pickle.dumps(cls(), iterative=iterative)
+            refs.append(weakref.ref(cls))
+        del cls, module
+        sys.modules.pop(MODULE)
+        gc.collect()
+        self.assertEqual([ref for ref in refs if ref() is not None], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import io
+import pickle as std_pickle
+import unittest
+
+from black_test.Base_test_class import BaseTestClass
+from black_test.test_customer_class import Person
+from fuzzing.generate_data import GenerateData
+from lib_pickle import pickle
+
+
+def nest(depth, wrap, inner):
+    for _ in range(depth):
+        inner = wrap(inner)
+    return inner
+
+
+class Node:
+    def __init__(self, child):
+        self.child = child
+
+
+class SelfReducing:
+    def rebuild(self):
+        return SelfReducing()
+
+    def __reduce__(self):
+        # The bound method reduces to getattr(self, 'rebuild')
+        return self.rebuild, ()
+
+
+class TestIterative(BaseTestClass):
+    # TC_024
+    def test_same_bytes_as_recursive(self):
+        generator = GenerateData(seed=728730)
+        person = Person('Alice', 19)
+        rec = []
+        rec.append(rec)
+        test_cases = {
+            "random": [generator.generate_random_value() for _ in range(20)],
+            "deep_array": generator.generate_deep_array(),
+            "deep_dict": generator.generate_deep_dict(),
+            "shared": [person, (person, {1, 2}), frozenset([(1,), (1,)])],
+            "recursive": rec,
+            "wide": [[i, str(i)] for i in range(3000)],
+        }
+        for name, val in test_cases.items():
+            for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+                with self.subTest(name=name, protocol=protocol):
+                    self.assertEqual(
+                        pickle.dumps(val, protocol, iterative=True),
+                        pickle.dumps(val, protocol))
+
+    # TC_025
+    def test_deep_nesting(self):
+        depth = 10000
+        test_cases = {
+            "iter_deep_list": nest(depth, lambda x: [x], []),
+            "iter_deep_dict": nest(depth, lambda x: {"1": x}, {}),
+            "iter_deep_tuple": nest(depth, lambda x: (x, 1, 2, 3), ()),
+            "iter_deep_set": nest(depth, lambda x: frozenset([x]), 0),
+            "iter_deep_object": nest(depth, Node, None),
+        }
+        for name, val in test_cases.items():
+            for protocol in (0, 2, pickle.HIGHEST_PROTOCOL):
+                with self.subTest(name=name, protocol=protocol):
+                    f = io.BytesIO()
+                    pickle.dump(val, f, protocol, iterative=True)
+                    self.assertTrue(f.getvalue().endswith(pickle.STOP))
+
+    # TC_026
+    def test_deeper_than_recursion_can_go(self):
+        depth = 200000
+        val = nest(depth, lambda x: [x], [])
+        res = std_pickle.loads(pickle.dumps(val, iterative=True))
+        levels = 0
+        while res:
+            self.assertEqual(len(res), 1)
+            res = res[0]
+            levels += 1
+        self.assertEqual(levels, depth)
+
+    # TC_096
+    def test_self_referring_reduction(self):
+        # Pickled recursively, it runs into the recursion limit
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            with self.subTest(protocol=protocol):
+                with self.assertRaises(RecursionError):
+                    pickle.dumps(SelfReducing(), protocol, iterative=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
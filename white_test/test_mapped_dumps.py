@@ -0,0 +1,83 @@
+import mmap
+import os
+import pickle as std_pickle
+import tempfile
+import unittest
+from multiprocessing.shared_memory import SharedMemory
+
+from black_test.Base_test_class import BaseTestClass
+from lib_pickle import pickle
+
+VALUE = [list(range(50000)), b"x" * 200000, "\xe9" * 70000,
+         {str(i): i / 3 for i in range(1000)}]
+
+
+class TestMappedDumps(BaseTestClass):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def map_file(self, size):
+        with open(self.path, "r+b") as f:
+            f.truncate(size)
+            return mmap.mmap(f.fileno(), size)
+
+    # TC_081
+    def test_file_map_grows_and_shrinks(self):
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            for size in (1, 10 ** 7):
+                with self.subTest(protocol=protocol, size=size):
+                    expected = std_pickle._dumps(VALUE, protocol)
+                    m = self.map_file(size)
+                    try:
+                        n = pickle.dumps_into(VALUE, m, protocol)
+                        self.assertEqual(n, len(expected))
+                        self.assertEqual(len(m), n)
+                        self.assertEqual(m[:], expected)
+                    finally:
+                        m.close()
+                    self.assertEqual(os.path.getsize(self.path), n)
+
+    # TC_082
+    def test_anonymous_map(self):
+        # An anonymous map doesn't grow
+        expected = std_pickle._dumps(VALUE, 4)
+        m = mmap.mmap(-1, 16)
+        with self.assertRaisesRegex(ValueError, "buffer too small"):
+            pickle.dumps_into(VALUE, m, 4)
+        self.assertEqual(len(m), 16)
+        m = mmap.mmap(-1, len(expected) + 100)
+        self.assertEqual(pickle.dumps_into(VALUE, m, 4), len(expected))
+        self.assertEqual(m[:len(expected)], expected)
+        self.assertEqual(len(m), len(expected) + 100)
+
+    # TC_083
+    def test_shared_memory(self):
+        expected = std_pickle._dumps(VALUE, 5)
+        for size in (None, 100, len(expected)):
+            with self.subTest(size=size):
+                shm, n = pickle.dump_shared_memory(VALUE, 5, size=size)
+                try:
+                    self.assertEqual(n, len(expected))
+                    self.assertEqual(bytes(shm.buf[:n]), expected)
+                    if size == 100:
+                        self.assertEqual(shm.size, n)
+                    other = SharedMemory(shm.name)
+                    self.assertEqual(std_pickle.loads(other.buf), VALUE)
+                    other.close()
+                finally:
+                    shm.close()
+                    shm.unlink()
+        # A block is not left behind when pickling fails
+        name = "lib_pickle_test_%d" % os.getpid()
+        with self.assertRaises(pickle.PicklingError):
+            pickle.dump_shared_memory([1, lambda: None], name=name)
+        with self.assertRaises(FileNotFoundError):
+            SharedMemory(name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import gc
+import io
+import pickle as std_pickle
+import tracemalloc
+import unittest
+
+from black_test.Base_test_class import BaseTestClass
+from lib_pickle import pickle
+
+
+class MemoReadingPickler(pickle._Pickler):
+    # Reads and writes the memo through the dict interface
+    def save(self, obj, save_persistent_id=True):
+        x = self.memo.get(id(obj))
+        if x is not None:
+            assert self.memo[id(obj)] == x and x[1] is obj
+            assert id(obj) in self.memo
+        super().save(obj, save_persistent_id)
+
+    def memoize(self, obj):
+        if self.fast:
+            return
+        idx = len(self.memo)
+        self.write(self.put(idx))
+        self.memo[id(obj)] = idx, obj
+
+
+def memo_size(pickler_class, obj):
+    gc.collect()
+    tracemalloc.start()
+    pickler = pickler_class(io.BytesIO(), 4)
+    pickler.dump(obj)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size
+
+
+class TestMemo(BaseTestClass):
+    # TC_051
+    def test_dict_interface(self):
+        shared = [1, 2]
+        rec = []
+        rec.append(rec)
+        val = [shared, shared, "abc", "abc", (shared, rec), rec]
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            with self.subTest(protocol=protocol):
+                f = io.BytesIO()
+                pickler = MemoReadingPickler(f, protocol)
+                pickler.dump(val)
+                self.assertEqual(f.getvalue(), std_pickle._dumps(val, protocol))
+                memo = pickler.memo
+                self.assertEqual(memo[id(shared)][1], shared)
+                self.assertIs(dict(memo.items())[id(rec)][1], rec)
+                self.assertEqual(memo.copy(), dict(memo.items()))
+                pickler.clear_memo()
+                self.assertEqual(len(pickler.memo), 0)
+
+    # TC_052
+    def test_assigned_memo(self):
+        shared = [1, 2]
+        f = io.BytesIO()
+        std_pickler = std_pickle._Pickler(f, 2)
+        std_pickler.dump(shared)
+        g = io.BytesIO()
+        pickler = pickle._Pickler(g, 2)
+        pickler.memo = dict(std_pickler.memo)
+        pickler.dump([shared, shared])
+        start = f.tell()
+        std_pickler.dump([shared, shared])
+        self.assertEqual(g.getvalue(), f.getvalue()[start:])
+        self.assertEqual(pickler.memo[id(shared)], (0, shared))
+        del pickler.memo[id(shared)]
+        self.assertNotIn(id(shared), pickler.memo)
+
+    # TC_053
+    def test_smaller_than_tuple_memo(self):
+        val = [[i] for i in range(50000)]
+        self.assertLess(memo_size(pickle._Pickler, val),
+                        memo_size(std_pickle._Pickler, val))
+
+
+if __name__ == '__main__':
+    unittest.main()
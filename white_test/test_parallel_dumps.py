@@ -0,0 +1,57 @@
+import pickle as std_pickle
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from black_test.Base_test_class import BaseTestClass
+from lib_pickle import pickle
+
+
+def records(n):
+    return [{"id": i, "name": "n%d" % i, "tags": ("a", "b"), "score": i / 7,
+             "blob": b"x" * (i % 300)} for i in range(n)]
+
+
+class TestParallelDumps(BaseTestClass):
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = ProcessPoolExecutor(2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    # TC_048
+    def test_containers(self):
+        rows = records(5000)
+        values = [rows, tuple(rows), dict(enumerate(rows)),
+                  list(range(20000)), [str(i) for i in range(5000)]]
+        for val in values:
+            for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+                with self.subTest(type=type(val), protocol=protocol):
+                    data = pickle.parallel_dumps(val, protocol,
+                                                 executor=self.executor,
+                                                 chunk_size=1000)
+                    self.assertEqual(std_pickle.loads(data), val)
+                    self.assertEqual(std_pickle._loads(data), val)
+
+    # TC_049
+    def test_sharing_is_per_chunk(self):
+        shared = [1, 2]
+        val = [shared] * 3000
+        res = std_pickle.loads(pickle.parallel_dumps(
+            val, 4, executor=self.executor, chunk_size=1000))
+        self.assertEqual(res, val)
+        self.assertIs(res[0], res[999])
+        self.assertIsNot(res[999], res[1000])
+
+    # TC_050
+    def test_small_or_other_objects(self):
+        for val in ([1, 2, 3], {"a": 1}, "text", None):
+            with self.subTest(val=val):
+                self.assertEqual(
+                    pickle.parallel_dumps(val, 4, executor=self.executor),
+                    pickle.dumps(val, 4))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import gc
+import io
+import os
+import pickle as std_pickle
+import tracemalloc
+import unittest
+
+from black_test.Base_test_class import BaseTestClass
+from lib_pickle import pickle
+
+PickleBuffer = getattr(pickle, "PickleBuffer", None)
+
+GiB = 1 << 30
+
+
+def peak_memory(func):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+class ChunkKeepingFile:
+    # Keeps what it is given instead of copying it
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(data)
+
+    def getvalue(self):
+        return b"".join(self.chunks)
+
+
+def buffers(sizes):
+    for n in sizes:
+        data = bytearray(os.urandom(n))
+        yield PickleBuffer(data)
+        yield PickleBuffer(bytes(data))
+
+
+@unittest.skipIf(PickleBuffer is None, "PickleBuffer needs Python >= 3.8")
+class TestPickleBuffer(BaseTestClass):
+    sizes = [1, 0xff, 0x100, 0xffff, 0x10000, 200000]
+
+    # TC_072
+    def test_same_output(self):
+        for buf in buffers(self.sizes):
+            val = [buf, buf, {"buf": buf}]
+            with self.subTest(size=len(buf.raw())):
+                expected = std_pickle._dumps(val, 5)
+                self.assertEqual(pickle.dumps(val, 5), expected)
+                self.assertEqual(pickle.dumps(val, 5, iterative=True),
+                                 expected)
+                self.assertEqual(pickle.dumps_view(val, 5), expected)
+                f = io.BytesIO()
+                pickle._Pickler(f, 5).dump(val)
+                self.assertEqual(f.getvalue(), expected)
+                self.assertEqual(std_pickle.loads(expected)[0], buf.raw())
+        # The reference pickler can't save an empty buffer twice, as it
+        # memoizes the empty bytes singleton each time
+        for buf in buffers([0]):
+            self.assertEqual(pickle.dumps(buf, 5), std_pickle._dumps(buf, 5))
+
+    # TC_073
+    def test_file_keeping_chunks(self):
+        # Large payloads reach a file that may keep them as a copy, so
+        # later changes to the buffer don't show
+        data = bytearray(200000)
+        val = [PickleBuffer(data), PickleBuffer(bytes(data))]
+        expected = std_pickle._dumps(val, 5)
+        f = ChunkKeepingFile()
+        pickle._Pickler(f, 5).dump(val)
+        data[:] = b"x" * len(data)
+        self.assertEqual(f.getvalue(), expected)
+
+    # TC_074
+    def test_peak_memory(self):
+        data = bytearray(GiB)
+        try:
+            for buf in (PickleBuffer(data),
+                        PickleBuffer(memoryview(data).toreadonly())):
+                with self.subTest(readonly=buf.raw().readonly), \
+                        open(os.devnull, "wb") as f:
+                    peak = peak_memory(
+                        lambda: pickle._Pickler(f, 5).dump([buf]))
+                    self.assertLess(peak, GiB // 64)
+        finally:
+            del data
+
+
+if __name__ == '__main__':
+    unittest.main()
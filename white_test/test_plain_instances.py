@@ -0,0 +1,200 @@
+import dataclasses
+import io
+import _random
+import pickle as std_pickle
+import queue
+import threading
+import unittest
+
+from black_test.Base_test_class import BaseTestClass
+from black_test.test_customer_class import BankAccount, Cat, MathUtils
+from black_test.test_customer_class import Person
+from lib_pickle import pickle
+
+
+@dataclasses.dataclass
+class Point:
+    x: int
+    y: int
+
+
+class WithSlots:
+    __slots__ = ("a",)
+
+
+class WithGetstate(Person):
+    def __getstate__(self):
+        return {"name": self.name}
+
+
+class WithReduce(Person):
+    def __reduce__(self):
+        return Person, (self.name, self.age)
+
+
+class WithGetnewargs(Person):
+    def __getnewargs__(self):
+        return ()
+
+
+class ListSubclass(list):
+    pass
+
+
+class Changing(Person):
+    pass
+
+
+def reduce_to_person():
+    return Person, ("Jim", 50)
+
+
+class RandomSubclass(_random.Random):
+    pass
+
+
+class QueueSubclass(queue.SimpleQueue):
+    pass
+
+
+class RecordingPickler(pickle._Pickler):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.seen = []
+
+    def persistent_id(self, obj):
+        self.seen.append(type(obj))
+        return None
+
+
+class StdRecordingPickler(std_pickle._Pickler):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.seen = []
+
+    def persistent_id(self, obj):
+        self.seen.append(type(obj))
+        return None
+
+
+def make_values():
+    shared = Person("Shared", 1)
+    cyclic = Person("Cyclic", 2)
+    cyclic.friend = cyclic
+    return [Person("John Doe", 30), shared, shared, cyclic, Cat("Tom"),
+            BankAccount("Alice", 10.5), MathUtils(), Point(1, 2),
+            [Person(str(i), i) for i in range(100)]]
+
+
+class TestPlainInstances(BaseTestClass):
+    # TC_063
+    def test_same_output(self):
+        val = make_values()
+        self.assertTrue(pickle._has_default_reduce(Person))
+        self.assertTrue(pickle._has_default_reduce(Point))
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            for iterative in (False, True):
+                with self.subTest(protocol=protocol, iterative=iterative):
+                    data = pickle.dumps(val, protocol, iterative=iterative)
+                    self.assertEqual(data, std_pickle._dumps(val, protocol))
+                    res = std_pickle.loads(data)
+                    self.assertIs(res[1], res[2])
+                    self.assertIs(res[3].friend, res[3])
+
+    # TC_064
+    def test_other_classes(self):
+        for cls in (WithSlots, WithGetstate, WithReduce, WithGetnewargs,
+                    ListSubclass, int, object):
+            self.assertFalse(pickle._has_default_reduce(cls), cls)
+        slots = WithSlots()
+        slots.a = 1
+        val = [slots, WithGetstate("a", 1), WithReduce("b", 2),
+               WithGetnewargs("c", 3), ListSubclass([1, 2])]
+        # Protocols 0 and 1 can't pickle classes with __slots__
+        for protocol in range(2, pickle.HIGHEST_PROTOCOL + 1):
+            with self.subTest(protocol=protocol):
+                self.assertEqual(pickle.dumps(val, protocol),
+                                 std_pickle._dumps(val, protocol))
+        # Hooks still see every object
+        for protocol in (2, 4):
+            f = io.BytesIO()
+            pickler = RecordingPickler(f, protocol)
+            pickler.dump(make_values())
+            std_f = io.BytesIO()
+            std_pickler = StdRecordingPickler(std_f, protocol)
+            std_pickler.dump(make_values())
+            self.assertEqual(f.getvalue(), std_f.getvalue())
+            self.assertEqual(pickler.seen, std_pickler.seen)
+
+    # TC_065
+    def test_class_changed_later(self):
+        obj = Changing("John Doe", 30)
+        pickle.dumps(obj)
+        Changing.__getstate__ = lambda self: {"name": self.name}
+        try:
+            for iterative in (False, True):
+                res = std_pickle.loads(pickle.dumps(obj, iterative=iterative))
+                self.assertEqual(vars(res), {"name": "John Doe"})
+        finally:
+            del Changing.__getstate__
+        Changing.__reduce__ = lambda self: (Person, (self.name, 0))
+        try:
+            res = std_pickle.loads(pickle.dumps(obj))
+            self.assertIs(type(res), Person)
+        finally:
+            del Changing.__reduce__
+        Changing.__getnewargs__ = lambda self: ()
+        try:
+            self.assertEqual(pickle.dumps(obj, 2), std_pickle._dumps(obj, 2))
+        finally:
+            del Changing.__getnewargs__
+        self.assertEqual(pickle.dumps(obj), std_pickle._dumps(obj, 4))
+
+    # TC_097
+    def test_hooks_set_on_the_instance(self):
+        getstate = Changing("John Doe", 30)
+        getstate.__getstate__ = lambda: {"name": "Jane Doe"}
+        reduce_ex = Changing("John Doe", 30)
+        reduce_ex.__reduce_ex__ = lambda protocol: (Person, ("Joe", 40))
+        reduce = Changing("John Doe", 30)
+        # Unlike __reduce_ex__(), __reduce__() is looked up on the class,
+        # but the instance still keeps it in its state
+        reduce.__reduce__ = reduce_to_person
+        for protocol in range(2, pickle.HIGHEST_PROTOCOL + 1):
+            for iterative in (False, True):
+                with self.subTest(protocol=protocol, iterative=iterative):
+                    res = std_pickle.loads(pickle.dumps(
+                        getstate, protocol, iterative=iterative))
+                    self.assertEqual(vars(res), {"name": "Jane Doe"})
+                    res = std_pickle.loads(pickle.dumps(
+                        reduce_ex, protocol, iterative=iterative))
+                    self.assertIs(type(res), Person)
+                    self.assertEqual(res.name, "Joe")
+                    self.assertEqual(
+                        pickle.dumps(reduce, protocol, iterative=iterative),
+                        std_pickle._dumps(reduce, protocol))
+
+    # TC_093
+    def test_c_heap_types(self):
+        # Types defined in C can be heap types too, and have state of their
+        # own that object.__reduce_ex__() refuses to pickle
+        lock = threading.Lock()
+        for cls in (type(lock), RandomSubclass, QueueSubclass):
+            self.assertFalse(pickle._has_default_reduce(cls), cls)
+        for obj in (lock, RandomSubclass(), QueueSubclass()):
+            for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+                with self.assertRaises((TypeError,
+                                        std_pickle.PicklingError)) as cm:
+                    std_pickle._dumps(obj, protocol)
+                for iterative in (False, True):
+                    with self.subTest(obj=obj, protocol=protocol,
+                                      iterative=iterative):
+                        with self.assertRaises((TypeError,
+                                                pickle.PicklingError)) as res:
+                            pickle.dumps(obj, protocol, iterative=iterative)
+                        self.assertEqual(type(res.exception).__name__,
+                                         type(cm.exception).__name__)
+
+
+if __name__ == '__main__':
+    unittest.main()
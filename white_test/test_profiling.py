@@ -0,0 +1,130 @@
+import collections
+import io
+import pickle as std_pickle
+import pickletools
+import unittest
+
+from black_test.Base_test_class import BaseTestClass
+from black_test.test_customer_class import Person
+from lib_pickle import pickle
+
+
+def make_value():
+    shared = "shared" * 3
+    return [shared, shared, [Person(str(i), i) for i in range(300)],
+            list(range(3000)), {"blob": b"x" * 200000}, pickle.dumps, 1.5]
+
+
+class TestProfiling(BaseTestClass):
+    # TC_090
+    def test_same_output(self):
+        val = make_value()
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            for kwargs in ({}, {"fast": True}, {"value_memo": True}):
+                for in_place in (False, True):
+                    with self.subTest(protocol=protocol, in_place=in_place,
+                                      **kwargs):
+                        target = bytearray() if in_place else io.BytesIO()
+                        profiler = pickle.ProfilingPickler(target, protocol,
+                                                           **kwargs)
+                        profiler.dump(val)
+                        data = bytes(target) if in_place \
+                            else target.getvalue()
+                        expected = io.BytesIO()
+                        pickle.Pickler(expected, protocol, **kwargs).dump(val)
+                        self.assertEqual(data, expected.getvalue())
+                        stats = profiler.stats()
+                        self.assertEqual(stats["bytes"], len(data))
+                        self.assertEqual(stats["opcodes"], collections.Counter(
+                            op.name for op, _, _ in pickletools.genops(data)))
+                        # Each byte is counted once as a byte of its own,
+                        # except the PROTO and STOP opcodes and the header
+                        # of the first frame
+                        own = sum(entry["own_bytes"]
+                                  for entry in stats["types"].values())
+                        self.assertLessEqual(len(data) - own, 12)
+                        self.assertEqual(stats["frames"]["count"],
+                                         stats["opcodes"].get("FRAME", 0))
+
+    # TC_091
+    def test_stats(self):
+        val = make_value()
+        profiler = pickle.ProfilingPickler(io.BytesIO(), 4)
+        profiler.dump(val)
+        stats = profiler.stats()
+        types = stats["types"]
+        functions = stats["functions"]
+        self.assertEqual(types["list"]["calls"], 3)
+        self.assertEqual(types["black_test.test_customer_class.Person"]
+                         ["calls"], 300)
+        self.assertEqual(types["int"]["calls"], 3000 + 300)
+        # Nested lists count twice in the total of lists, which is more
+        # than the pickle
+        self.assertGreater(types["list"]["bytes"], stats["bytes"])
+        self.assertGreaterEqual(types["list"]["time"],
+                                types["list"]["own_time"])
+        self.assertEqual(functions["save_reduce"]["calls"], 300)
+        self.assertEqual(functions["save_global"]["calls"], 1)
+        self.assertEqual(functions["save_long"]["calls"], 3300)
+        # The BINBYTES opcode, its MEMOIZE and the header of the frame
+        # that follows it
+        self.assertEqual(functions["save_bytes"]["own_bytes"],
+                         5 + 200000 + 1 + 9)
+        # The second reference to the str, the class of all instances but
+        # the first, and the keys of their state dicts
+        self.assertEqual(stats["memo"]["hits"], functions["get"]["calls"])
+        self.assertEqual(stats["memo"]["hits"], 1 + 299 + 2 * 299)
+        # The bytes object is written between two frames
+        self.assertEqual(stats["frames"]["count"], 2)
+        self.assertEqual(stats["frames"]["bytes"],
+                         stats["bytes"] - 200000 - 5 - 2 - 2 * 9)
+
+        # The memo is kept: the list is found there the second time
+        profiler.dump(val)
+        self.assertEqual(profiler.stats()["dumps"], 2)
+        self.assertEqual(profiler.stats()["types"]["list"]["calls"], 4)
+        self.assertEqual(profiler.stats()["functions"]["get"]["calls"],
+                         functions["get"]["calls"] + 1)
+        profiler.clear_stats()
+        profiler.clear_memo()
+        profiler.dump(val)
+        # Everything but the times starts over
+        self.assertEqual(
+            {key: (e["calls"], e["bytes"], e["own_bytes"])
+             for key, e in profiler.stats()["types"].items()},
+            {key: (e["calls"], e["bytes"], e["own_bytes"])
+             for key, e in types.items()})
+
+        profiler = pickle.ProfilingPickler(io.BytesIO(), 4, value_memo=True)
+        profiler.dump(val)
+        self.assertIn("value_memo", profiler.stats())
+
+    # TC_092
+    def test_report_and_errors(self):
+        profiler = pickle.ProfilingPickler(io.BytesIO(), 4)
+        profiler.dump(make_value())
+        report = profiler.report(limit=3)
+        self.assertIn("1 pickles", report)
+        self.assertIn("by type", report)
+        self.assertIn("by function", report)
+        self.assertIn("BINBYTES 1", report)
+        self.assertIn("memo: ", report)
+        self.assertIn("frames: 2,", report)
+        self.assertEqual(len(report.splitlines()), 1 + 2 * (2 + 3) + 4)
+
+        f = io.BytesIO()
+        profiler = pickle.ProfilingPickler(f, 4)
+        with self.assertRaises(pickle.PicklingError):
+            profiler.dump([1, lambda: 0])
+        self.assertEqual(profiler.stats()["dumps"], 0)
+        profiler.clear_stats()
+        profiler.dump([1, 2])
+        self.assertEqual(profiler.stats()["types"]["list"]["calls"], 1)
+        # After the PROTO opcode written by the failed dump()
+        self.assertEqual(f.getvalue()[2:], std_pickle._dumps([1, 2], 4))
+        with self.assertRaises(TypeError):
+            pickle.ProfilingPickler(io.BytesIO(), 4, iterative=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
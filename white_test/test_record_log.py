@@ -0,0 +1,148 @@
+import collections
+import io
+import os
+import pickle as std_pickle
+import unittest
+
+from black_test.Base_test_class import BaseTestClass
+from lib_pickle import pickle
+
+Record = collections.namedtuple("Record", "id name value")
+
+
+class Item:
+    pass
+
+
+class Tag:
+    pass
+
+
+def records():
+    return ([Record(i, "n%d" % i, [i / 3, str(i)]) for i in range(2000)] +
+            [{1: Record}, len, pickle.ValueMemo, "last"])
+
+
+def write_log(protocol, shared_globals):
+    f = io.BytesIO()
+    index = io.BytesIO()
+    writer = pickle.RecordLogWriter(f, protocol, index=index,
+                                    shared_globals=shared_globals)
+    for i, record in enumerate(records()):
+        assert writer.append(record) == i
+        if i == 1000:
+            # A failed record leaves no trace in the log
+            try:
+                writer.append([Record(0, "", []), lambda: None])
+            except pickle.PicklingError:
+                pass
+    return f, index
+
+
+class TestRecordLog(BaseTestClass):
+    # TC_045
+    def test_sequential_read(self):
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            for shared_globals in (0, 1, 16):
+                with self.subTest(protocol=protocol,
+                                  shared_globals=shared_globals):
+                    f, _ = write_log(protocol, shared_globals)
+                    f.seek(0)
+                    reader = pickle.RecordLogReader(
+                        f, shared_globals=shared_globals)
+                    self.assertEqual(list(reader), records())
+
+    # TC_046
+    def test_random_access(self):
+        expected = records()
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            with self.subTest(protocol=protocol):
+                f, index = write_log(protocol, 16)
+                reader = pickle.RecordLogReader(f, index, shared_globals=16)
+                self.assertEqual(len(reader), len(expected))
+                for n in (1500, 0, -1, 7, 2001):
+                    self.assertEqual(reader[n], expected[n])
+                with self.assertRaises(IndexError):
+                    reader[len(expected)]
+
+    # TC_047
+    def test_records_without_sharing(self):
+        # Each record is a plain pickle, and the shared globals only make
+        # the records smaller.
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            with self.subTest(protocol=protocol):
+                f, _ = write_log(protocol, 0)
+                f.seek(0)
+                values = [std_pickle.Unpickler(f).load()
+                          for _ in records()]
+                self.assertEqual(values, records())
+                self.assertEqual(f.read(), b"")
+                self.assertEqual(
+                    f.getvalue(),
+                    b"".join(pickle.dumps(r, protocol) for r in records()))
+                shared, _ = write_log(protocol, 16)
+                self.assertLess(len(shared.getvalue()), len(f.getvalue()))
+
+    # TC_094
+    def test_shared_global_reused_in_first_record(self):
+        def shape(record):
+            # The classes and the types of the instances of a record
+            return [obj if isinstance(obj, type) else (type(obj),)
+                    for obj in record]
+
+        expected = [[Item(), Item(), Tag], [Tag, Item(), Tag], [Item]]
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            for iterative in (False, True):
+                with self.subTest(protocol=protocol, iterative=iterative):
+                    f = io.BytesIO()
+                    index = io.BytesIO()
+                    writer = pickle.RecordLogWriter(
+                        f, protocol, index=index, shared_globals=8,
+                        iterative=iterative)
+                    for record in expected:
+                        writer.append(record)
+                    f.seek(0)
+                    reader = pickle.RecordLogReader(f, shared_globals=8)
+                    self.assertEqual([shape(r) for r in reader],
+                                     [shape(r) for r in expected])
+                    reader = pickle.RecordLogReader(f, index,
+                                                    shared_globals=8)
+                    self.assertEqual(shape(reader[1]), shape(expected[1]))
+
+    # TC_095
+    def test_failed_record_without_index(self):
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            with self.subTest(protocol=protocol):
+                f = io.BytesIO()
+                writer = pickle.RecordLogWriter(f, protocol, shared_globals=4)
+                writer.append([Item(), "first"])
+                with self.assertRaises(pickle.PicklingError):
+                    writer.append([Tag, "x" * 100000, lambda: None])
+                writer.append([Tag, "last"])
+                expected = io.BytesIO()
+                writer = pickle.RecordLogWriter(expected, protocol,
+                                                shared_globals=4)
+                writer.append([Item(), "first"])
+                writer.append([Tag, "last"])
+                self.assertEqual(f.getvalue(), expected.getvalue())
+                f.seek(0)
+                values = list(pickle.RecordLogReader(f, shared_globals=4))
+                self.assertEqual(values[1], [Tag, "last"])
+
+    # TC_101
+    def test_unseekable_file(self):
+        r, w = os.pipe()
+        with open(r, 'rb') as reader, open(w, 'wb') as writer:
+            with self.assertRaises(ValueError):
+                pickle.RecordLogWriter(writer, index=io.BytesIO())
+            # Without an index, a pipe is enough
+            log = pickle.RecordLogWriter(writer, shared_globals=4)
+            log.append([Item, "first"])
+            log.append([Item, "second"])
+            writer.close()
+            values = list(pickle.RecordLogReader(reader, shared_globals=4))
+        self.assertEqual(values, [[Item, "first"], [Item, "second"]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+import copyreg
+import io
+import pickle as std_pickle
+import unittest
+
+from black_test.Base_test_class import BaseTestClass
+from black_test.test_customer_class import Dog, Person
+from lib_pickle import pickle
+
+
+class Point:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+def reduce_point(point):
+    return Point, (point.x, point.y)
+
+
+class Pair:
+    def __init__(self, a, b):
+        self.a = a
+        self.b = b
+
+
+def reduce_pair(pair):
+    return Pair, (pair.a, pair.b)
+
+
+def reduce_point_once(point):
+    # Unregisters itself, so that the next Point is pickled without it
+    del copyreg.dispatch_table[Point]
+    return reduce_point(point)
+
+
+def std_dumps(obj, protocol, fast=False, dispatch_table=None):
+    f = io.BytesIO()
+    p = std_pickle._Pickler(f, protocol)
+    p.fast = fast
+    if dispatch_table is not None:
+        p.dispatch_table = dispatch_table
+    p.dump(obj)
+    return f.getvalue()
+
+
+class TestSaveDispatch(BaseTestClass):
+    # TC_020
+    def test_same_bytes_as_reference(self):
+        person = Person('Alice', 19)
+        value = [1, -1, 2 ** 70, 1.5, "s", b"b", None, True, (1, 2),
+                 {"k": [person, person]}, {1, 2}, frozenset("ab"), Dog("ww"),
+                 Person, len, type(None)]
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            with self.subTest(protocol=protocol):
+                self.assertEqual(pickle.dumps(value, protocol),
+                                 std_dumps(value, protocol))
+                self.dump_and_check(value, f"save_dispatch{protocol}",
+                                    protocol)
+
+    # TC_021
+    def test_dispatch_table_assigned_after_init(self):
+        f = io.BytesIO()
+        p = pickle.Pickler(f, 2)
+        p.dump(Point(1, 2))
+        first = f.getvalue()
+        p.dispatch_table = copyreg.dispatch_table.copy()
+        p.dispatch_table[Point] = reduce_point
+        p.dump(Point(1, 2))
+        second = f.getvalue()[len(first):]
+        self.assertIn(pickle.NEWOBJ, first)
+        self.assertNotIn(pickle.NEWOBJ, second)
+        self.assertIn(pickle.REDUCE, second)
+
+    # TC_022
+    def test_copyreg_registration_between_dumps(self):
+        f = io.BytesIO()
+        p = pickle.Pickler(f, 2)
+        p.dump(Point(1, 2))
+        first = f.getvalue()
+        copyreg.pickle(Point, reduce_point)
+        try:
+            p.dump(Point(1, 2))
+        finally:
+            del copyreg.dispatch_table[Point]
+        second = f.getvalue()[len(first):]
+        self.assertIn(pickle.NEWOBJ, first)
+        self.assertNotIn(pickle.NEWOBJ, second)
+
+    # TC_023
+    def test_hooks_see_every_object(self):
+        seen = []
+
+        class Hooked(pickle.Pickler):
+            def reducer_override(self, obj):
+                seen.append(obj)
+                if obj == 2:
+                    return int, ("3",)
+                return NotImplemented
+
+        f = io.BytesIO()
+        p = Hooked(f, 4)
+        p.persistent_id = lambda obj: "pid" if obj == 1.5 else None
+        p.dump([1, 2, 1.5])
+        # persistent_id() runs first, so 1.5 never reaches the override
+        self.assertEqual(seen[:3], [[1, 2, 1.5], 1, 2])
+        self.assertNotIn(1.5, seen)
+        self.assertIn(pickle.REDUCE, f.getvalue())
+        self.assertIn(pickle.BINPERSID, f.getvalue())
+
+    # TC_099
+    def test_table_entry_swapped_between_dumps(self):
+        # Removing one entry and adding another leaves the tables the same
+        # size, but the strategies resolved from them are stale.
+        for iterative in (False, True):
+            with self.subTest(iterative=iterative):
+                f = io.BytesIO()
+                p = pickle.Pickler(f, 2, iterative=iterative)
+                p.dispatch_table = copyreg.dispatch_table.copy()
+                p.dispatch_table[Point] = reduce_point
+                p.dump(Point(1, 2))
+                del p.dispatch_table[Point]
+                p.dispatch_table[Pair] = reduce_pair
+                f.seek(0)
+                f.truncate()
+                p.clear_memo()
+                p.dump([Point(1, 2), Pair(3, 4)])
+                self.assertEqual(f.getvalue(),
+                                 std_dumps([Point(1, 2), Pair(3, 4)], 2,
+                                           dispatch_table=p.dispatch_table))
+
+                copyreg.pickle(Point, reduce_point)
+                try:
+                    pickle.dumps(Point(1, 2), 2, iterative=iterative)
+                    del copyreg.dispatch_table[Point]
+                    copyreg.pickle(Pair, reduce_pair)
+                    self.assertEqual(
+                        pickle.dumps([Point(1, 2), Pair(3, 4)], 2,
+                                     iterative=iterative),
+                        std_dumps([Point(1, 2), Pair(3, 4)], 2))
+                finally:
+                    copyreg.dispatch_table.pop(Point, None)
+                    copyreg.dispatch_table.pop(Pair, None)
+
+    # TC_100
+    def test_table_entry_removed_while_pickling(self):
+        value = [Point(1, 2), Point(3, 4)]
+        for iterative in (False, True):
+            for fast in (False, True):
+                with self.subTest(iterative=iterative, fast=fast):
+                    copyreg.pickle(Point, reduce_point_once)
+                    try:
+                        expected = std_dumps(value, 2, fast)
+                        copyreg.pickle(Point, reduce_point_once)
+                        f = io.BytesIO()
+                        p = pickle.Pickler(f, 2, iterative=iterative)
+                        p.fast = fast
+                        p.dump(value)
+                    finally:
+                        copyreg.dispatch_table.pop(Point, None)
+                    self.assertEqual(f.getvalue(), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import io
+import pickle as std_pickle
+import unittest
+
+from black_test.Base_test_class import BaseTestClass
+from black_test.test_customer_class import Person
+from lib_pickle import pickle
+
+
+def fresh(s):
+    # An equal str that is a distinct object
+    return "".join(list(s))
+
+
+class PersistentPickler(pickle._Pickler):
+    def persistent_id(self, obj):
+        if obj == 7:
+            return "seven"
+        return None
+
+
+class StdPersistentPickler(std_pickle._Pickler):
+    persistent_id = PersistentPickler.persistent_id
+
+
+def fast_dumps(obj, protocol):
+    f = io.BytesIO()
+    p = std_pickle._Pickler(f, protocol)
+    p.fast = True
+    p.dump(obj)
+    return f.getvalue()
+
+
+def dumps_with(cls, obj, protocol):
+    f = io.BytesIO()
+    cls(f, protocol).dump(obj)
+    return f.getvalue()
+
+
+class TestTextProtocols(BaseTestClass):
+    # TC_069
+    def test_same_output(self):
+        word = fresh("word")
+        escaped = fresh("a\\b\n\r\0\x1a")
+        scalars = [0, -1, 65535, 65536, -257, 2 ** 31 - 1, 2 ** 31,
+                   -2 ** 31 - 1, 10 ** 30, 0.0, -0.0, 1.5, 1e300, -1e-300,
+                   float("inf"), float("-inf"), None, True, False, "",
+                   "€", "\udc80", "ÿ", "x" * 64, "y" * 65 + "\\", word, word,
+                   escaped, escaped, fresh("word"), "z" * 100000]
+        val = [scalars, dict(zip(map(str, range(len(scalars))), scalars)),
+               {word: word, escaped: escaped},
+               [str(i) for i in range(5000)] * 2,
+               [1, [2, "two"], (3,), {"four": 4}, Person("John Doe", 30),
+                "five"] * 3,
+               list(range(2500)), {i: str(i) for i in range(2500)}]
+        for protocol in (0, 1):
+            for iterative in (False, True):
+                with self.subTest(protocol=protocol, iterative=iterative):
+                    self.assertEqual(
+                        pickle.dumps(val, protocol, iterative=iterative),
+                        std_pickle._dumps(val, protocol))
+                    self.assertEqual(
+                        pickle.dumps(val, protocol, iterative=iterative,
+                                     fast=True),
+                        fast_dumps(val, protocol))
+        nans = [float("nan")] * 3
+        self.assertEqual(pickle.dumps(nans, 0), std_pickle._dumps(nans, 0))
+
+    # TC_070
+    def test_memo_keys(self):
+        # Memo keys on either side of the cached PUT and GET opcodes
+        n = pickle._ConstantPool.MEMO_KEYS
+        strs = [str(i) for i in range(n + 10)]
+        val = [strs, strs[n - 5:], [[]] * 3]
+        data = pickle.dumps(val, 0)
+        self.assertEqual(data, std_pickle._dumps(val, 0))
+        self.assertIn(b"p%d\n" % (n + 1), data)
+        self.assertIn(b"g%d\n" % (n + 1), data)
+        self.assertEqual(std_pickle.loads(data), val)
+
+    # TC_071
+    def test_observed_saves(self):
+        # A persistent_id() sees every item, so lists and dicts aren't
+        # encoded in one go
+        val = [[1, 7, "x", 7.0], {7: 7, "a": 1}]
+        self.assertEqual(dumps_with(PersistentPickler, val, 0),
+                         dumps_with(StdPersistentPickler, val, 0))
+        # Nor are strs with a value memo, which pickles equal strs once
+        val = [[fresh("a"), fresh("b"), fresh("a")], {fresh("a"): "b"}]
+        data = pickle.dumps(val, 0, value_memo=True)
+        self.assertEqual(data.count(b"Va\n"), 1)
+        self.assertEqual(std_pickle.loads(data), val)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import pickle as std_pickle
+import unittest
+
+from black_test.Base_test_class import BaseTestClass
+from lib_pickle import pickle
+
+
+def fresh(s):
+    # An equal str that is a distinct object
+    return "".join(list(s))
+
+
+class TestValueMemo(BaseTestClass):
+    # TC_031
+    def test_equal_values_are_shared(self):
+        val = [fresh("hello world!"), fresh("hello world!"),
+               fresh("abcdefghij").encode(), fresh("abcdefghij").encode(),
+               (fresh("currency"), 1, 2.0), (fresh("currency"), 1, 2.0),
+               frozenset([fresh("xxxxxxxxxx"), 1]),
+               frozenset([fresh("xxxxxxxxxx"), 1])]
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            for iterative in (False, True):
+                with self.subTest(protocol=protocol, iterative=iterative):
+                    data = pickle.dumps(val, protocol, value_memo=True,
+                                        iterative=iterative)
+                    self.assertLess(len(data), len(pickle.dumps(val, protocol)))
+                    res = std_pickle.loads(data)
+                    self.assertEqual(res, val)
+                    for i in range(0, len(val), 2):
+                        self.assertIs(res[i], res[i + 1])
+
+    # TC_032
+    def test_values_that_pickle_differently(self):
+        val = [(fresh("currency"), 1), (fresh("currency"), True),
+               (fresh("currency"), 1.0), (0.0, fresh("aaaaaaaa")),
+               (-0.0, fresh("aaaaaaaa"))]
+        res = std_pickle.loads(pickle.dumps(val, value_memo=True))
+        self.assertEqual([type(t[1]) for t in res[:3]], [int, bool, float])
+        self.assertEqual(repr(res[4][0]), "-0.0")
+        self.assertIsNot(res[0], res[1])
+        self.assertIsNot(res[3], res[4])
+
+    # TC_033
+    def test_threshold_bound_and_stats(self):
+        value_memo = pickle.ValueMemo(min_size=4, max_entries=2)
+        val = [fresh("abc"), fresh("abc"), fresh("aaaa"), fresh("bbbb"),
+               fresh("cccc"), fresh("aaaa"), fresh("cccc")]
+        res = std_pickle.loads(pickle.dumps(val, 4, value_memo=value_memo))
+        self.assertEqual(res, val)
+        self.assertIsNot(res[0], res[1])  # below min_size
+        self.assertIsNot(res[2], res[5])  # evicted
+        self.assertIs(res[4], res[6])
+        self.assertEqual(value_memo.stats(),
+                         {"entries": 2, "hits": 1, "bytes_saved": 2,
+                          "evictions": 2})
+
+    # TC_034
+    def test_off_by_default(self):
+        val = [fresh("hello world!"), fresh("hello world!")]
+        self.assertEqual(pickle.dumps(val, 4, value_memo=False),
+                         pickle.dumps(val, 4))
+        self.dump_and_check(val, "value_memo_off")
+
+
+if __name__ == '__main__':
+    unittest.main()
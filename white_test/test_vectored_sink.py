@@ -0,0 +1,81 @@
+import os
+import pickle as std_pickle
+import socket
+import threading
+import unittest
+
+from black_test.Base_test_class import BaseTestClass
+from lib_pickle import pickle
+
+
+def drain(read, received):
+    while True:
+        data = read()
+        if not data:
+            break
+        received.append(data)
+
+
+class TestVectoredSink(BaseTestClass):
+    val = [b"x" * 200000, list(range(50000)), "y" * 70000,
+           bytearray(100000), None]
+
+    # TC_038
+    def test_dump_to_pipe(self):
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            with self.subTest(protocol=protocol):
+                r, w = os.pipe()
+                received = []
+                thread = threading.Thread(
+                    target=drain, args=(lambda: os.read(r, 1 << 16), received))
+                thread.start()
+                try:
+                    pickle.dump(self.val, w, protocol)
+                finally:
+                    os.close(w)
+                    thread.join()
+                    os.close(r)
+                self.assertEqual(b"".join(received),
+                                 std_pickle._dumps(self.val, protocol))
+
+    # TC_039
+    def test_dump_to_socket(self):
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            with self.subTest(protocol=protocol):
+                a, b = socket.socketpair()
+                received = []
+                thread = threading.Thread(
+                    target=drain, args=(lambda: b.recv(1 << 16), received))
+                thread.start()
+                try:
+                    pickle.dump(self.val, a, protocol)
+                finally:
+                    a.shutdown(socket.SHUT_WR)
+                    thread.join()
+                    a.close()
+                    b.close()
+                self.assertEqual(b"".join(received),
+                                 std_pickle._dumps(self.val, protocol))
+
+    # TC_040
+    def test_partial_writes(self):
+        received = []
+        calls = []
+
+        def send(buffers):
+            # Write at most 13 bytes, possibly across buffers
+            calls.append(len(buffers))
+            data = b"".join(bytes(b) for b in buffers)[:13]
+            received.append(data)
+            return len(data)
+
+        pickler = pickle._Pickler(0, 5)
+        pickler.framer.file_writev.__self__._send = send
+        pickler.dump(self.val)
+        self.assertEqual(b"".join(received),
+                         std_pickle._dumps(self.val, 5))
+        self.assertGreater(max(calls), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import pickle as std_pickle
+import sys
+import types
+import unittest
+
+from black_test.Base_test_class import BaseTestClass
+from lib_pickle import pickle
+
+
+def make_module(name, **attrs):
+    module = types.ModuleType(name)
+    for attr, obj in attrs.items():
+        setattr(module, attr, obj)
+    return module
+
+
+def make_function(qualname):
+    def function():
+        pass
+    function.__module__ = None
+    function.__qualname__ = qualname
+    return function
+
+
+class TestWhichmodule(BaseTestClass):
+    def setUp(self):
+        self.names = []
+
+    def tearDown(self):
+        for name in self.names:
+            sys.modules.pop(name, None)
+
+    def install(self, module):
+        self.names.append(module.__name__)
+        sys.modules[module.__name__] = module
+
+    # TC_057
+    def test_same_result_as_scan(self):
+        function = make_function("function")
+        Class = type("Class", (), {"__module__": None})
+        Class.method = make_function("Class.method")
+        self.install(make_module("wm_test_a", function=function, Class=Class))
+        cases = [(function, "function"), (Class, "Class"),
+                 (Class.method, "Class.method"), (Ellipsis, "Ellipsis"),
+                 (make_function("missing"), "missing")]
+        for _ in range(2):
+            for obj, name in cases:
+                with self.subTest(name=name):
+                    self.assertEqual(pickle.whichmodule(obj, name),
+                                     std_pickle.whichmodule(obj, name))
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            val = [function, Class, Class.method, Ellipsis]
+            self.assertEqual(pickle.dumps(val, protocol),
+                             std_pickle._dumps(val, protocol))
+            self.assertEqual(std_pickle.loads(pickle.dumps(val, protocol)),
+                             val)
+
+    # TC_058
+    def test_hits_skip_the_scan(self):
+        function = make_function("function")
+        self.install(make_module("wm_test_b", function=function))
+        scans = []
+        index = pickle._module_index
+        scan = index._scan
+        index._scan = lambda *args: scans.append(args) or scan(*args)
+        try:
+            for _ in range(3):
+                self.assertEqual(pickle.whichmodule(function, "function"),
+                                 "wm_test_b")
+            # A module imported after the index was built
+            later = make_function("later")
+            self.install(make_module("wm_test_c", later=later))
+            self.assertEqual(pickle.whichmodule(later, "later"), "wm_test_c")
+            self.assertEqual(scans, [])
+        finally:
+            del index._scan
+
+    # TC_059
+    def test_replaced_and_removed_modules(self):
+        old = make_function("function")
+        self.install(make_module("wm_test_d", function=old))
+        self.assertEqual(pickle.whichmodule(old, "function"), "wm_test_d")
+        new = make_function("function")
+        sys.modules["wm_test_d"] = make_module("wm_test_d", function=new)
+        self.assertEqual(pickle.whichmodule(old, "function"), "__main__")
+        self.assertEqual(pickle.whichmodule(new, "function"), "wm_test_d")
+        # Moved to another module, which replaces nothing
+        self.install(make_module("wm_test_e", function=old))
+        self.assertEqual(pickle.whichmodule(old, "function"), "wm_test_e")
+        del sys.modules["wm_test_d"]
+        self.assertEqual(pickle.whichmodule(new, "function"), "__main__")
+        self.assertNotIn("wm_test_d", pickle._module_index.modules)
+
+
+if __name__ == '__main__':
+    unittest.main()